@@ -48,6 +48,8 @@ from scheduling.models import ProgressUpdate
 from scheduling.forms import ProjectTask
 from project_profiling.models import ProjectProfile, ProjectBudget, ProjectCost, FundAllocation
 from authentication.models import CustomUser
+from powermason_capstone.utils.calculate_progress import calculate_progress
+from scheduling.utils.work_calendar import calendars_by_id
 from manage_client.models import Client
 
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
@@ -299,6 +301,8 @@ def dashboard_signed_with_role(request, token, role):
     projects_data = []
     all_tasks = []
     today = timezone.now().date()
+    # One lookup per distinct calendar, not per project
+    calendars = calendars_by_id(project.calendar_id for project in projects)
 
     for project in projects:
         # --- Budget calculations ---
@@ -315,13 +319,11 @@ def dashboard_signed_with_role(request, token, role):
         spent = float(getattr(project, "expense", 0) or 0)
 
         # --- Planned progress calculation ---
-        planned_progress = 0
-        if project.start_date and project.target_completion_date:
-            total_days = (project.target_completion_date - project.start_date).days
-            elapsed_days = (today - project.start_date).days
-            if total_days > 0:
-                planned_progress = (elapsed_days / total_days) * 100
-            planned_progress = max(0, min(100, planned_progress))
+        # Working days only (project calendar), so Sundays/holidays don't count
+        planned_progress = calculate_progress(
+            project.start_date, project.target_completion_date,
+            today=today, calendar=calendars[project.calendar_id],
+        )
 
         # --- Project data ---
         project_data = {
@@ -922,6 +924,8 @@ def dashboard_api(request):
     projects_data = []
     all_tasks = []
     today = timezone.now().date()
+    # One lookup per distinct calendar, not per project
+    calendars = calendars_by_id(project.calendar_id for project in projects)
 
     for project in projects:
         # ---- Budget calculations ----
@@ -938,13 +942,11 @@ def dashboard_api(request):
         spent = float(getattr(project, "expense", 0) or 0)
 
         # --- Planned progress calculation ---
-        planned_progress = 0
-        if project.start_date and project.target_completion_date:
-            total_days = (project.target_completion_date - project.start_date).days
-            elapsed_days = (today - project.start_date).days
-            if total_days > 0:
-                planned_progress = (elapsed_days / total_days) * 100
-        planned_progress = max(0, min(100, planned_progress))
+        # Working days only (project calendar), so Sundays/holidays don't count
+        planned_progress = calculate_progress(
+            project.start_date, project.target_completion_date,
+            today=today, calendar=calendars[project.calendar_id],
+        )
 
         # ---- Project data ----
         project_data = {
@@ -0,0 +1,36 @@
+import logging
+
+from authentication.models import CustomUser
+from outbox.bus import subscribe
+from xero.xero_helpers import has_xero_connection
+from xero.xero_sync import push_client_contact
+
+from .models import Client
+
+logger = logging.getLogger(__name__)
+
+
+class XeroSyncError(Exception):
+    pass
+
+
+@subscribe("client.saved", atomic=False)
+def sync_client(event):
+    """
+    Push a saved client to Xero with the connection of the user who saved
+    it. Runs outside the dispatcher's transaction; a retry updates the
+    contact already created (by its stored id, or Xero's idempotency key).
+    """
+    if not event.payload.get("sync_to_xero"):
+        return
+    client = Client.objects.filter(pk=event.aggregate_id).first()
+    user = CustomUser.objects.filter(pk=event.payload.get("user_id")).first()
+    if client is None or user is None:
+        return
+    if not has_xero_connection(user):
+        logger.warning("Skipping Xero sync of client %s: user %s is not connected", client.pk, user.pk)
+        return
+
+    result = push_client_contact(user, client, idempotency_key=f"outbox-event-{event.pk}")
+    if not result.get("success"):
+        raise XeroSyncError(result.get("error") or result.get("message") or "Unknown error")
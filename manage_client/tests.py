@@ -1,3 +1,45 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+
+from authentication.models import CustomUser, UserProfile
+from outbox.bus import dispatch, publish
+from outbox.models import OutboxEvent
+
+from .models import Client
+
+
+class ClientXeroSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email="xero-om@example.com", password="x")
+        UserProfile.objects.create(user=cls.user, role="OM")
+        cls.client_row = Client.objects.create(company_name="Acme Builders", contact_name="Ana Cruz")
+
+    def deliver(self):
+        OutboxEvent.objects.filter(status=OutboxEvent.PENDING).update(
+            available_at=timezone.now() - timedelta(seconds=1)
+        )
+        return dispatch()
+
+    def test_retries_reuse_the_key_and_later_syncs_update_the_contact(self):
+        created = {"success": True, "data": {"Contacts": [{"ContactID": "contact-1"}]}}
+        with mock.patch("manage_client.handlers.has_xero_connection", return_value=True), \
+                mock.patch("xero.xero_sync.xero_api_call",
+                           side_effect=[{"error": "API call failed: 504"}, created, created]) as call:
+            publish("client.saved", self.client_row, sync_to_xero=True, user_id=self.user.pk)
+            with self.assertLogs("outbox.bus", "ERROR"):
+                self.assertEqual(self.deliver(), (0, 1))
+            self.assertEqual(self.deliver(), (1, 0))
+
+            publish("client.saved", self.client_row, sync_to_xero=True, user_id=self.user.pk)
+            self.assertEqual(self.deliver(), (1, 0))
 
-# Create your tests here.
+        first, retry, update = call.call_args_list
+        self.assertEqual(first.kwargs["idempotency_key"], retry.kwargs["idempotency_key"])
+        self.assertNotIn("ContactID", retry.kwargs["data"]["Contacts"][0])
+        self.assertEqual(update.kwargs["data"]["Contacts"][0]["ContactID"], "contact-1")
+        self.client_row.refresh_from_db()
+        self.assertEqual(self.client_row.xero_contact_id, "contact-1")
@@ -5,7 +5,7 @@ from django.contrib import messages
 from django.http import JsonResponse, Http404
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 from django.urls import reverse
 import json
@@ -19,6 +19,7 @@ from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 import re
 
+from outbox.bus import publish
 from xero.xero_sync import sync_client_to_xero
 from xero.xero_helpers import has_xero_connection
 
@@ -218,35 +219,34 @@ def add_client(request):
         return redirect('client_management')
 
     try:
-        # --- Create client ---
-        user_profile = request.user.userprofile
-        client = Client.objects.create(
-            company_name=company_name,
-            contact_name=contact_name,
-            email=email,
-            phone=phone,
-            address=address,
-            city=city,
-            state=state,
-            zip_code=zip_code,
-            client_type=client_type,
-            notes=notes,
-            is_active=is_active,
-            created_by=user_profile,
-        )
+        with transaction.atomic():
+            # --- Create client ---
+            user_profile = request.user.userprofile
+            client = Client.objects.create(
+                company_name=company_name,
+                contact_name=contact_name,
+                email=email,
+                phone=phone,
+                address=address,
+                city=city,
+                state=state,
+                zip_code=zip_code,
+                client_type=client_type,
+                notes=notes,
+                is_active=is_active,
+                created_by=user_profile,
+            )
 
-        # Save related project types
-        if project_types:
-            valid_project_types = ProjectType.objects.filter(id__in=project_types, is_active=True)
-            client.project_types.set(valid_project_types)
+            # Save related project types
+            if project_types:
+                valid_project_types = ProjectType.objects.filter(id__in=project_types, is_active=True)
+                client.project_types.set(valid_project_types)
 
-        xero_sync_message = ""
-        if sync_to_xero and has_xero_connection(request.user):
-            sync_result = sync_client_to_xero(request, client)
-            if sync_result['success']:
-                xero_sync_message = " and synced to Xero"
-            else:
-                xero_sync_message = f" (Xero sync failed: {sync_result.get('message', 'Unknown error')})"
+            # Xero sync runs in the outbox dispatcher
+            queue_xero_sync = sync_to_xero and has_xero_connection(request.user)
+            publish("client.saved", client, sync_to_xero=queue_xero_sync, user_id=request.user.pk)
+
+        xero_sync_message = " and queued for Xero sync" if queue_xero_sync else ""
         client_type_display = dict(PROJECT_SOURCES).get(client_type, client_type)
 
         # --- Enriched client data for frontend ---
@@ -402,46 +402,40 @@ def edit_client(request, client_id):
         # Save changes
         # -------------------
         try:
-            client.company_name = company_name
-            client.contact_name = contact_name
-            client.email = email
-            client.phone = phone
-            client.address = address
-            client.city = city
-            client.state = state
-            client.zip_code = zip_code
-            client.client_type = client_type
-            client.notes = notes
-            client.is_active = is_active
-            client.save()
-
-            if project_types:
-                valid_project_types = ProjectType.objects.filter(id__in=project_types, is_active=True)
-                client.project_types.set(valid_project_types)
-            else:
-                client.project_types.clear()
-
-            # Handle Xero sync
-            xero_synced = False
-            xero_error = None
-            if should_sync_to_xero:
-                has_xero_connection = hasattr(request, "session") and request.session.get("xero_access_token")
-                if has_xero_connection:
-                    try:
-                        success = client.sync_to_xero(request)
-                        if success:
-                            xero_synced = True
-                        else:
-                            xero_error = "Failed to sync to Xero"
-                    except Exception as e:
-                        xero_error = f"Xero sync error: {str(e)}"
+            with transaction.atomic():
+                client.company_name = company_name
+                client.contact_name = contact_name
+                client.email = email
+                client.phone = phone
+                client.address = address
+                client.city = city
+                client.state = state
+                client.zip_code = zip_code
+                client.client_type = client_type
+                client.notes = notes
+                client.is_active = is_active
+                client.save()
+
+                if project_types:
+                    valid_project_types = ProjectType.objects.filter(id__in=project_types, is_active=True)
+                    client.project_types.set(valid_project_types)
                 else:
-                    xero_error = "Xero is not connected. Please connect to Xero first."
+                    client.project_types.clear()
+
+                # Handle Xero sync (delivered by the outbox dispatcher)
+                xero_queued = False
+                xero_error = None
+                if should_sync_to_xero:
+                    if has_xero_connection(request.user):
+                        xero_queued = True
+                    else:
+                        xero_error = "Xero is not connected. Please connect to Xero first."
+                publish("client.saved", client, sync_to_xero=xero_queued, user_id=request.user.pk)
 
             client_type_display = dict(PROJECT_SOURCES).get(client_type, client_type)
             success_message = f'{client_type_display} "{company_name}" updated successfully.'
-            if xero_synced:
-                success_message += " Changes have been synced to Xero."
+            if xero_queued:
+                success_message += " Changes will be synced to Xero shortly."
             elif xero_error:
                 success_message += f" Warning: Xero sync failed - {xero_error}"
 
@@ -456,7 +450,8 @@ def edit_client(request, client_id):
                 return JsonResponse({
                     "success": True,
                     "message": success_message,
-                    "xero_synced": xero_synced,
+                    "xero_synced": False,
+                    "xero_queued": xero_queued,
                     "xero_error": xero_error,
                     "client": {
                         "id": client.id,
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification, NotificationStatus
+from .models import Notification, NotificationArchive, NotificationCounter, NotificationStatus
 
 class NotificationStatusInline(admin.TabularInline):
     model = NotificationStatus
@@ -20,3 +20,23 @@ class NotificationStatusAdmin(admin.ModelAdmin):
     list_display = ('notification', 'user', 'is_read', 'cleared')
     list_filter = ('is_read', 'cleared')
     search_fields = ('notification__message', 'user__user__username')
+
+
+@admin.register(NotificationCounter)
+class NotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'unread')
+    search_fields = ('user__user__email',)
+    readonly_fields = ('user', 'unread')
+
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ('message', 'role', 'created_at', 'recipients', 'read_by', 'archived_at')
+    list_filter = ('role', 'archived_at')
+    search_fields = ('message',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from .versions import CACHE_ALIAS
+
+# Caches shared by every process with an atomic incr: a per-process cache
+# would hide bumps made by the outbox dispatcher or another web worker, and
+# a read-then-write incr (DatabaseCache, FileBasedCache) can lose a bump and
+# leave a poller asleep
+SHARED_ATOMIC_CACHES = (
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get(CACHE_ALIAS, {}).get("BACKEND")
+    if backend not in SHARED_ATOMIC_CACHES:
+        return [Error(
+            f"The '{CACHE_ALIAS}' cache ({backend or 'missing'}) is not shared between "
+            "processes or has no atomic incr.",
+            hint="Point it at Redis or memcached, e.g. set REDIS_URL.",
+            id="notifications.E001",
+        )]
+    return []
@@ -1,33 +1,27 @@
-from .models import Notification, NotificationStatus
+from django.utils.functional import SimpleLazyObject
 
-def unread_notifications(request):
-    if request.user.is_authenticated and hasattr(request.user, "userprofile"):
-        profile = request.user.userprofile
+from .utils import unread_count, user_notifications
 
-        notifications = Notification.objects.filter(
-            notificationstatus__user=profile,
-            notificationstatus__cleared=False
-        ).prefetch_related('notificationstatus_set').order_by('-created_at')
 
-        unread_count = NotificationStatus.objects.filter(
-            user=profile,
-            is_read=False,
-            cleared=False
-        ).count()
+def unread_notifications(request):
+    """
+    Notifications for the header, evaluated only if a template uses them:
+    a capped page with read state joined in, and the unread counter.
+    """
+    def profile():
+        if request.user.is_authenticated:
+            return getattr(request.user, "userprofile", None)
+        return None
 
-        # Annotate each notification with is_read_for_user
-        for notif in notifications:
-            try:
-                status = notif.notificationstatus_set.get(user=profile)
-                notif.is_read_for_user = status.is_read
-            except NotificationStatus.DoesNotExist:
-                notif.is_read_for_user = True  
+    def notifications():
+        user = profile()
+        return list(user_notifications(user)) if user else []
 
-    else:
-        notifications = []
-        unread_count = 0
+    def count():
+        user = profile()
+        return unread_count(user) if user else 0
 
     return {
-        "notifications": notifications,
-        "unread_count": unread_count
+        "notifications": SimpleLazyObject(notifications),
+        "unread_count": SimpleLazyObject(count),
     }
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.models import Notification
+from notifications.retention import BATCH_SIZE, compact_notifications, compact_statuses, retention_days
+
+
+class Command(BaseCommand):
+    help = ("Remove expired notifications and redundant cleared status rows in primary-key batches, "
+            "archiving removed notifications to NotificationArchive.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int,
+                            help="Retention in days for direct notifications and roles without their own.")
+        parser.add_argument("--role-days", action="append", default=[], metavar="ROLE=DAYS",
+                            help="Retention for one role's broadcasts, e.g. --role-days PM=30. Repeatable.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                            help="Primary keys covered by each delete transaction.")
+        parser.add_argument("--no-archive", action="store_true",
+                            help="Delete expired notifications without copying them to the archive.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report what would be removed without changing anything.")
+
+    def handle(self, *args, **options):
+        overrides = {}
+        if options["days"] is not None:
+            overrides["default"] = options["days"]
+        roles = dict(Notification.ROLE_CHOICES)
+        for value in options["role_days"]:
+            role, _, days = value.partition("=")
+            if role not in roles or not days.isdigit():
+                raise CommandError(f"Invalid --role-days '{value}', expected ROLE=DAYS with ROLE in {', '.join(roles)}.")
+            overrides[role] = int(days)
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        days = retention_days(overrides)
+        for role, keep in sorted(days.items(), key=lambda item: item[0] or ""):
+            self.stdout.write(f"{roles.get(role, 'Default')}: keeping {keep} day(s)")
+
+        notifications = compact_notifications(days, batch_size=options["batch_size"],
+                                              archive=not options["no_archive"], dry_run=options["dry_run"])
+        statuses = compact_statuses(batch_size=options["batch_size"], dry_run=options["dry_run"])
+
+        action = "Would remove" if options["dry_run"] else "Removed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {notifications} notification(s) and {statuses} cleared status row(s)."
+        ))
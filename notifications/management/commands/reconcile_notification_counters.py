@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from authentication.models import UserProfile
+from notifications.utils import reconcile_unread
+
+
+class Command(BaseCommand):
+    help = "Check per-user unread notification counters against their inbox and fix drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report drift without changing any counter.")
+
+    def handle(self, *args, **options):
+        profiles = UserProfile.objects.select_related("user").order_by("pk")
+        drifted = 0
+        for profile in profiles.iterator():
+            # Broadcast state lives in marks, so each inbox is recounted under its row lock
+            drift = reconcile_unread(profile, dry_run=options["dry_run"])
+            if drift:
+                drifted += 1
+                self.stdout.write(self.style.WARNING(f"User {profile.pk}: unread count off by {drift:+d}"))
+
+        action = "Found" if options["dry_run"] else "Reconciled"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {drifted} drifted counter(s) out of {profiles.count()} checked."
+        ))
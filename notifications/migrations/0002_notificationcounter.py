@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    """Start every user's counter at their current unread notifications."""
+    NotificationStatus = apps.get_model("notifications", "NotificationStatus")
+    NotificationCounter = apps.get_model("notifications", "NotificationCounter")
+
+    unread = (
+        NotificationStatus.objects.filter(is_read=False, cleared=False)
+        .values("user").annotate(total=Count("id")).values_list("user", "total")
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id, unread=total) for user_id, total in unread],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to='authentication.userprofile')),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:49
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def start_marks_at_latest(apps, schema_editor):
+    """
+    Rows with a role were never shown before broadcasts existed; start
+    every user's marks past them so they don't reappear as unread.
+    """
+    Notification = apps.get_model("notifications", "Notification")
+    NotificationCounter = apps.get_model("notifications", "NotificationCounter")
+    UserProfile = apps.get_model("authentication", "UserProfile")
+
+    latest = Notification.objects.aggregate(latest=Max("id"))["latest"] or 0
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=pk) for pk in UserProfile.objects.values_list("pk", flat=True)],
+        ignore_conflicts=True, batch_size=500,
+    )
+    NotificationCounter.objects.update(read_through=latest, cleared_through=latest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('notifications', '0002_notificationcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='cleared_through',
+            field=models.PositiveBigIntegerField(default=0, help_text='Broadcasts up to this id are cleared'),
+        ),
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='read_through',
+            field=models.PositiveBigIntegerField(default=0, help_text='Broadcasts up to this id are read'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('role__isnull', False)), fields=['role', 'id'], name='notif_broadcast_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationstatus',
+            index=models.Index(fields=['user', 'cleared', 'notification'], name='notif_status_user_idx'),
+        ),
+        migrations.RunPython(start_marks_at_latest, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_broadcast_read_marks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_id', models.PositiveBigIntegerField(unique=True)),
+                ('message', models.TextField()),
+                ('link', models.CharField(blank=True, max_length=255, null=True)),
+                ('role', models.CharField(blank=True, choices=[('VO', 'View Only'), ('PM', 'Project Manager'), ('OM', 'Operations Manager'), ('EG', 'Engineer')], max_length=2, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('recipients', models.PositiveIntegerField(default=0, help_text='Status rows it had when archived')),
+                ('read_by', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
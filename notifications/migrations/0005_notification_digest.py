@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('notifications', '0004_notificationarchive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='digest_key',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='event_count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('digest_key__isnull', False)), fields=['digest_key', 'created_at'], name='notif_digest_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('notifications', '0005_notification_digest'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notificationstatus',
+            name='notif_status_user_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['-created_at', '-id'], name='notif_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationstatus',
+            index=models.Index(fields=['user', 'cleared', 'is_read', 'notification'], name='notif_status_inbox_idx'),
+        ),
+    ]
@@ -16,18 +16,35 @@ class Notification(models.Model):
     role = models.CharField(max_length=2, choices=ROLE_CHOICES, blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
     archived = models.BooleanField(default=False)
+    # Events of the same kind and project merged into this one (see notify_digest)
+    digest_key = models.CharField(max_length=100, blank=True, null=True)
+    event_count = models.PositiveIntegerField(default=1)
 
     # Users who see this notification and their status
     users = models.ManyToManyField(UserProfile, through='NotificationStatus', related_name="notifications")
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Role broadcasts are read by role and id, with no status rows
+            models.Index(fields=["role", "id"], condition=models.Q(role__isnull=False),
+                         name="notif_broadcast_idx"),
+            # Keyset pagination of the inbox on (created_at, id)
+            models.Index(fields=["-created_at", "-id"], name="notif_created_idx"),
+            models.Index(fields=["digest_key", "created_at"], condition=models.Q(digest_key__isnull=False),
+                         name="notif_digest_idx"),
+        ]
 
     def __str__(self):
         return f"{self.message[:30]}"
 
 
 class NotificationStatus(models.Model):
+    """
+    A user's read/cleared state for a notification. Direct notifications
+    get one per recipient; role broadcasts only get one once the user
+    opens that notification.
+    """
     notification = models.ForeignKey(Notification, on_delete=models.CASCADE)
     user = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
     is_read = models.BooleanField(default=False)
@@ -35,3 +52,45 @@ class NotificationStatus(models.Model):
 
     class Meta:
         unique_together = ("notification", "user")
+        indexes = [
+            # Covers the inbox join and its unread/read filters without touching the table
+            models.Index(fields=["user", "cleared", "is_read", "notification"], name="notif_status_inbox_idx"),
+        ]
+
+
+class NotificationCounter(models.Model):
+    """
+    Per-user notification state: the unread count, kept in step by F()
+    updates so the badge is a primary-key read, and the high-water marks
+    up to which role broadcasts count as read or cleared.
+    ``reconcile_notification_counters`` repairs any drift in ``unread``.
+    """
+    user = models.OneToOneField(UserProfile, on_delete=models.CASCADE, primary_key=True,
+                                related_name="notification_counter")
+    unread = models.PositiveIntegerField(default=0)
+    read_through = models.PositiveBigIntegerField(default=0, help_text="Broadcasts up to this id are read")
+    cleared_through = models.PositiveBigIntegerField(default=0, help_text="Broadcasts up to this id are cleared")
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+
+class NotificationArchive(models.Model):
+    """
+    Cold copy of a notification removed by ``compact_notifications``, so
+    audit history survives without the hot tables having to skip it.
+    """
+    notification_id = models.PositiveBigIntegerField(unique=True)
+    message = models.TextField()
+    link = models.CharField(max_length=255, blank=True, null=True)
+    role = models.CharField(max_length=2, choices=Notification.ROLE_CHOICES, blank=True, null=True)
+    created_at = models.DateTimeField()
+    recipients = models.PositiveIntegerField(default=0, help_text="Status rows it had when archived")
+    read_by = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.message[:30]}"
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, Max, Min, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from authentication.models import UserProfile
+from notifications.models import Notification, NotificationArchive, NotificationCounter, NotificationStatus
+from notifications.utils import reconcile_unread
+
+DEFAULT_RETENTION_DAYS = 90
+BATCH_SIZE = 1000
+
+
+def retention_days(overrides=None):
+    """
+    ``{role: days}`` notifications are kept for, with ``None`` as the
+    default for direct notifications and roles not listed. Read from
+    ``settings.NOTIFICATION_RETENTION_DAYS`` (a ``"default"`` key sets the
+    default), then ``overrides``.
+    """
+    days = {None: DEFAULT_RETENTION_DAYS}
+    for role, value in {**getattr(settings, "NOTIFICATION_RETENTION_DAYS", {}), **(overrides or {})}.items():
+        days[None if role == "default" else role] = int(value)
+    return days
+
+
+def expired(days, now=None):
+    """
+    Q of notifications nobody needs in the hot tables any more: archived
+    ones, those past their role's retention, and direct ones every
+    recipient has cleared.
+    """
+    now = now or timezone.now()
+    roles = [role for role in days if role]
+    condition = Q(archived=True) | Q(
+        created_at__lt=now - timedelta(days=days[None])) & ~Q(role__in=roles)
+    for role in roles:
+        condition |= Q(role=role, created_at__lt=now - timedelta(days=days[role]))
+    live_status = NotificationStatus.objects.filter(notification=OuterRef("pk"), cleared=False)
+    return condition | Q(role__isnull=True) & ~Exists(live_status)
+
+
+def _ranges(queryset, batch_size):
+    """Consecutive ``[low, high)`` primary-key ranges covering ``queryset``."""
+    bounds = queryset.aggregate(low=Min("pk"), high=Max("pk"))
+    if bounds["low"] is None:
+        return
+    for low in range(bounds["low"], bounds["high"] + 1, batch_size):
+        yield low, low + batch_size
+
+
+def compact_notifications(days, batch_size=BATCH_SIZE, archive=True, dry_run=False):
+    """
+    Delete expired notifications (and their status rows) one primary-key
+    range at a time, copying each into ``NotificationArchive`` first unless
+    ``archive`` is off. Each range is its own short transaction. Unread
+    counters of users who could still see a removed notification are
+    recounted afterwards. Returns the number of notifications removed.
+    """
+    condition = expired(days)
+    removed, users, roles = 0, set(), set()
+    for low, high in _ranges(Notification.objects, batch_size):
+        batch = Notification.objects.filter(condition, pk__gte=low, pk__lt=high)
+        if dry_run:
+            removed += batch.count()
+            continue
+        with transaction.atomic():
+            rows = list(batch.annotate(
+                recipients=Count("notificationstatus"),
+                read_by=Count("notificationstatus", filter=Q(notificationstatus__is_read=True)),
+            ).order_by())
+            if not rows:
+                continue
+            ids = [row.pk for row in rows]
+            if archive:
+                NotificationArchive.objects.bulk_create([
+                    NotificationArchive(
+                        notification_id=row.pk, message=row.message, link=row.link, role=row.role,
+                        created_at=row.created_at, recipients=row.recipients, read_by=row.read_by,
+                    )
+                    for row in rows
+                ], ignore_conflicts=True)
+            users.update(NotificationStatus.objects.filter(
+                notification_id__in=ids, is_read=False, cleared=False).values_list("user_id", flat=True))
+            roles.update(row.role for row in rows if row.role and not row.archived)
+            Notification.objects.filter(pk__in=ids).delete()
+            removed += len(ids)
+
+    for profile in UserProfile.objects.filter(Q(pk__in=users) | Q(role__in=roles)).select_related("user"):
+        reconcile_unread(profile)
+    return removed
+
+
+def compact_statuses(batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Delete cleared status rows that no longer decide anything: those of
+    direct notifications, and those of broadcasts already under the
+    user's ``cleared_through`` mark. Returns the number of rows removed.
+    """
+    cleared_through = NotificationCounter.objects.filter(user=OuterRef("user")).values("cleared_through")[:1]
+    redundant = Q(cleared=True) & (
+        Q(notification__role__isnull=True) | Q(notification_id__lte=Subquery(cleared_through))
+    )
+    removed = 0
+    for low, high in _ranges(NotificationStatus.objects, batch_size):
+        batch = NotificationStatus.objects.filter(redundant, pk__gte=low, pk__lt=high)
+        if dry_run:
+            removed += batch.count()
+            continue
+        with transaction.atomic():
+            removed += NotificationStatus.objects.filter(
+                pk__in=list(batch.values_list("pk", flat=True))).delete()[0]
+    return removed
@@ -1,3 +1,362 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from authentication.models import CustomUser, UserProfile
+from notifications.checks import check_shared_cache
+from notifications.context_processors import unread_notifications
+from notifications.models import Notification, NotificationArchive, NotificationCounter, NotificationStatus
+from notifications.utils import (
+    clear, count_unread, mark_read, notify, notify_digest, open_notification, reconcile_unread,
+    unread_count, user_notifications,
+)
+from notifications.versions import CACHE_ALIAS, cursor, wait_for_change
+
+
+def make_profile(email, role):
+    user = CustomUser.objects.create_user(email=email, password="x")
+    return UserProfile.objects.create(user=user, role=role)
+
+
+class NotifyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.om = make_profile("om@example.com", "OM")
+        cls.egs = [make_profile(f"eg{i}@example.com", "EG") for i in range(3)]
+        cls.pm = make_profile("pm@example.com", "PM")
+
+    def test_broadcasts_are_stored_once_per_role(self):
+        # role lookup, broadcasts, direct notification, statuses, counter upsert + F() update (+ savepoint pair)
+        with self.assertNumQueries(8):
+            created = notify("Report submitted", link="/updates/",
+                             roles=["OM", "EG"], recipients=[self.om, self.pm])
+        self.assertEqual([n.role for n in created], ["OM", "EG", None])
+        # Only the PM, who is outside both roles, gets a status row
+        self.assertEqual(list(NotificationStatus.objects.values_list("user_id", flat=True)), [self.pm.pk])
+        for profile in [self.om, *self.egs, self.pm]:
+            self.assertEqual(unread_count(profile), 1)
+            self.assertEqual([n.message for n in user_notifications(profile)], ["Report submitted"])
+
+    def test_nobody_to_notify(self):
+        self.assertEqual(notify("Nobody", roles=["VO"]), [])
+        self.assertFalse(Notification.objects.exists())
+
+
+class BroadcastStateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.eg, cls.other_eg = make_profile("b-eg@example.com", "EG"), make_profile("b-eg2@example.com", "EG")
+        cls.pm = make_profile("b-pm@example.com", "PM")
+
+    def test_open_writes_one_status_row_for_that_user(self):
+        notification, = notify("Broadcast", link="/updates/", roles=["EG"])
+        self.client.force_login(self.eg.user)
+        response = self.client.get(reverse("open_notification", args=[notification.pk]))
+        self.assertRedirects(response, "/updates/", fetch_redirect_response=False)
+        self.assertEqual(
+            list(NotificationStatus.objects.values_list("user_id", "is_read")), [(self.eg.pk, True)]
+        )
+        self.assertEqual(unread_count(self.eg), 0)
+        self.assertEqual(unread_count(self.other_eg), 1)
+        self.assertTrue(user_notifications(self.eg)[0].is_read_for_user)
+        self.assertFalse(user_notifications(self.other_eg)[0].is_read_for_user)
+
+        self.client.force_login(self.pm.user)
+        self.assertEqual(self.client.get(reverse("open_notification", args=[notification.pk])).status_code, 404)
+
+    def test_mark_all_read_and_clear_move_high_water_marks(self):
+        notify("One", roles=["EG"])
+        notify("Two", roles=["EG"], recipients=[self.pm])
+        mark_read(self.eg)
+        self.assertFalse(NotificationStatus.objects.filter(user=self.eg).exists())
+        self.assertEqual(unread_count(self.eg), 0)
+        self.assertTrue(all(n.is_read_for_user for n in user_notifications(self.eg)))
+
+        notify("Three", roles=["EG"])
+        self.assertEqual(count_unread(self.eg), 1)
+        self.assertEqual(unread_count(self.eg), 1)
+
+        clear(self.eg)
+        self.assertEqual(list(user_notifications(self.eg)), [])
+        self.assertEqual(unread_count(self.eg), 0)
+        self.assertEqual(len(user_notifications(self.other_eg)), 3)
+        self.assertEqual([n.message for n in user_notifications(self.pm)], ["Two"])
+
+    def test_new_members_do_not_inherit_old_broadcasts(self):
+        notify("Before", roles=["EG"])
+        newcomer = make_profile("b-new@example.com", "EG")
+        notify("After", roles=["EG"])
+        self.assertEqual([n.message for n in user_notifications(newcomer)], ["After"])
+        self.assertEqual(reconcile_unread(newcomer), 0)
+
+
+class UnreadNotificationsContextTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = make_profile("reader@example.com", "PM")
+        for i in range(25):
+            notify(f"Update {i}", recipients=[cls.profile])
+        NotificationStatus.objects.filter(notification__message="Update 24").update(is_read=True)
+        reconcile_unread(cls.profile)
+
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+        self.request.user = CustomUser.objects.select_related("userprofile").get(pk=self.profile.user_id)
+
+    def test_lazy_until_used_then_one_capped_query(self):
+        with self.assertNumQueries(0):
+            context = unread_notifications(self.request)
+        with self.assertNumQueries(1):
+            notifications = list(context["notifications"])
+        self.assertEqual(len(notifications), 20)
+        self.assertEqual(notifications[0].message, "Update 24")
+        self.assertTrue(notifications[0].is_read_for_user)
+        self.assertFalse(notifications[1].is_read_for_user)
+
+    def test_unread_count_is_one_counter_read(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(unread_count(self.profile), 24)
+
+
+class NotificationCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = make_profile("counter-pm@example.com", "PM")
+        cls.eg = make_profile("counter-eg@example.com", "EG")
+
+    def test_fan_out_read_and_clear_move_counters(self):
+        notify("First", recipients=[self.pm, self.eg])
+        notify("Second", recipients=[self.pm])
+        self.assertEqual(unread_count(self.pm), 2)
+        self.assertEqual(unread_count(self.eg), 1)
+
+        mark_read(self.pm)
+        self.assertEqual(unread_count(self.pm), 0)
+        notify("Third", recipients=[self.pm, self.eg])
+        self.assertEqual(unread_count(self.pm), 1)
+
+        clear(self.eg)
+        self.assertEqual(unread_count(self.eg), 0)
+        self.assertEqual(unread_count(self.pm), 1)
+
+    def test_reconcile_command_fixes_drift(self):
+        notify("Drift", recipients=[self.pm, self.eg])
+        NotificationCounter.objects.filter(user=self.pm).update(unread=7)
+        NotificationCounter.objects.filter(user=self.eg).delete()
+
+        out = StringIO()
+        call_command("reconcile_notification_counters", "--dry-run", stdout=out)
+        self.assertIn("Found 2 drifted", out.getvalue())
+        self.assertEqual(unread_count(self.pm), 7)
+
+        call_command("reconcile_notification_counters", stdout=StringIO())
+        self.assertEqual(unread_count(self.pm), 1)
+        self.assertEqual(unread_count(self.eg), 1)
+
+
+class CompactNotificationsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = make_profile("compact-pm@example.com", "PM")
+        cls.eg = make_profile("compact-eg@example.com", "EG")
+
+    def age(self, notifications, days):
+        Notification.objects.filter(pk__in=[n.pk for n in notifications]).update(
+            created_at=timezone.now() - timedelta(days=days))
+
+    def test_expired_and_cleared_rows_are_archived_in_batches(self):
+        old = notify("Old", recipients=[self.pm])
+        self.age(old, 100)
+        broadcast = notify("Old broadcast", roles=["EG"])
+        self.age(broadcast, 40)
+        notify("Cleared", recipients=[self.pm, self.eg])
+        clear(self.pm)
+        clear(self.eg)
+        kept = notify("Fresh", recipients=[self.pm])
+
+        out = StringIO()
+        call_command("compact_notifications", "--dry-run", "--role-days", "EG=30", stdout=out)
+        self.assertIn("Would remove 3 notification(s)", out.getvalue())
+        self.assertEqual(Notification.objects.count(), 4)
+
+        call_command("compact_notifications", "--role-days", "EG=30", "--batch-size", "2", stdout=StringIO())
+        self.assertEqual(list(Notification.objects.all()), kept)
+        self.assertEqual(
+            set(NotificationArchive.objects.values_list("message", flat=True)),
+            {"Old", "Old broadcast", "Cleared"},
+        )
+        self.assertEqual(NotificationArchive.objects.get(message="Cleared").recipients, 2)
+        self.assertEqual(unread_count(self.pm), count_unread(self.pm))
+
+    def test_unread_counters_follow_removed_notifications(self):
+        self.age(notify("Stale", recipients=[self.pm]) + notify("Stale broadcast", roles=["EG"]), 200)
+        self.assertEqual(unread_count(self.eg), 1)
+        call_command("compact_notifications", "--no-archive", stdout=StringIO())
+        self.assertEqual(unread_count(self.pm), 0)
+        self.assertEqual(unread_count(self.eg), 0)
+        self.assertFalse(NotificationArchive.objects.exists())
+
+    def test_cleared_broadcast_status_rows_under_the_mark_are_dropped(self):
+        notification, = notify("Opened", roles=["EG"])
+        open_notification(self.eg, notification.pk)
+        clear(self.eg)
+        call_command("compact_notifications", stdout=StringIO())
+        self.assertFalse(NotificationStatus.objects.exists())
+        self.assertEqual(list(user_notifications(self.eg)), [])
+
+    def test_rejects_unknown_role(self):
+        with self.assertRaises(CommandError):
+            call_command("compact_notifications", "--role-days", "XX=3", stdout=StringIO())
+
+
+class NotifyDigestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = make_profile("digest-pm@example.com", "PM")
+        cls.eg = make_profile("digest-eg@example.com", "EG")
+
+    def report(self, n, project=1, **kwargs):
+        return notify_digest("progress_report", project, f"Report {n}", "{count} reports submitted", **kwargs)
+
+    def test_burst_becomes_one_digest_per_target(self):
+        for n in range(5):
+            self.report(n, roles=["EG"], recipients=[self.pm])
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertEqual(set(Notification.objects.values_list("message", "event_count")),
+                         {("5 reports submitted", 5)})
+        self.assertEqual(NotificationStatus.objects.count(), 1)
+        self.assertEqual(unread_count(self.eg), 1)
+        self.assertEqual(unread_count(self.pm), 1)
+
+    def test_interleaved_recipients_keep_their_own_digest(self):
+        other = make_profile("digest-pm2@example.com", "PM")
+        for n, recipient in enumerate([self.pm, other, self.pm, other, self.pm]):
+            self.report(n, recipients=[recipient])
+        self.assertEqual(
+            sorted(Notification.objects.values_list("message", "event_count")),
+            [("2 reports submitted", 2), ("3 reports submitted", 3)],
+        )
+
+    def test_projects_and_windows_are_kept_apart(self):
+        self.report(1, roles=["EG"])
+        self.report(2, project=2, roles=["EG"])
+        Notification.objects.update(created_at=timezone.now() - timedelta(hours=1))
+        self.report(3, roles=["EG"])
+        self.assertEqual(sorted(Notification.objects.values_list("message", flat=True)),
+                         ["Report 1", "Report 2", "Report 3"])
+
+    def test_seen_notifications_are_not_reused(self):
+        self.report(1, roles=["EG"], recipients=[self.pm])
+        mark_read(self.eg)
+        open_notification(self.pm, Notification.objects.get(role__isnull=True).pk)
+        self.report(2, roles=["EG"], recipients=[self.pm])
+        self.assertEqual(Notification.objects.filter(event_count=1).count(), 4)
+        self.assertEqual(unread_count(self.eg), 1)
+        self.assertEqual(unread_count(self.pm), 1)
+
+
+class InboxApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pm = make_profile("inbox-pm@example.com", "PM")
+        same_time = timezone.now()
+        for i in range(7):
+            notify(f"Direct {i}", recipients=[cls.pm])
+        # Ties on created_at are broken by id
+        Notification.objects.update(created_at=same_time)
+        notify_digest("progress_report", 1, "Report", "{count} reports", recipients=[cls.pm])
+        reconcile_unread(cls.pm)
+
+    def setUp(self):
+        self.client.force_login(self.pm.user)
+        self.url = reverse("notifications_inbox_api")
+
+    def test_cursor_walks_every_notification_once(self):
+        seen, cursor = [], ""
+        while True:
+            data = self.client.get(self.url, {"limit": 3, "cursor": cursor}).json()
+            seen += [n["message"] for n in data["results"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, ["Report"] + [f"Direct {i}" for i in reversed(range(7))])
+
+    def test_state_and_kind_filters(self):
+        open_notification(self.pm, Notification.objects.get(message="Direct 3").pk)
+        read = self.client.get(self.url, {"state": "read"}).json()
+        self.assertEqual([n["message"] for n in read["results"]], ["Direct 3"])
+        self.assertEqual(read["unread_count"], 7)
+        unread = self.client.get(self.url, {"state": "unread", "kind": "progress_report"}).json()
+        self.assertEqual([n["message"] for n in unread["results"]], ["Report"])
+
+    def test_bad_cursor_or_state(self):
+        self.assertEqual(self.client.get(self.url, {"cursor": "nope"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"state": "starred"}).status_code, 400)
+
+    def test_dropdown_hands_over_a_cursor(self):
+        response = self.client.get(reverse("notifications_dropdown"))
+        self.assertIsNone(response.context["next_cursor"])
+        self.assertContains(response, 'data-unread-count="8"')
+
+
+# Tests run in one process, so a local cache stands in for Redis here
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    CACHE_ALIAS: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+})
+class LongPollTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.eg = make_profile("poll-eg@example.com", "EG")
+        cls.pm = make_profile("poll-pm@example.com", "PM")
+
+    def setUp(self):
+        caches[CACHE_ALIAS].clear()
+        self.client.force_login(self.eg.user)
+        self.url = reverse("notifications_poll")
+
+    def test_cursor_moves_on_commit_for_direct_role_and_read_changes(self):
+        start = cursor(self.eg)
+        with self.captureOnCommitCallbacks(execute=True):
+            notify("Direct", recipients=[self.pm])
+        self.assertEqual(cursor(self.eg), start)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notify("Broadcast", roles=["EG"])
+        after_broadcast = cursor(self.eg)
+        self.assertNotEqual(after_broadcast, start)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_read(self.eg)
+        self.assertNotEqual(cursor(self.eg), after_broadcast)
+
+    def test_idle_wait_makes_no_queries(self):
+        with self.assertNumQueries(0):
+            self.assertIsNone(wait_for_change(self.eg, cursor(self.eg), timeout=0.05, interval=0.01))
+
+    def test_system_check_wants_a_shared_atomic_cache(self):
+        for backend in ("locmem.LocMemCache", "db.DatabaseCache", "redis.RedisCache"):
+            caches_setting = {CACHE_ALIAS: {"BACKEND": f"django.core.cache.backends.{backend}"}}
+            with self.subTest(backend=backend), self.settings(CACHES=caches_setting):
+                errors = [e.id for e in check_shared_cache(None)]
+                self.assertEqual(errors, [] if backend == "redis.RedisCache" else ["notifications.E001"])
+
+    def test_poll_returns_new_cursor_and_unread_count(self):
+        start = self.client.get(self.url).json()["cursor"]
+        idle = self.client.get(self.url, {"cursor": start, "timeout": 0}).json()
+        self.assertEqual(idle, {"changed": False, "cursor": start})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notify("Broadcast", roles=["EG"])
+        data = self.client.get(self.url, {"cursor": start, "timeout": 5}).json()
+        self.assertTrue(data["changed"])
+        self.assertNotEqual(data["cursor"], start)
+        self.assertEqual(data["unread_count"], 1)
+
+    def test_bad_timeout(self):
+        self.assertEqual(self.client.get(self.url, {"cursor": "0.0", "timeout": "soon"}).status_code, 400)
@@ -3,6 +3,9 @@ from . import views
 
 urlpatterns = [
     path('dropdown/', views.notifications_dropdown, name='notifications_dropdown'),
+    path('api/inbox/', views.notifications_inbox_api, name='notifications_inbox_api'),
+    path('poll/', views.notifications_poll, name='notifications_poll'),
     path('mark-read/', views.mark_notifications_read, name='mark_notifications_read'),
+    path('<int:pk>/open/', views.open_notification_view, name='open_notification'),
     path('clear/', views.clear_notifications, name='clear_notifications'),
 ]
@@ -1,12 +1,305 @@
-from notifications.models import Notification
+import base64
+from datetime import datetime, timedelta
 
-def send_notification(user=None, roles=None, message=None, link=None):
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    BooleanField, Case, Count, Exists, F, FilteredRelation, Max, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from authentication.models import UserProfile
+from notifications.models import Notification, NotificationCounter, NotificationStatus
+from notifications.versions import bump
+
+PAGE_SIZE = 20  # notifications rendered in the dropdown
+MAX_PAGE_SIZE = 50
+DIGEST_WINDOW = timedelta(minutes=getattr(settings, "NOTIFICATION_DIGEST_MINUTES", 15))
+
+
+def notify(message, link=None, recipients=None, roles=None, digest_key=None):
+    """
+    Send a notification to ``recipients`` (UserProfiles or their ids) and
+    every user with one of ``roles``.
+
+    Each role with members gets one broadcast ``Notification`` and no status
+    rows; a user's state for it is only written once they open it.
+    Recipients outside those roles share one direct notification with a
+    ``NotificationStatus`` each, inserted in one statement. Users matched
+    by both are notified once. Returns the notifications created (empty
+    when nobody would receive one).
+    """
+    members = dict(UserProfile.objects.filter(role__in=roles).values_list("pk", "role")) if roles else {}
+    direct_ids = {getattr(recipient, "pk", recipient) for recipient in recipients or ()}
+    direct_ids.difference_update(members, {None})
+    broadcast_roles = [role for role in dict.fromkeys(roles or ()) if role in members.values()]
+    if not broadcast_roles and not direct_ids:
+        return []
+
+    with transaction.atomic():
+        created = Notification.objects.bulk_create(
+            [Notification(message=message, link=link, role=role, digest_key=digest_key) for role in broadcast_roles]
+        )
+        if direct_ids:
+            notification = Notification.objects.create(message=message, link=link, digest_key=digest_key)
+            NotificationStatus.objects.bulk_create(
+                NotificationStatus(notification=notification, user_id=user_id) for user_id in sorted(direct_ids)
+            )
+            created.append(notification)
+        add_unread(sorted(direct_ids | set(members)), 1)
+        bump(user_ids=direct_ids, roles=broadcast_roles)
+    return created
+
+
+def _open_digest(key, since, role=None, user_ids=None):
+    """
+    The newest notification with ``key`` since ``since`` that nobody has
+    acted on yet, locked: a ``role`` broadcast no member has opened or
+    marked, or a direct one to exactly ``user_ids`` that is still unread.
+    Digests of other targets are filtered out before picking the newest,
+    so interleaved targets each keep merging into their own.
+    """
+    candidates = Notification.objects.filter(digest_key=key, created_at__gte=since, archived=False)
+    statuses = NotificationStatus.objects.filter(notification=OuterRef("pk"))
+    if role:
+        marked = NotificationCounter.objects.filter(user__role=role).filter(
+            Q(read_through__gte=OuterRef("pk")) | Q(cleared_through__gte=OuterRef("pk"))
+        )
+        candidates = candidates.filter(role=role).exclude(Exists(statuses)).exclude(Exists(marked))
+    else:
+        user_ids = set(user_ids or ())
+        targets = (
+            statuses.filter(user_id__in=user_ids).values("notification")
+            .annotate(n=Count("pk")).values("n")
+        )
+        candidates = (
+            candidates.filter(role__isnull=True)
+            .exclude(Exists(statuses.filter(Q(is_read=True) | Q(cleared=True))))
+            .exclude(Exists(statuses.exclude(user_id__in=user_ids)))
+            .alias(targets=Subquery(targets)).filter(targets=len(user_ids))
+        )
+    return candidates.select_for_update().order_by("-id").first()
+
+
+def notify_digest(kind, project, message, summary, link=None, recipients=None, roles=None, window=None):
+    """
+    Like ``notify``, but events of the same ``kind`` for the same
+    ``project`` within ``window`` (default ``DIGEST_WINDOW``) are merged
+    per target. While a role's or recipients' previous notification is
+    still untouched it is updated in place, its message becoming
+    ``summary`` formatted with the event ``count``; otherwise a new one
+    is sent with ``message``. Merging writes no status or counter rows.
+    Returns the notifications created or updated.
     """
-    Sends notifications to a specific user and/or roles with a preformatted message.
+    key = f"{kind}:{getattr(project, 'pk', project)}"
+    since = timezone.now() - (window or DIGEST_WINDOW)
+    staffed = set(UserProfile.objects.filter(role__in=roles).values_list("role", flat=True)) if roles else set()
+    direct_ids = {getattr(recipient, "pk", recipient) for recipient in recipients or ()}
+    if roles:
+        direct_ids -= set(UserProfile.objects.filter(pk__in=direct_ids, role__in=roles).values_list("pk", flat=True))
+    direct_ids.discard(None)
+
+    with transaction.atomic():
+        merged, fresh_roles = [], []
+        targets = [(role, None) for role in dict.fromkeys(roles or ()) if role in staffed]
+        if direct_ids:
+            targets.append((None, direct_ids))
+        for role, user_ids in targets:
+            digest = _open_digest(key, since, role=role, user_ids=user_ids)
+            if digest is None:
+                if role:
+                    fresh_roles.append(role)
+                continue
+            digest.event_count += 1
+            digest.message = summary.format(count=digest.event_count)
+            digest.link = link
+            digest.save(update_fields=["event_count", "message", "link"])
+            bump(user_ids=user_ids or (), roles=[role])
+            merged.append(digest)
+            if user_ids is not None:
+                direct_ids = set()
+
+        fresh = []
+        if fresh_roles or direct_ids:
+            fresh = notify(message, link=link, recipients=direct_ids, roles=fresh_roles, digest_key=key)
+    return merged + fresh
+
+
+def _mark(profile, field):
+    """A user's broadcast high-water ``field`` as a subquery (0 if unset)."""
+    return Coalesce(
+        Subquery(NotificationCounter.objects.filter(user=profile).values(field)[:1]), Value(0)
+    )
+
+
+def inbox(profile):
+    """
+    All of a user's uncleared notifications, direct and role broadcast,
+    with ``is_read_for_user`` annotated, as one query.
+
+    Broadcasts to the user's role count from when they joined, above their
+    ``cleared_through`` mark and unless cleared one by one. A broadcast is
+    read when its status row says so or it is within ``read_through``.
     """
-    if user and message:
-        Notification.objects.create(user=user, message=message, link=link)
+    direct = Q(role__isnull=True, status__cleared=False)
+    broadcast = Q(
+        role=profile.role,
+        id__gt=_mark(profile, "cleared_through"),
+        created_at__gte=profile.user.date_joined,
+    ) & (Q(status__isnull=True) | Q(status__cleared=False))
+    return (
+        Notification.objects.annotate(
+            status=FilteredRelation("notificationstatus", condition=Q(notificationstatus__user=profile)),
+        )
+        .filter(direct | broadcast, archived=False)
+        .annotate(is_read_for_user=Case(
+            When(status__isnull=False, then=F("status__is_read")),
+            When(id__lte=_mark(profile, "read_through"), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ))
+    )
+
+
+def user_notifications(profile, limit=PAGE_SIZE):
+    """The user's latest ``limit`` inbox notifications."""
+    return inbox(profile).order_by("-created_at", "-id")[:limit]
+
+
+def encode_cursor(notification):
+    """Opaque keyset cursor for the inbox page ending with ``notification``."""
+    key = f"{notification.created_at.isoformat()}|{notification.pk}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """``(created_at, id)`` of an ``encode_cursor`` value; ValueError if malformed."""
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (TypeError, UnicodeError, ValueError, base64.binascii.Error):
+        raise ValueError("Invalid cursor.")
+
 
-    if roles and message:
-        for role in roles:
-            Notification.objects.create(role=role, message=message, link=link)
+def inbox_page(profile, cursor=None, limit=PAGE_SIZE, state=None, kind=None):
+    """
+    One page of a user's inbox, newest first, continuing after ``cursor``
+    by keyset on (``created_at``, ``id``) rather than an offset. ``state``
+    keeps only "unread" or "read" notifications and ``kind`` only digests
+    of that kind. Returns ``(notifications, next_cursor)``, the cursor
+    being None on the last page.
+    """
+    notifications = inbox(profile)
+    if state == "unread":
+        notifications = notifications.filter(is_read_for_user=False)
+    elif state == "read":
+        notifications = notifications.filter(is_read_for_user=True)
+    elif state:
+        raise ValueError(f"Unknown state '{state}'.")
+    if kind:
+        notifications = notifications.filter(digest_key__startswith=f"{kind}:")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        notifications = notifications.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    page = list(notifications.order_by("-created_at", "-id")[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def count_unread(profile):
+    """Unread inbox notifications of a user, counted from the tables."""
+    return inbox(profile).filter(is_read_for_user=False).count()
+
+
+def unread_count(profile):
+    """Unread, uncleared notifications of a user, read from their counter."""
+    return (
+        NotificationCounter.objects.filter(user=profile).values_list("unread", flat=True).first() or 0
+    )
+
+
+def add_unread(user_ids, delta):
+    """
+    Move the unread counters of ``user_ids`` by ``delta`` with one F()
+    update (never below zero), creating missing counters first.
+    """
+    if not user_ids or not delta:
+        return
+    if delta > 0:
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=user_id) for user_id in user_ids], ignore_conflicts=True
+        )
+    NotificationCounter.objects.filter(user_id__in=user_ids).update(
+        unread=Greatest(F("unread") + delta, 0)
+    )
+
+
+def _locked_counter(profile):
+    NotificationCounter.objects.get_or_create(user=profile)
+    return NotificationCounter.objects.select_for_update().get(user=profile)
+
+
+def _move_mark(profile, field, status_field):
+    """
+    Flag every direct status row of a user with ``status_field`` and move
+    their broadcast ``field`` mark to the newest notification, under the
+    counter's row lock. Nothing is left unread, so ``unread`` is set to 0
+    rather than recounted; ``reconcile_notification_counters`` repairs any
+    drift.
+    """
+    with transaction.atomic():
+        counter = _locked_counter(profile)
+        latest = Notification.objects.aggregate(latest=Max("id"))["latest"] or 0
+        NotificationStatus.objects.filter(user=profile, **{status_field: False}).update(**{status_field: True})
+        setattr(counter, field, max(getattr(counter, field), latest))
+        counter.unread = 0
+        counter.save(update_fields=[field, "unread"])
+        bump(user_ids=[profile.pk])
+
+
+def mark_read(profile):
+    """Mark all of a user's notifications read and take them off the counter."""
+    _move_mark(profile, "read_through", "is_read")
+
+
+def clear(profile):
+    """Clear (archive) all of a user's notifications and their unread count."""
+    _move_mark(profile, "cleared_through", "cleared")
+
+
+def open_notification(profile, notification_id):
+    """
+    Mark one of a user's notifications read, writing their status row for
+    it if it is a broadcast they had not opened yet. Returns the
+    notification, or None when it is not in their inbox.
+    """
+    with transaction.atomic():
+        _locked_counter(profile)
+        notification = inbox(profile).filter(pk=notification_id).first()
+        if notification is None:
+            return None
+        if not notification.is_read_for_user:
+            NotificationStatus.objects.update_or_create(
+                notification=notification, user=profile, defaults={"is_read": True}
+            )
+            add_unread([profile.pk], -1)
+            bump(user_ids=[profile.pk])
+    return notification
+
+
+def reconcile_unread(profile, dry_run=False):
+    """
+    Recount a user's unread notifications under their counter's row lock
+    and, unless ``dry_run``, store the result. Returns the drift.
+    """
+    with transaction.atomic():
+        stored = (
+            NotificationCounter.objects.select_for_update().filter(user=profile)
+            .values_list("unread", flat=True).first() or 0
+        )
+        drift = count_unread(profile) - stored
+        if drift and not dry_run:
+            NotificationCounter.objects.update_or_create(user=profile, defaults={"unread": stored + drift})
+        return drift
@@ -0,0 +1,74 @@
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+CACHE_ALIAS = "notifications"  # must be shared by all processes, see checks.py
+VERSION_PREFIX = "notif_version"
+VERSION_TIMEOUT = None  # versions never expire; an evicted one reads as 0 and just wakes pollers early
+# polls are served by sync workers, so each is held only briefly and the
+# client backs off between idle ones
+POLL_TIMEOUT = 4  # seconds a long poll is held by default
+MAX_POLL_TIMEOUT = 8
+
+
+def user_key(user_id):
+    return f"{VERSION_PREFIX}:user:{user_id}"
+
+
+def role_key(role):
+    return f"{VERSION_PREFIX}:role:{role}"
+
+
+def _keys(profile):
+    return [user_key(profile.pk), role_key(profile.role)]
+
+
+def cursor(profile):
+    """
+    The user's change cursor, ``"<user version>.<role version>"``, read
+    from the cache only. It changes whenever a notification reaches the
+    user directly or through their role, or their read state changes.
+    The ``notifications`` cache is shared by every process (web and
+    workers), so changes made anywhere show.
+    """
+    versions = caches[CACHE_ALIAS].get_many(_keys(profile))
+    return ".".join(str(versions.get(key, 0)) for key in _keys(profile))
+
+
+def _bump(keys):
+    cache = caches[CACHE_ALIAS]
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, VERSION_TIMEOUT):
+                cache.incr(key)
+
+
+def bump(user_ids=(), roles=()):
+    """
+    Advance the versions of ``user_ids`` and ``roles`` once the current
+    transaction commits, so woken pollers read the committed rows. A role
+    broadcast bumps one role version rather than every member's.
+    """
+    keys = [user_key(user_id) for user_id in user_ids] + [role_key(role) for role in roles if role]
+    if keys:
+        transaction.on_commit(lambda: _bump(keys))
+
+
+def wait_for_change(profile, since, timeout, interval=1.0):
+    """
+    Block until the user's cursor differs from ``since`` or ``timeout``
+    seconds pass, checking the cache every ``interval`` seconds. Returns
+    the new cursor, or None on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        current = cursor(profile)
+        if current != since:
+            return current
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(interval, remaining))
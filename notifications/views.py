@@ -1,8 +1,10 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
-from django.http import JsonResponse
-from .models import Notification, NotificationStatus
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from .utils import MAX_PAGE_SIZE, PAGE_SIZE, clear, inbox_page, mark_read, open_notification, unread_count
+from .versions import MAX_POLL_TIMEOUT, POLL_TIMEOUT, cursor, wait_for_change
 
 @login_required
 def notifications_dropdown(request):
@@ -10,22 +12,52 @@ def notifications_dropdown(request):
     if not profile:
         return redirect("unauthorized")
 
-    # Get notifications for this user via NotificationStatus
-    notifications = Notification.objects.filter(
-        notificationstatus__user=profile,
-        archived=False,
-        notificationstatus__cleared=False
-    ).distinct().order_by('-created_at')
-
-    unread_count = NotificationStatus.objects.filter(
-        user=profile,
-        is_read=False,
-        cleared=False
-    ).count()
-
+    notifications, next_cursor = inbox_page(profile)
     return render(request, "partials/_notifications.html", {
         "notifications": notifications,
-        "unread_count": unread_count
+        "next_cursor": next_cursor,
+        "unread_count": unread_count(profile),
+    })
+
+
+@login_required
+def notifications_inbox_api(request):
+    """
+    JSON page of the user's inbox for infinite scroll: ``?cursor=`` from
+    the previous page, optional ``state`` (unread/read), ``kind`` and
+    ``limit``.
+    """
+    profile = getattr(request.user, "userprofile", None)
+    if not profile:
+        return JsonResponse({"error": "No profile found."}, status=403)
+
+    try:
+        limit = min(max(int(request.GET.get("limit", PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        notifications, next_cursor = inbox_page(
+            profile,
+            cursor=request.GET.get("cursor") or None,
+            limit=limit,
+            state=request.GET.get("state") or None,
+            kind=request.GET.get("kind") or None,
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "results": [
+            {
+                "id": n.id,
+                "message": n.message,
+                "link": n.link,
+                "open_url": reverse("open_notification", args=[n.id]),
+                "created_at": n.created_at.isoformat(),
+                "is_read": n.is_read_for_user,
+                "event_count": n.event_count,
+            }
+            for n in notifications
+        ],
+        "next_cursor": next_cursor,
+        "unread_count": unread_count(profile),
     })
 
 
@@ -34,19 +66,55 @@ def notifications_dropdown(request):
 def mark_notifications_read(request):
     profile = getattr(request.user, "userprofile", None)
     if profile:
-        NotificationStatus.objects.filter(
-            user=profile,
-            is_read=False
-        ).update(is_read=True)
+        mark_read(profile)
     return JsonResponse({"status": "ok"})
 
 
+@login_required
+def notifications_poll(request):
+    """
+    Short long poll for the header: held until the user's change cursor
+    moves past ``?cursor=`` or ``timeout`` seconds (at most
+    ``MAX_POLL_TIMEOUT``) pass, so a tab never pins a worker for long.
+    Waiting only reads the cache; the unread count is fetched once
+    something changed. Without a cursor the current one is returned
+    straight away.
+    """
+    profile = getattr(request.user, "userprofile", None)
+    if not profile:
+        return JsonResponse({"error": "No profile found."}, status=403)
+
+    since = request.GET.get("cursor")
+    if not since:
+        return JsonResponse({"changed": False, "cursor": cursor(profile)})
+    try:
+        timeout = min(max(float(request.GET.get("timeout", POLL_TIMEOUT)), 0), MAX_POLL_TIMEOUT)
+    except ValueError:
+        return JsonResponse({"error": "Invalid timeout."}, status=400)
+
+    current = wait_for_change(profile, since, timeout)
+    if current is None:
+        return JsonResponse({"changed": False, "cursor": since})
+    return JsonResponse({"changed": True, "cursor": current, "unread_count": unread_count(profile)})
+
+
+@login_required
+def open_notification_view(request, pk):
+    """Mark one notification read for the user and follow its link."""
+    profile = getattr(request.user, "userprofile", None)
+    if not profile:
+        return redirect("unauthorized")
+
+    notification = open_notification(profile, pk)
+    if notification is None:
+        raise Http404("Notification not found")
+    return redirect(notification.link or "/")
+
+
 @login_required
 @require_POST
 def clear_notifications(request):
     profile = getattr(request.user, "userprofile", None)
     if profile:
-        NotificationStatus.objects.filter(
-            user=profile
-        ).update(cleared=True)  # archive instead of delete
+        clear(profile)  # archive instead of delete
     return JsonResponse({"status": "cleared"})
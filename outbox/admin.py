@@ -0,0 +1,38 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboxEvent, QueuedEmail
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'topic', 'aggregate_type', 'aggregate_id', 'status', 'attempts', 'available_at', 'created_at')
+    list_filter = ('status', 'topic')
+    search_fields = ('aggregate_id', 'last_error')
+    readonly_fields = ('topic', 'aggregate_type', 'aggregate_id', 'payload', 'attempts', 'last_error',
+                       'created_at', 'processed_at')
+    actions = ['retry_events']
+
+    @admin.action(description="Retry selected events")
+    def retry_events(self, request, queryset):
+        updated = queryset.exclude(status=OutboxEvent.DONE).update(
+            status=OutboxEvent.PENDING, attempts=0, available_at=timezone.now()
+        )
+        self.message_user(request, f"{updated} event(s) queued for retry.")
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subject', 'status', 'attempts', 'available_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'to', 'last_error')
+    readonly_fields = ('subject', 'body', 'from_email', 'to', 'cc', 'bcc', 'reply_to', 'headers',
+                       'alternatives', 'attachments', 'attempts', 'last_error', 'created_at', 'sent_at')
+    actions = ['retry_emails']
+
+    @admin.action(description="Retry selected emails")
+    def retry_emails(self, request, queryset):
+        updated = queryset.exclude(status=QueuedEmail.SENT).update(
+            status=QueuedEmail.PENDING, attempts=0, available_at=timezone.now()
+        )
+        self.message_user(request, f"{updated} email(s) queued for retry.")
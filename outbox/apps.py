@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class OutboxConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'outbox'
+
+    def ready(self):
+        # Each app registers its event handlers in a handlers.py module
+        autodiscover_modules("handlers")
@@ -0,0 +1,142 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_DELAY = timedelta(seconds=30)  # doubled after every failed attempt
+MAX_RETRY_DELAY = timedelta(hours=1)
+CLAIM_TIMEOUT = timedelta(minutes=10)  # a claimed event is retried after this if its dispatcher died
+
+_handlers = defaultdict(list)
+_outside_transaction = set()
+
+
+def subscribe(topic, atomic=True):
+    """
+    Register the decorated function to receive ``topic`` events. Handlers
+    get the ``OutboxEvent`` and may run more than once for it (an event is
+    retried when any of its handlers fails), so they must be idempotent.
+
+    Handlers run together in one transaction. Pass ``atomic=False`` for a
+    handler that calls an external service: it runs first, with no
+    transaction open, so no database lock is held across the network call.
+    """
+    def register(handler):
+        _handlers[topic].append(handler)
+        if not atomic:
+            _outside_transaction.add(handler)
+        return handler
+    return register
+
+
+def handlers_for(topic):
+    return list(_handlers.get(topic, ()))
+
+
+def publish(topic, aggregate, **payload):
+    """
+    Record ``topic`` for the model instance ``aggregate``. Call it inside
+    the transaction making the change so the event is stored if and only
+    if the change commits.
+    """
+    return OutboxEvent.objects.create(
+        topic=topic,
+        aggregate_type=aggregate._meta.label_lower,
+        aggregate_id=str(aggregate.pk),
+        payload=payload,
+    )
+
+
+def retry_delay(attempts):
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def due_events(now=None):
+    """
+    Pending events ready for delivery, oldest first, leaving out any whose
+    aggregate has an earlier event still waiting for a retry.
+    """
+    now = now or timezone.now()
+    waiting = OutboxEvent.objects.filter(
+        status=OutboxEvent.PENDING,
+        available_at__gt=now,
+        aggregate_type=OuterRef("aggregate_type"),
+        aggregate_id=OuterRef("aggregate_id"),
+        id__lt=OuterRef("id"),
+    )
+    return (
+        OutboxEvent.objects.filter(status=OutboxEvent.PENDING, available_at__lte=now)
+        .exclude(Exists(waiting)).order_by("id")
+    )
+
+
+def _deliver(event_id, max_attempts):
+    """
+    Claim one event for ``CLAIM_TIMEOUT`` in a single conditional update,
+    then run its handlers: ``atomic=False`` ones with no transaction open,
+    then the rest in one transaction whose writes roll back together if
+    any fails. A failed event is rescheduled with exponential backoff, or
+    marked failed after ``max_attempts``. Returns the event's new status,
+    or None if another dispatcher holds it.
+    """
+    now = timezone.now()
+    claimed_until = now + CLAIM_TIMEOUT
+    claimed = OutboxEvent.objects.filter(
+        pk=event_id, status=OutboxEvent.PENDING, available_at__lte=now
+    ).update(available_at=claimed_until)
+    if not claimed:
+        return None
+
+    event = OutboxEvent.objects.get(pk=event_id)
+    handlers = handlers_for(event.topic)
+    try:
+        for handler in handlers:
+            if handler in _outside_transaction:
+                handler(event)
+        with transaction.atomic():
+            for handler in handlers:
+                if handler not in _outside_transaction:
+                    handler(event)
+    except Exception as e:
+        logger.exception("Outbox event %s (%s) failed", event.pk, event.topic)
+        attempts = event.attempts + 1
+        result = {"attempts": attempts, "last_error": f"{type(e).__name__}: {e}"}
+        if attempts >= max_attempts:
+            result["status"] = OutboxEvent.FAILED
+        else:
+            result["available_at"] = timezone.now() + retry_delay(attempts)
+    else:
+        result = {"status": OutboxEvent.DONE, "processed_at": timezone.now()}
+    OutboxEvent.objects.filter(pk=event_id, available_at=claimed_until).update(**result)
+    return result.get("status", OutboxEvent.PENDING)
+
+
+def dispatch(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Deliver one batch of due events, each claimed and recorded on its own.
+    Returns ``(delivered, failed)`` counts for the batch.
+    """
+    delivered = failed = 0
+    held = set()
+    for event_id, *aggregate in due_events().values_list("id", "aggregate_type", "aggregate_id")[:batch_size]:
+        # Once an event of an aggregate fails (or is taken elsewhere), its
+        # later events wait for the next batch to keep them in order
+        if tuple(aggregate) in held:
+            continue
+        status = _deliver(event_id, max_attempts)
+        if status == OutboxEvent.DONE:
+            delivered += 1
+            continue
+        held.add(tuple(aggregate))
+        if status is not None:
+            failed += 1
+    return delivered, failed
@@ -0,0 +1,145 @@
+import base64
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from .bus import retry_delay
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+CLAIM_TIMEOUT = timedelta(minutes=10)  # a claimed batch is retried after this if its worker died
+
+
+def delivery_backend():
+    """Dotted path of the backend queued emails are finally sent with."""
+    return getattr(settings, "QUEUED_EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+
+
+def _attachment(attachment):
+    if not isinstance(attachment, tuple):
+        raise ValueError("Only (filename, content, mimetype) attachments can be queued.")
+    filename, content, mimetype = attachment
+    if isinstance(content, str):
+        content = content.encode()
+    return [filename, base64.b64encode(content).decode(), mimetype]
+
+
+def queue(message):
+    """An unsaved ``QueuedEmail`` holding everything needed to rebuild ``message``."""
+    return QueuedEmail(
+        subject=message.subject,
+        body=message.body,
+        content_subtype=message.content_subtype,
+        mixed_subtype=message.mixed_subtype,
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+        alternatives=[list(alternative) for alternative in getattr(message, "alternatives", [])],
+        attachments=[_attachment(attachment) for attachment in message.attachments],
+    )
+
+
+def rebuild(email):
+    """The ``EmailMultiAlternatives`` a ``QueuedEmail`` was queued from."""
+    message = EmailMultiAlternatives(
+        subject=email.subject, body=email.body, from_email=email.from_email,
+        to=email.to, cc=email.cc, bcc=email.bcc, reply_to=email.reply_to, headers=email.headers,
+    )
+    message.content_subtype = email.content_subtype
+    message.mixed_subtype = email.mixed_subtype
+    for content, mimetype in email.alternatives:
+        message.attach_alternative(content, mimetype)
+    for filename, content, mimetype in email.attachments:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    return message
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Email backend that only stores messages, so sending costs the request
+    one insert. ``send_queued_mail`` delivers them through
+    ``settings.QUEUED_EMAIL_BACKEND``.
+    """
+
+    def send_messages(self, email_messages):
+        rows = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            try:
+                rows.append(queue(message))
+            except ValueError:
+                if not self.fail_silently:
+                    raise
+        QueuedEmail.objects.bulk_create(rows)
+        return len(rows)
+
+
+def claim(batch_size=BATCH_SIZE):
+    """
+    Claim up to ``batch_size`` due emails for this worker in one short
+    write: their ``available_at`` moves ``CLAIM_TIMEOUT`` ahead, so other
+    workers skip them, and a worker that dies mid-batch only delays them.
+    """
+    now = timezone.now()
+    claimed_until = now + CLAIM_TIMEOUT
+    with transaction.atomic():
+        ids = list(
+            QueuedEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=QueuedEmail.PENDING, available_at__lte=now)
+            .order_by("id").values_list("id", flat=True)[:batch_size]
+        )
+        QueuedEmail.objects.filter(pk__in=ids, status=QueuedEmail.PENDING, available_at__lte=now).update(
+            available_at=claimed_until
+        )
+    return list(QueuedEmail.objects.filter(pk__in=ids, available_at=claimed_until).order_by("id"))
+
+
+def send_queued(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Send one claimed batch of due emails over a single connection of the
+    delivery backend, outside any transaction, recording each result in
+    its own write as soon as it is known. A failed email is retried with
+    exponential backoff, or marked failed after ``max_attempts``; the
+    connection is reopened after a failure in case it was dropped.
+    Returns ``(sent, failed)``.
+    """
+    sent = failed = 0
+    emails = claim(batch_size)
+    if not emails:
+        return sent, failed
+
+    connection = get_connection(delivery_backend())
+    try:
+        for email in emails:
+            try:
+                connection.open()
+                connection.send_messages([rebuild(email)])
+            except Exception as e:
+                logger.warning("Queued email %s failed: %s", email.pk, e)
+                connection.close()
+                attempts = email.attempts + 1
+                result = {"attempts": attempts, "last_error": f"{type(e).__name__}: {e}"}
+                if attempts >= max_attempts:
+                    result["status"] = QueuedEmail.FAILED
+                else:
+                    result["available_at"] = timezone.now() + retry_delay(attempts)
+                failed += 1
+            else:
+                result = {"status": QueuedEmail.SENT, "sent_at": timezone.now()}
+                sent += 1
+            QueuedEmail.objects.filter(pk=email.pk).update(**result)
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from outbox.bus import BATCH_SIZE, MAX_ATTEMPTS, dispatch
+
+
+class Command(BaseCommand):
+    help = "Deliver pending outbox events to their registered handlers in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                            help="Events delivered per batch.")
+        parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                            help="Attempts before an event is marked failed.")
+        parser.add_argument("--loop", action="store_true",
+                            help="Keep running, polling for new events.")
+        parser.add_argument("--interval", type=float, default=2.0,
+                            help="Seconds to sleep between polls when idle (with --loop).")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["max_attempts"] < 1:
+            raise CommandError("--batch-size and --max-attempts must be positive.")
+
+        total_delivered = total_failed = 0
+        while True:
+            delivered, failed = dispatch(options["batch_size"], options["max_attempts"])
+            total_delivered += delivered
+            total_failed += failed
+            if failed:
+                self.stdout.write(self.style.WARNING(f"{failed} event(s) failed and will be retried or dropped."))
+            if delivered + failed == options["batch_size"]:
+                continue  # more may be waiting
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Delivered {total_delivered} event(s), {total_failed} failed attempt(s)."
+        ))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from outbox.mail import BATCH_SIZE, MAX_ATTEMPTS, delivery_backend, send_queued
+
+
+class Command(BaseCommand):
+    help = "Send emails queued by QueuedEmailBackend in batches over one connection per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                            help="Emails sent per connection.")
+        parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                            help="Attempts before an email is marked failed.")
+        parser.add_argument("--loop", action="store_true",
+                            help="Keep running, polling for new emails.")
+        parser.add_argument("--interval", type=float, default=5.0,
+                            help="Seconds to sleep between polls when idle (with --loop).")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["max_attempts"] < 1:
+            raise CommandError("--batch-size and --max-attempts must be positive.")
+
+        self.stdout.write(f"Delivering through {delivery_backend()}")
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_queued(options["batch_size"], options["max_attempts"])
+            total_sent += sent
+            total_failed += failed
+            if failed:
+                self.stdout.write(self.style.WARNING(f"{failed} email(s) failed and will be retried or dropped."))
+            if sent + failed == options["batch_size"]:
+                continue  # more may be waiting
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {total_sent} email(s), {total_failed} failed attempt(s)."
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:56
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=64)),
+                ('aggregate_type', models.CharField(max_length=100)),
+                ('aggregate_id', models.CharField(max_length=64)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status', models.CharField(choices=[('P', 'Pending'), ('D', 'Delivered'), ('F', 'Failed')], default='P', max_length=1)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Not delivered before this time')),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'P')), fields=['available_at', 'id'], name='outbox_pending_idx'), models.Index(condition=models.Q(('status', 'P')), fields=['aggregate_type', 'aggregate_id', 'id'], name='outbox_aggregate_idx')],
+            },
+        ),
+    ]
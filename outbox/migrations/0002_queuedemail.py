@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+                ('from_email', models.CharField(blank=True, max_length=255)),
+                ('to', models.JSONField(default=list)),
+                ('cc', models.JSONField(blank=True, default=list)),
+                ('bcc', models.JSONField(blank=True, default=list)),
+                ('reply_to', models.JSONField(blank=True, default=list)),
+                ('headers', models.JSONField(blank=True, default=dict)),
+                ('alternatives', models.JSONField(blank=True, default=list, help_text='[content, mimetype] pairs')),
+                ('attachments', models.JSONField(blank=True, default=list, help_text='[filename, base64 content, mimetype]')),
+                ('status', models.CharField(choices=[('P', 'Pending'), ('S', 'Sent'), ('F', 'Failed')], default='P', max_length=1)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Not sent before this time')),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'P')), fields=['available_at', 'id'], name='email_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0002_queuedemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedemail',
+            name='content_subtype',
+            field=models.CharField(default='plain', help_text='MIME subtype of the body', max_length=30),
+        ),
+        migrations.AddField(
+            model_name='queuedemail',
+            name='mixed_subtype',
+            field=models.CharField(default='mixed', max_length=30),
+        ),
+    ]
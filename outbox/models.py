@@ -0,0 +1,86 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    """
+    A domain event written in the same transaction as the change it
+    describes, delivered afterwards to its handlers by ``dispatch_outbox``.
+    Events of one aggregate are delivered in id order.
+    """
+    PENDING = "P"
+    DONE = "D"
+    FAILED = "F"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (DONE, "Delivered"),
+        (FAILED, "Failed"),
+    ]
+
+    topic = models.CharField(max_length=64)
+    aggregate_type = models.CharField(max_length=100)
+    aggregate_id = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not delivered before this time")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["available_at", "id"], condition=models.Q(status="P"),
+                         name="outbox_pending_idx"),
+            models.Index(fields=["aggregate_type", "aggregate_id", "id"], condition=models.Q(status="P"),
+                         name="outbox_aggregate_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} {self.aggregate_type}#{self.aggregate_id}"
+
+
+class QueuedEmail(models.Model):
+    """
+    An email accepted by ``QueuedEmailBackend`` and waiting for
+    ``send_queued_mail`` to deliver it through the real backend.
+    """
+    PENDING = "P"
+    SENT = "S"
+    FAILED = "F"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    subject = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    content_subtype = models.CharField(max_length=30, default="plain", help_text="MIME subtype of the body")
+    mixed_subtype = models.CharField(max_length=30, default="mixed")
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    alternatives = models.JSONField(default=list, blank=True, help_text="[content, mimetype] pairs")
+    attachments = models.JSONField(default=list, blank=True, help_text="[filename, base64 content, mimetype]")
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not sent before this time")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["available_at", "id"], condition=models.Q(status="P"),
+                         name="email_pending_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject[:30]} -> {', '.join(self.to)}"
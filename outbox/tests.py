@@ -0,0 +1,191 @@
+import socketserver
+import threading
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from authentication.models import CustomUser, UserProfile
+from outbox import bus
+from outbox.mail import claim, send_queued
+from outbox.models import OutboxEvent, QueuedEmail
+
+
+class OutboxDispatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email="outbox@example.com", password="x")
+        cls.first = UserProfile.objects.create(user=user, role="PM")
+        cls.second = UserProfile.objects.create(
+            user=CustomUser.objects.create_user(email="outbox2@example.com", password="x"), role="PM")
+
+    def setUp(self):
+        self.calls = []
+        self.failing = set()
+        saved = dict(bus._handlers)
+        self.addCleanup(lambda: (bus._handlers.clear(), bus._handlers.update(saved)))
+        bus._handlers.clear()
+
+        @bus.subscribe("test.event")
+        def record(event):
+            if event.payload["n"] in self.failing:
+                raise RuntimeError("boom")
+            self.calls.append(event.payload["n"])
+
+    def test_delivers_in_order_and_marks_done(self):
+        for n in range(3):
+            bus.publish("test.event", self.first, n=n)
+        self.assertEqual(bus.dispatch(), (3, 0))
+        self.assertEqual(self.calls, [0, 1, 2])
+        self.assertFalse(OutboxEvent.objects.exclude(status=OutboxEvent.DONE).exists())
+
+    def test_failure_backs_off_and_holds_later_events_of_the_aggregate(self):
+        bus.publish("test.event", self.first, n=1)
+        bus.publish("test.event", self.first, n=2)
+        bus.publish("test.event", self.second, n=3)
+        self.failing = {1}
+
+        with self.assertLogs("outbox.bus", "ERROR"):
+            self.assertEqual(bus.dispatch(), (1, 1))
+        self.assertEqual(self.calls, [3])
+        failed = OutboxEvent.objects.get(payload__n=1)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn("boom", failed.last_error)
+        self.assertGreater(failed.available_at, timezone.now())
+
+        self.failing = set()
+        OutboxEvent.objects.filter(pk=failed.pk).update(available_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(bus.dispatch(), (2, 0))
+        self.assertEqual(self.calls, [3, 1, 2])
+
+    def test_gives_up_after_max_attempts(self):
+        bus.publish("test.event", self.first, n=1)
+        self.failing = {1}
+        with self.assertLogs("outbox.bus", "ERROR"):
+            bus.dispatch(max_attempts=1)
+        self.assertEqual(OutboxEvent.objects.get().status, OutboxEvent.FAILED)
+
+    def test_command_drains_in_batches(self):
+        for n in range(5):
+            bus.publish("test.event", self.first if n % 2 else self.second, n=n)
+        out = StringIO()
+        call_command("dispatch_outbox", "--batch-size", "2", stdout=out)
+        self.assertIn("Delivered 5 event(s)", out.getvalue())
+        self.assertEqual(sorted(self.calls), [0, 1, 2, 3, 4])
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server recording connections and received messages."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, reject=()):
+        self.connections = 0
+        self.messages = []
+        self.reject = set(reject)  # recipients answered with a permanent error
+        super().__init__(("127.0.0.1", 0), SMTPStubHandler)
+
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stub ready")
+        recipients = []
+        while line := self.rfile.readline().decode().strip():
+            command = line[:4].upper()
+            if command in ("EHLO", "HELO"):
+                self.reply("250 stub")
+            elif command == "RCPT":
+                address = line.split(":", 1)[1].strip("<> ")
+                if address in self.server.reject:
+                    self.reply("550 no such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 ok")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                data = b""
+                while not data.endswith(b"\r\n.\r\n"):
+                    data += self.rfile.readline()
+                self.server.messages.append((recipients, data))
+                recipients = []
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:  # MAIL, RSET, NOOP
+                self.reply("250 ok")
+
+
+@override_settings(EMAIL_BACKEND="outbox.mail.QueuedEmailBackend",
+                   QUEUED_EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend")
+class QueuedEmailTests(TestCase):
+    def setUp(self):
+        self.smtp = SMTPStub(reject={"bounce@example.com"})
+        threading.Thread(target=self.smtp.serve_forever, daemon=True).start()
+        self.addCleanup(self.smtp.server_close)
+        self.addCleanup(self.smtp.shutdown)
+        settings = override_settings(EMAIL_HOST="127.0.0.1", EMAIL_PORT=self.smtp.server_address[1])
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_sending_only_queues(self):
+        message = EmailMultiAlternatives("Verify", "Text", to=["a@example.com"])
+        message.attach_alternative("<p>HTML</p>", "text/html")
+        message.attach("note.txt", "hello", "text/plain")
+        message.send()
+        self.assertEqual(self.smtp.connections, 0)
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.alternatives, [["<p>HTML</p>", "text/html"]])
+        self.assertEqual(email.attachments[0][0], "note.txt")
+
+    def test_html_message_keeps_its_content_subtype(self):
+        message = mail.EmailMessage("Invoice", "<p>Due</p>", to=["html@example.com"])
+        message.content_subtype = "html"
+        message.send()
+        self.assertEqual(send_queued(), (1, 0))
+        (_, data), = self.smtp.messages
+        self.assertIn(b"Content-Type: text/html", data)
+
+    def test_batch_goes_over_one_connection(self):
+        mail.send_mass_mail([(f"Hi {i}", "Body", None, [f"user{i}@example.com"]) for i in range(4)])
+        self.assertEqual(send_queued(), (4, 0))
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual([to for to, _ in self.smtp.messages], [[f"user{i}@example.com"] for i in range(4)])
+        self.assertFalse(QueuedEmail.objects.exclude(status=QueuedEmail.SENT).exists())
+
+    def test_rejected_email_backs_off_then_fails(self):
+        mail.send_mail("Bounce", "Body", None, ["bounce@example.com"])
+        mail.send_mail("Fine", "Body", None, ["fine@example.com"])
+        with self.assertLogs("outbox.mail", "WARNING"):
+            self.assertEqual(send_queued(max_attempts=2), (1, 1))
+        bounced = QueuedEmail.objects.get(subject="Bounce")
+        self.assertEqual((bounced.status, bounced.attempts), (QueuedEmail.PENDING, 1))
+        self.assertGreater(bounced.available_at, timezone.now())
+        self.assertEqual(send_queued(), (0, 0))
+
+        QueuedEmail.objects.filter(pk=bounced.pk).update(available_at=timezone.now())
+        with self.assertLogs("outbox.mail", "WARNING"):
+            send_queued(max_attempts=2)
+        self.assertEqual(QueuedEmail.objects.get(pk=bounced.pk).status, QueuedEmail.FAILED)
+
+    def test_claimed_batch_is_skipped_by_other_workers(self):
+        mail.send_mass_mail([(f"Hi {i}", "Body", None, [f"claim{i}@example.com"]) for i in range(3)])
+        self.assertEqual(len(claim(2)), 2)
+        self.assertEqual([e.subject for e in claim(5)], ["Hi 2"])
+        self.assertEqual(claim(5), [])
+        self.assertEqual(self.smtp.connections, 0)
+
+    def test_command_drains_queue(self):
+        mail.send_mass_mail([(f"Hi {i}", "Body", None, [f"cmd{i}@example.com"]) for i in range(3)])
+        out = StringIO()
+        call_command("send_queued_mail", "--batch-size", "2", stdout=out)
+        self.assertIn("Sent 3 email(s)", out.getvalue())
+        self.assertEqual(self.smtp.connections, 2)
@@ -54,6 +54,7 @@ INSTALLED_APPS = [
     'notifications',
     'manage_client',
     'xero',
+    'outbox',
 
     
 ]
@@ -119,6 +120,21 @@ DATABASES = {
     }
 }
 
+# "notifications" holds the version counters notification long polls wait
+# on, so it must be shared by every process (web workers, dispatch_outbox),
+# have an atomic incr and not touch the database while polls idle: Redis.
+# Anything else fails the notifications.E001 system check
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "notifications": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL", "redis://127.0.0.1:6379/1"),
+        "KEY_PREFIX": "notifications",
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -206,7 +222,16 @@ XERO_REDIRECT_URI = 'http://localhost:8000/accounts/xero/login/callback/'
 # ======================
 # Email Configuration
 # ======================
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Requests only queue emails; `manage.py send_queued_mail --loop` delivers them
+# through QUEUED_EMAIL_BACKEND over one connection per batch
+EMAIL_BACKEND = 'outbox.mail.QueuedEmailBackend'
+QUEUED_EMAIL_BACKEND = os.getenv('QUEUED_EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_TIMEOUT = 30
 
 # Always log emails to console (safe for Render demo)
 ACCOUNT_EMAIL_VERIFICATION = "none"   # No confirmation required
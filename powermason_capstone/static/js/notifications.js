@@ -41,11 +41,109 @@ document.addEventListener("DOMContentLoaded", function () {
         }
     }
 
+    // --- Load the next page when scrolled near the bottom ---
+    let loadingMore = false;
+
+    function escapeHTML(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    function renderNotification(n) {
+        const unread = !n.is_read;
+        return `
+            <div class="border-b border-gray-100 p-4 hover:bg-gray-50 transition-colors
+                ${unread ? 'bg-blue-50 border-l-4 border-l-blue-500' : ''}">
+                <div class="flex justify-between items-start">
+                    <div class="flex-1">
+                        <p class="text-sm text-gray-800 ${unread ? 'font-semibold' : ''}">${escapeHTML(n.message)}</p>
+                        <p class="text-xs text-gray-500 mt-1">${new Date(n.created_at).toLocaleString()}</p>
+                    </div>
+                    ${n.link ? `<a href="${n.open_url}" class="text-blue-600 hover:text-blue-800 text-xs ml-2 flex-shrink-0">View →</a>` : ''}
+                </div>
+            </div>
+        `;
+    }
+
+    async function loadMoreNotifications() {
+        const list = document.getElementById('notificationList');
+        const cursor = list && list.dataset.nextCursor;
+        if (!cursor || loadingMore) return;
+
+        loadingMore = true;
+        try {
+            const response = await fetch(`/notifications/api/inbox/?cursor=${encodeURIComponent(cursor)}`);
+            if (response.ok) {
+                const data = await response.json();
+                list.insertAdjacentHTML('beforeend', data.results.map(renderNotification).join(''));
+                list.dataset.nextCursor = data.next_cursor || '';
+            } else {
+                console.error('Failed to load more notifications');
+            }
+        } catch (error) {
+            console.error('Error loading more notifications:', error);
+        } finally {
+            loadingMore = false;
+        }
+    }
+
+    function onNotificationScroll() {
+        const { scrollTop, scrollHeight, clientHeight } = notificationContent;
+        if (scrollHeight - scrollTop - clientHeight < 80) {
+            loadMoreNotifications();
+        }
+    }
+
+    // --- Long poll for changes and refresh the badge/dropdown ---
+    // Each poll is held only a few seconds; idle polls back off up to
+    // POLL_MAX_DELAY and background tabs wait until they are visible again.
+    const POLL_MIN_DELAY = 1000;
+    const POLL_MAX_DELAY = 30000;
+    let pollDelay = POLL_MIN_DELAY;
+
+    function schedulePoll(cursor, delay) {
+        setTimeout(() => {
+            if (document.hidden) {
+                document.addEventListener("visibilitychange", () => pollNotifications(cursor), { once: true });
+            } else {
+                pollNotifications(cursor);
+            }
+        }, delay);
+    }
+
+    async function pollNotifications(cursor) {
+        try {
+            const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+            const response = await fetch(`/notifications/poll/${query}`);
+            if (!response.ok) throw new Error(`Poll failed: ${response.status}`);
+
+            const data = await response.json();
+            if (data.changed) {
+                pollDelay = POLL_MIN_DELAY;
+                if (dropdown.classList.contains("hidden")) {
+                    setNotificationBadge(data.unread_count);
+                } else {
+                    loadNotifications();
+                }
+            } else if (cursor) {
+                pollDelay = Math.min(pollDelay * 2, POLL_MAX_DELAY);
+            }
+            schedulePoll(data.cursor, cursor ? pollDelay : 0);
+        } catch (error) {
+            console.error('Error polling notifications:', error);
+            pollDelay = POLL_MAX_DELAY;
+            schedulePoll(cursor, pollDelay);
+        }
+    }
+
     // --- Update notification badge ---
     function updateNotificationBadge() {
-        // Count unread notifications (those with blue background)
-        const unreadCount = dropdown.querySelectorAll('.bg-blue-50').length;
-        
+        const list = document.getElementById('notificationList');
+        setNotificationBadge(list ? parseInt(list.dataset.unreadCount, 10) || 0 : 0);
+    }
+
+    function setNotificationBadge(unreadCount) {
         // Remove existing badge
         const existingBadge = toggle.querySelector('span');
         if (existingBadge) {
@@ -160,6 +258,7 @@ document.addEventListener("DOMContentLoaded", function () {
     if (toggle) toggle.addEventListener("click", toggleDropdown);
     if (markAllBtn) markAllBtn.addEventListener("click", markAllAsRead);
     if (clearAllBtn) clearAllBtn.addEventListener("click", clearAllNotifications);
+    if (notificationContent) notificationContent.addEventListener("scroll", onNotificationScroll);
 
     // Close dropdown on click outside
     document.addEventListener("click", closeDropdownOnOutsideClick);
@@ -171,6 +270,7 @@ document.addEventListener("DOMContentLoaded", function () {
         });
     }
 
-    // Load notifications on page load to show initial badge
+    // Load notifications on page load to show initial badge, then wait for changes
     loadNotifications();
+    if (toggle) pollNotifications(null);
 });
\ No newline at end of file
@@ -1,9 +1,12 @@
 from datetime import date, datetime
 
-def calculate_progress(start_date, end_date, today=None):
+def calculate_progress(start_date, end_date, today=None, calendar=None):
     """
     Calculate smooth timeline progress (0–100%) between start_date and end_date.
     Uses partial days for better accuracy.
+
+    When a work calendar (scheduling.utils.work_calendar) is given, only its
+    working days count, so Sundays and holidays don't advance the timeline.
     """
     if not start_date or not end_date or start_date >= end_date:
         return 0.0
@@ -12,12 +15,19 @@ def calculate_progress(start_date, end_date, today=None):
     if today is None:
         today = datetime.now().date()
 
-    total_days = (end_date - start_date).days
+    if calendar is not None:
+        total_days = calendar.working_days_between(start_date, end_date)
+        if today <= start_date:
+            elapsed_days = 0
+        else:
+            elapsed_days = calendar.working_days_between(start_date, min(today, end_date))
+    else:
+        total_days = (end_date - start_date).days
+        elapsed_days = (today - start_date).days
+
     if total_days <= 0:
         return 0.0
 
-    elapsed_days = (today - start_date).days
-
     # Smooth percentage
     progress = (elapsed_days / total_days) * 100
 
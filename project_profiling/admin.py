@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ProjectProfile, ProjectBudget, ProjectCost, ProjectStaging, ProjectType, Expense
+from .models import ProjectProfile, ProjectBudget, ProjectCost, ProjectStaging, ProjectType, Expense, BudgetLedgerEntry
 
 @admin.register(ProjectProfile)
 class ProjectProfileAdmin(admin.ModelAdmin):
@@ -30,6 +30,22 @@ class ProjectBudgetAdmin(admin.ModelAdmin):
     ordering = ("project", "category")
 
 
+@admin.register(BudgetLedgerEntry)
+class BudgetLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ("budget", "entry_type", "allocated_delta", "spent_delta",
+                    "allocated_balance", "spent_balance", "entry_date", "created_at")
+    list_filter = ("entry_type", "entry_date")
+    search_fields = ("budget__project__project_name",)
+    ordering = ("-id",)
+
+    # Append-only: entries are written by the allocation/expense signals
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(ProjectCost)
 class ProjectCostAdmin(admin.ModelAdmin):
     list_display = ("project", "category", "description", "amount", "date_incurred", "linked_task", "created_at")
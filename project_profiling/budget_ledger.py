@@ -0,0 +1,190 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import BudgetLedgerEntry, Expense, FundAllocation, ProjectBudget
+
+ZERO = Decimal("0")
+
+
+def record_entry(budget_id, entry_type, allocated=ZERO, spent=ZERO, allocation=None, expense=None):
+    """
+    Move the budget's ``allocated_total``/``spent_total`` by the given
+    deltas and append a ledger entry with the new balances. The budget row
+    is locked first, so concurrent writers apply their deltas one at a time.
+    Every entry is dated the day it is booked (not the allocation or
+    expense date), so entry dates follow the running balances.
+    Returns None if the budget no longer exists.
+    """
+    allocated, spent = Decimal(allocated), Decimal(spent)
+    with transaction.atomic():
+        current = lock_totals(budget_id)
+        if current is None:
+            return None
+        ProjectBudget.objects.filter(pk=budget_id).update(
+            allocated_total=F("allocated_total") + allocated,
+            spent_total=F("spent_total") + spent,
+        )
+        return BudgetLedgerEntry.objects.create(
+            budget_id=budget_id,
+            entry_type=entry_type,
+            allocation=allocation,
+            expense=expense,
+            allocated_delta=allocated,
+            spent_delta=spent,
+            allocated_balance=current[0] + allocated,
+            spent_balance=current[1] + spent,
+        )
+
+
+def lock_totals(budget_id):
+    """
+    ``(allocated_total, spent_total)`` of a budget with its row locked
+    until the surrounding transaction ends (None if it doesn't exist).
+    """
+    return lock_totals_map([budget_id]).get(budget_id)
+
+
+def lock_totals_map(budget_ids):
+    """``{budget_id: (allocated_total, spent_total)}`` for many budgets, rows locked."""
+    return {
+        pk: (allocated, spent)
+        for pk, allocated, spent in ProjectBudget.objects.select_for_update()
+        .filter(pk__in=budget_ids).order_by("pk")
+        .values_list("pk", "allocated_total", "spent_total")
+    }
+
+
+# ----------------------------------------
+# FundAllocation events
+# ----------------------------------------
+def allocation_changed(allocation, previous):
+    """
+    Record what a saved allocation changed. ``previous`` is the
+    ``(budget_id, amount, is_deleted)`` it had before the save, or None if
+    it was just created.
+    """
+    if previous is None:
+        if not allocation.is_deleted:
+            record_entry(allocation.project_budget_id, "AL", allocated=allocation.amount,
+                         allocation=allocation)
+        return
+
+    old_budget, old_amount, old_deleted = previous
+    if old_deleted and not allocation.is_deleted:
+        record_entry(allocation.project_budget_id, "AR", allocated=allocation.amount,
+                     allocation=allocation)
+    elif not old_deleted and allocation.is_deleted:
+        record_entry(old_budget, "AD", allocated=-old_amount, allocation=allocation)
+    elif not allocation.is_deleted:
+        if old_budget != allocation.project_budget_id:
+            record_entry(old_budget, "AA", allocated=-old_amount, allocation=allocation)
+            record_entry(allocation.project_budget_id, "AA", allocated=allocation.amount,
+                         allocation=allocation)
+        elif old_amount != allocation.amount:
+            record_entry(allocation.project_budget_id, "AA",
+                         allocated=allocation.amount - old_amount, allocation=allocation)
+
+
+def allocation_removed(allocation):
+    """Permanently deleting an active allocation takes its amount back out."""
+    if not allocation.is_deleted:
+        record_entry(allocation.project_budget_id, "AD", allocated=-allocation.amount)
+
+
+# ----------------------------------------
+# Expense events
+# ----------------------------------------
+def expense_changed(expense, previous):
+    """Same as ``allocation_changed`` with ``previous = (budget_id, amount)``."""
+    if previous is None:
+        record_entry(expense.budget_category_id, "EX", spent=expense.amount, expense=expense)
+        return
+
+    old_budget, old_amount = previous
+    if old_budget != expense.budget_category_id:
+        record_entry(old_budget, "EA", spent=-old_amount, expense=expense)
+        record_entry(expense.budget_category_id, "EA", spent=expense.amount, expense=expense)
+    elif old_amount != Decimal(expense.amount):
+        record_entry(expense.budget_category_id, "EA",
+                     spent=Decimal(expense.amount) - old_amount, expense=expense)
+
+
+def expense_removed(expense):
+    record_entry(expense.budget_category_id, "ED", spent=-expense.amount)
+
+
+def record_expense_batch(expenses):
+    """
+    Ledger entries and totals for expenses saved with ``bulk_create``, which
+    sends no signals: one locked read for all their budgets, one F() update
+    per budget and a single bulk insert of entries.
+    """
+    by_budget = defaultdict(list)
+    for expense in expenses:
+        by_budget[expense.budget_category_id].append(expense)
+    if not by_budget:
+        return []
+
+    with transaction.atomic():
+        current = lock_totals_map(list(by_budget))
+        entries = []
+        for budget_id, items in by_budget.items():
+            allocated, spent = current[budget_id]
+            for expense in items:
+                spent += expense.amount
+                entries.append(BudgetLedgerEntry(
+                    budget_id=budget_id,
+                    entry_type="EX",
+                    expense=expense,
+                    spent_delta=expense.amount,
+                    allocated_balance=allocated,
+                    spent_balance=spent,
+                ))
+            ProjectBudget.objects.filter(pk=budget_id).update(
+                spent_total=F("spent_total") + sum(e.amount for e in items)
+            )
+        return BudgetLedgerEntry.objects.bulk_create(entries, batch_size=500)
+
+
+def actual_totals(budget_ids=None):
+    """
+    ``{budget_id: (allocated, spent)}`` recomputed from active allocations
+    and expenses with one grouped query each.
+    """
+    allocations = FundAllocation.objects.all()
+    expenses = Expense.objects.all()
+    if budget_ids is not None:
+        allocations = allocations.filter(project_budget_id__in=budget_ids)
+        expenses = expenses.filter(budget_category_id__in=budget_ids)
+    allocated = dict(
+        allocations.values("project_budget_id").annotate(total=Sum("amount"))
+        .values_list("project_budget_id", "total")
+    )
+    spent = dict(
+        expenses.values("budget_category_id").annotate(total=Sum("amount"))
+        .values_list("budget_category_id", "total")
+    )
+    return {
+        budget_id: (allocated.get(budget_id) or ZERO, spent.get(budget_id) or ZERO)
+        for budget_id in set(allocated) | set(spent)
+    }
+
+
+def reconcile_budget(budget_id, dry_run=False):
+    """
+    Compare a budget's stored totals with its allocations and expenses and,
+    unless ``dry_run``, book the difference as a reconciliation entry.
+    Returns ``(allocated_drift, spent_drift)``.
+    """
+    with transaction.atomic():
+        current = lock_totals(budget_id)
+        if current is None:
+            return ZERO, ZERO
+        actual = actual_totals([budget_id]).get(budget_id, (ZERO, ZERO))
+        drift = (actual[0] - current[0], actual[1] - current[1])
+        if any(drift) and not dry_run:
+            record_entry(budget_id, "RC", allocated=drift[0], spent=drift[1])
+        return drift
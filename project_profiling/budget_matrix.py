@@ -0,0 +1,87 @@
+from decimal import Decimal
+
+from django.db.models import Max, Sum
+
+from scheduling.models import ProjectScope
+
+from .models import CostCategory
+
+ZERO = Decimal("0")
+FIGURES = ("planned", "allocated", "spent")
+CATEGORY_ORDER = [code for code, _ in CostCategory.choices]
+CATEGORY_LABELS = dict(CostCategory.choices)
+
+
+def _totals(cells):
+    totals = {figure: sum((cell[figure] for cell in cells if cell), ZERO) for figure in FIGURES}
+    totals["remaining"] = totals["planned"] - totals["allocated"]
+    return totals
+
+
+def budget_matrix(project):
+    """
+    Scope x category pivot of a project's budgets: planned, allocated and
+    spent per cell with row (scope), column (category) and grand totals.
+
+    Everything comes from one grouped query over the scopes LEFT JOINed to
+    their budgets' stored totals; scopes without budgets still get a row.
+    ``rows[i]["cells"]`` and ``column_totals`` line up with ``categories``,
+    with None where a scope has no budget for that category.
+    """
+    grouped = (
+        ProjectScope.objects.filter(project=project)
+        .order_by("name", "id")
+        .values("id", "name", "weight", "is_deleted", "budget_categories__category")
+        .annotate(
+            budget_id=Max("budget_categories__id"),
+            category_other=Max("budget_categories__category_other"),
+            planned=Sum("budget_categories__planned_amount"),
+            allocated=Sum("budget_categories__allocated_total"),
+            spent=Sum("budget_categories__spent_total"),
+        )
+    )
+
+    rows = {}
+    for record in grouped:
+        row = rows.setdefault(record["id"], {
+            "scope_id": record["id"],
+            "scope": record["name"],
+            "weight": record["weight"],
+            "is_deleted": record["is_deleted"],
+            "cells": {},
+        })
+        category = record["budget_categories__category"]
+        if category is None:
+            continue
+        label = CATEGORY_LABELS.get(category, category)
+        if category == "OTH" and record["category_other"]:
+            label = f"{label} ({record['category_other']})"
+        planned, allocated, spent = (record[figure] or ZERO for figure in FIGURES)
+        row["cells"][category] = {
+            "budget_id": record["budget_id"],
+            "category": category,
+            "label": label,
+            "planned": planned,
+            "allocated": allocated,
+            "spent": spent,
+            "remaining": planned - allocated,
+        }
+
+    used = {category for row in rows.values() for category in row["cells"]}
+    categories = [code for code in CATEGORY_ORDER if code in used]
+
+    matrix_rows = []
+    for row in rows.values():
+        cells = [row["cells"].get(code) for code in categories]
+        matrix_rows.append({**row, "cells": cells, "totals": _totals(cells)})
+
+    column_totals = [
+        _totals([row["cells"][index] for row in matrix_rows])
+        for index in range(len(categories))
+    ]
+    return {
+        "categories": [{"code": code, "label": CATEGORY_LABELS[code]} for code in categories],
+        "rows": matrix_rows,
+        "column_totals": column_totals,
+        "totals": _totals(column_totals),
+    }
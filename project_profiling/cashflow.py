@@ -0,0 +1,183 @@
+import hashlib
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+
+from scheduling.models import ProjectTask
+
+from .models import Expense, ProjectBudget, ProjectProfile
+
+CACHE_PREFIX = "cash_flow"
+CACHE_TIMEOUT = 60 * 60 * 24
+
+CURVE_CHOICES = [
+    ("linear", "Linear"),
+    ("front", "Front-loaded"),
+    ("s_curve", "S-curve"),
+]
+
+# Cumulative share of a budget spent after fraction t (0..1) of its window
+CURVES = {
+    "linear": lambda t: t,
+    "front": lambda t: 1 - (1 - t) ** 2,
+    "s_curve": lambda t: t * t * (3 - 2 * t),
+}
+
+
+def _month_starts(first, last):
+    """First day of every month from ``first``'s through the month after ``last``'s."""
+    months = [date(first.year, first.month, 1)]
+    while months[-1] <= last:
+        year, month = months[-1].year, months[-1].month
+        months.append(date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1))
+    return months
+
+
+def _version(projects, curve):
+    """
+    Hash of everything the projection depends on: project dates, budget
+    and task changes, and expense totals, read with four small queries.
+    """
+    rows = list(projects.order_by("pk").values_list("pk", "start_date", "target_completion_date"))
+    budgets = ProjectBudget.objects.filter(project__in=projects).aggregate(
+        n=Count("id"), last=Max("updated_at"), total=Sum("planned_amount"))
+    tasks = ProjectTask.objects.filter(project__in=projects, is_archived=False).aggregate(
+        n=Count("id"), last=Max("updated_at"))
+    expenses = Expense.objects.filter(project__in=projects).aggregate(
+        n=Count("id"), last=Max("id"), total=Sum("amount"),
+        first_date=Min("expense_date"), last_date=Max("expense_date"))
+    key = repr((curve, rows, sorted(budgets.items()), sorted(tasks.items()), sorted(expenses.items())))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def _windows(projects):
+    """``{scope_id: (first task start, last task end)}`` over active tasks."""
+    return {
+        scope_id: (start, end)
+        for scope_id, start, end in (
+            ProjectTask.objects.filter(project__in=projects, is_archived=False).order_by()
+            .values_list("scope").annotate(start=Min("start_date"), end=Max("end_date"))
+        )
+    }
+
+
+def _actuals(projects):
+    """``(project_id, month, total)`` of expenses grouped per calendar month."""
+    return (
+        Expense.objects.filter(project__in=projects).order_by()
+        .annotate(month=TruncMonth("expense_date"))
+        .values_list("project_id", "month").annotate(total=Sum("amount"))
+    )
+
+
+def spread(amounts, starts, ends, bounds, curve="linear"):
+    """
+    Spread each amount over its ``[start, end]`` day window (ordinals) and
+    return a ``(len(amounts), len(bounds) - 1)`` array of the part falling
+    between consecutive ``bounds``, shaped by the cumulative ``curve``.
+    """
+    span = np.maximum(ends + 1 - starts, 1)
+    t = np.clip((bounds[None, :] - starts[:, None]) / span[:, None], 0.0, 1.0)
+    return np.diff(CURVES[curve](t), axis=1) * amounts[:, None]
+
+
+def _project(projects, curve):
+    project_rows = {
+        row["pk"]: row for row in projects.values(
+            "pk", "project_id", "project_name", "start_date", "target_completion_date")
+    }
+    windows = _windows(projects)
+
+    scheduled, unscheduled = [], 0.0
+    for project_id, scope_id, planned in (
+        ProjectBudget.objects.filter(project__in=projects).order_by()
+        .values_list("project_id", "scope_id", "planned_amount")
+    ):
+        start, end = windows.get(scope_id) or (
+            project_rows[project_id]["start_date"], project_rows[project_id]["target_completion_date"])
+        if start and end:
+            scheduled.append((project_id, start.toordinal(), max(end, start).toordinal(), float(planned)))
+        else:
+            unscheduled += float(planned)
+
+    actual_rows = [(pid, month, float(total or 0)) for pid, month, total in _actuals(projects) if month]
+
+    days = [d for _, s, e, _ in scheduled for d in (s, e)]
+    days += [month.toordinal() for _, month, _ in actual_rows]
+    result = {
+        "curve": curve,
+        "months": [],
+        "planned": [],
+        "actual": [],
+        "cumulative_planned": [],
+        "cumulative_actual": [],
+        "unscheduled": round(unscheduled, 2),
+        "projects": [],
+    }
+    if not days:
+        return result
+
+    bounds = _month_starts(date.fromordinal(min(days)), date.fromordinal(max(days)))
+    months = bounds[:-1]
+    month_index = {month: i for i, month in enumerate(months)}
+    project_ids = sorted(project_rows)
+    row_index = {pk: i for i, pk in enumerate(project_ids)}
+
+    planned = np.zeros((len(project_ids), len(months)))
+    if scheduled:
+        ids, starts, ends, amounts = (np.array(column) for column in zip(*scheduled))
+        monthly = spread(amounts, starts, ends, np.array([b.toordinal() for b in bounds]), curve)
+        np.add.at(planned, np.array([row_index[pk] for pk in ids]), monthly)
+
+    actual = np.zeros_like(planned)
+    for project_id, month, total in actual_rows:
+        actual[row_index[project_id], month_index[month]] += total
+
+    total_planned = planned.sum(axis=0)
+    total_actual = actual.sum(axis=0)
+    result.update({
+        "months": [month.strftime("%Y-%m") for month in months],
+        "planned": np.round(total_planned, 2).tolist(),
+        "actual": np.round(total_actual, 2).tolist(),
+        "cumulative_planned": np.round(np.cumsum(total_planned), 2).tolist(),
+        "cumulative_actual": np.round(np.cumsum(total_actual), 2).tolist(),
+    })
+    for pk in project_ids:
+        i = row_index[pk]
+        if not planned[i].any() and not actual[i].any():
+            continue
+        row = project_rows[pk]
+        result["projects"].append({
+            "id": pk,
+            "project_id": row["project_id"],
+            "project_name": row["project_name"],
+            "planned": np.round(planned[i], 2).tolist(),
+            "actual": np.round(actual[i], 2).tolist(),
+            "total_planned": round(float(planned[i].sum()), 2),
+            "total_actual": round(float(actual[i].sum()), 2),
+        })
+    return result
+
+
+def cash_flow(projects=None, curve="linear"):
+    """
+    Monthly cash requirements for ``projects`` (default: all) next to actual
+    expenses. Each budget's ``planned_amount`` is spread over the dates of
+    the active tasks in its scope (the project's start/target dates when the
+    scope has none) along ``curve``; budgets with no dates at all are
+    reported as ``unscheduled``. Cached until the underlying data changes.
+    """
+    if curve not in CURVES:
+        raise ValueError(f"Unknown curve '{curve}'.")
+    if projects is None:
+        projects = ProjectProfile.objects.all()
+
+    key = f"{CACHE_PREFIX}:{_version(projects, curve)}"
+    result = cache.get(key)
+    if result is None:
+        result = _project(projects, curve)
+        cache.set(key, result, CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,80 @@
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import ProjectBudget
+
+MONEY = DecimalField(max_digits=15, decimal_places=2)
+ZERO = Value(Decimal("0"), output_field=MONEY)
+
+# Sort keys accepted by the costing dashboard -> ORM ordering
+SORT_FIELDS = {
+    "project_id": "project_id",
+    "name": "project_name",
+    "status": "status",
+    "planned": "total_planned",
+    "allocated": "total_allocated",
+    "spent": "total_spent",
+    "remaining": "remaining",
+}
+
+
+def _sum_per_project(queryset, project_path, field):
+    """Correlated ``SUM(field)`` of ``queryset`` for the outer project."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{project_path: OuterRef("pk")})
+            .order_by()
+            .values(project_path)
+            .annotate(total=Sum(field))
+            .values("total"),
+            output_field=MONEY,
+        ),
+        ZERO,
+    )
+
+
+def annotate_project_costs(projects):
+    """
+    Annotate each project with ``total_planned``, ``total_allocated``
+    (active allocations only), ``total_spent`` and ``remaining``, summed
+    from the budgets' stored totals with one correlated subquery per figure
+    so the whole page is one query.
+    """
+    budgets = ProjectBudget.objects.all()
+    return projects.annotate(
+        total_planned=_sum_per_project(budgets, "project", "planned_amount"),
+        total_allocated=_sum_per_project(budgets, "project", "allocated_total"),
+        total_spent=_sum_per_project(budgets, "project", "spent_total"),
+    ).annotate(remaining=F("total_planned") - F("total_allocated"))
+
+
+def filter_projects(projects, q=None, status=None, source=None):
+    if q:
+        projects = projects.filter(Q(project_name__icontains=q) | Q(project_id__icontains=q))
+    if status:
+        projects = projects.filter(status=status)
+    if source:
+        projects = projects.filter(project_source=source)
+    return projects
+
+
+def sort_projects(projects, sort):
+    """Order by a whitelisted ``SORT_FIELDS`` key, ``-`` prefix for descending."""
+    key = (sort or "").lstrip("-")
+    if key not in SORT_FIELDS:
+        return projects.order_by("-created_at", "project_name"), ""
+    prefix = "-" if sort.startswith("-") else ""
+    return projects.order_by(f"{prefix}{SORT_FIELDS[key]}", "pk"), sort
+
+
+def costing_totals(annotated_projects):
+    """Grand totals over an annotated queryset in a single aggregate."""
+    totals = annotated_projects.aggregate(
+        planned=Coalesce(Sum("total_planned"), ZERO),
+        allocated=Coalesce(Sum("total_allocated"), ZERO),
+        spent=Coalesce(Sum("total_spent"), ZERO),
+    )
+    totals["remaining"] = totals["planned"] - totals["allocated"]
+    return totals
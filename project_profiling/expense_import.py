@@ -0,0 +1,341 @@
+import csv
+import io
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from openpyxl import load_workbook
+
+from .budget_ledger import lock_totals_map, record_expense_batch
+from .models import CostCategory, Expense, ProjectBudget, ProjectCost, ProjectProfile
+from .signals import recompute_project_expenses
+
+CHUNK_SIZE = 500
+MAX_REPORTED = 1000  # per-row messages kept in the report; counts stay exact
+DATE_FORMATS = ("%m/%d/%Y", "%Y/%m/%d", "%d-%b-%Y", "%b %d, %Y")
+
+CATEGORY_LOOKUP = {
+    key.lower(): code for code, label in CostCategory.choices for key in (code, label)
+}
+EXPENSE_TYPE_LOOKUP = {
+    key.lower(): code for code, label in Expense.EXPENSE_TYPES for key in (code, label)
+}
+
+EXPENSE_COLUMNS = {"category", "amount", "expense_date", "expense_type"}
+COST_COLUMNS = {"category", "amount"}
+
+
+# ----------------------------------------
+# Row readers
+# ----------------------------------------
+def _header(cells):
+    return [str(cell or "").strip().lower().replace(" ", "_") for cell in cells]
+
+
+def _csv_rows(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = _header(next(reader, []))
+        for number, cells in enumerate(reader, start=2):
+            if any(cell.strip() for cell in cells):
+                yield number, dict(zip(header, cells))
+    finally:
+        text.detach()  # leave the caller's file open
+
+
+def _xlsx_rows(fileobj):
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except zipfile.BadZipFile:
+        raise ValueError("The file is not a valid .xlsx workbook.")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = _header(next(rows, ()))
+        for number, cells in enumerate(rows, start=2):
+            if any(cell not in (None, "") for cell in cells):
+                yield number, dict(zip(header, cells))
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, filename):
+    """
+    Yield ``(row_number, {column: value})`` from a CSV or read-only XLSX
+    file one row at a time, so large sheets are never held in memory.
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return _csv_rows(fileobj)
+    if name.endswith(".xlsx"):
+        return _xlsx_rows(fileobj)
+    raise ValueError("Upload a .csv or .xlsx file.")
+
+
+# ----------------------------------------
+# Cell parsing
+# ----------------------------------------
+def _text(row, key):
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def _amount(value):
+    try:
+        amount = Decimal(str(value if value is not None else "").replace(",", "").replace("₱", "").strip())
+    except InvalidOperation:
+        raise ValueError("Invalid amount.")
+    if not amount.is_finite() or amount <= 0:
+        raise ValueError("Amount must be greater than zero.")
+    if amount > Decimal("9999999999999.99"):
+        raise ValueError("Amount exceeds the maximum allowed.")
+    return amount.quantize(Decimal("0.01"))
+
+
+def _date(value, required=True):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value or "").strip()
+    if not text:
+        if required:
+            raise ValueError("Date is required.")
+        return timezone.localdate()
+    try:
+        parsed = parse_date(text)
+    except ValueError:
+        parsed = None
+    if parsed:
+        return parsed
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date '{text}'.")
+
+
+def _choice(lookup, value, label):
+    code = lookup.get(str(value or "").strip().lower())
+    if code is None:
+        raise ValueError(f"Unknown {label} '{value}'.")
+    return code
+
+
+class _Lookups:
+    """Project codes and budget categories, each loaded once with one query."""
+
+    def __init__(self, project=None):
+        self.project = project
+        self._projects = None
+        self._budgets = None
+
+    def project_id(self, row):
+        if self.project is not None:
+            return self.project.pk
+        code = _text(row, "project").lower()
+        if not code:
+            raise ValueError("Project is required.")
+        if self._projects is None:
+            self._projects = {
+                project_code.lower(): pk
+                for pk, project_code in ProjectProfile.objects.exclude(project_id=None)
+                .values_list("pk", "project_id")
+            }
+        if code not in self._projects:
+            raise ValueError(f"Unknown project '{code.upper()}'.")
+        return self._projects[code]
+
+    def budget(self, project_id, scope, category):
+        """``(budget_id, label)`` for a scope/category of a project."""
+        if self._budgets is None:
+            budgets = ProjectBudget.objects.select_related("scope")
+            if self.project is not None:
+                budgets = budgets.filter(project=self.project)
+            self._budgets = {}
+            for budget in budgets.only("pk", "project_id", "category", "scope__name"):
+                key = (budget.project_id, budget.category)
+                label = f"{budget.scope.name} > {budget.get_category_display()}"
+                self._budgets.setdefault(key, {})[budget.scope.name.strip().lower()] = (budget.pk, label)
+
+        by_scope = self._budgets.get((project_id, category), {})
+        if scope:
+            match = by_scope.get(scope.lower())
+            if match is None:
+                raise ValueError(f"No '{category}' budget category under scope '{scope}'.")
+            return match
+        if len(by_scope) == 1:
+            return next(iter(by_scope.values()))
+        if not by_scope:
+            raise ValueError(f"No '{category}' budget category for this project.")
+        raise ValueError("Several scopes have this category; fill in the scope column.")
+
+
+# ----------------------------------------
+# Report
+# ----------------------------------------
+def _new_report():
+    return {"rows": 0, "created": 0, "error_count": 0, "warning_count": 0, "errors": [], "warnings": []}
+
+
+def _report_error(report, row, message):
+    report["error_count"] += 1
+    if len(report["errors"]) < MAX_REPORTED:
+        report["errors"].append({"row": row, "error": message})
+
+
+def _report_warning(report, row, message):
+    report["warning_count"] += 1
+    if len(report["warnings"]) < MAX_REPORTED:
+        report["warnings"].append({"row": row, "warning": message})
+
+
+def _missing_columns(row, required):
+    missing = sorted(required - set(row))
+    return f"Missing column(s): {', '.join(missing)}" if missing else None
+
+
+# ----------------------------------------
+# Expenses
+# ----------------------------------------
+def _flush_expenses(pending, labels, report, allow_overspend):
+    """
+    Check a chunk against its categories' locked allocated/spent totals and
+    insert the rows that pass with one ``bulk_create``.
+    """
+    with transaction.atomic():
+        totals = lock_totals_map({expense.budget_category_id for _, expense in pending})
+        spent = {pk: current[1] for pk, current in totals.items()}
+        accepted = []
+        for number, expense in pending:
+            budget_id = expense.budget_category_id
+            if budget_id not in totals:
+                _report_error(report, number, "Budget category no longer exists.")
+                continue
+            allocated = totals[budget_id][0]
+            if allocated == 0:
+                _report_error(report, number, "No allocation found for this category. Please allocate funds first.")
+                continue
+            new_spent = spent[budget_id] + expense.amount
+            if new_spent > allocated:
+                overage = new_spent - allocated
+                if not allow_overspend:
+                    _report_error(report, number, f"{labels[budget_id]} would be over-allocated by ₱{overage:,.2f}.")
+                    continue
+                _report_warning(report, number, f"{labels[budget_id]} over-allocated by ₱{overage:,.2f}.")
+            spent[budget_id] = new_spent
+            accepted.append(expense)
+
+        Expense.objects.bulk_create(accepted)
+        record_expense_batch(accepted)
+    report["created"] += len(accepted)
+
+
+def import_expenses(fileobj, filename, created_by, project=None,
+                    allow_overspend=True, chunk_size=CHUNK_SIZE):
+    """
+    Stream ``Expense`` rows from a CSV/XLSX file and insert them in chunks.
+
+    Columns: ``category``, ``amount``, ``expense_date``, ``expense_type``,
+    plus ``project`` (project code, unless ``project`` is given), ``scope``,
+    ``vendor``, ``receipt_number``, ``description`` and ``expense_other``.
+    Like ``add_expense``, spending past a category's allocation is allowed
+    with a warning unless ``allow_overspend`` is False.
+
+    Returns a report dict with per-row ``errors`` and ``warnings``.
+    """
+    report = _new_report()
+    lookups = _Lookups(project)
+    labels = {}
+    pending = []
+
+    for number, row in read_rows(fileobj, filename):
+        if report["rows"] == 0:
+            missing = _missing_columns(row, EXPENSE_COLUMNS | ({"project"} if project is None else set()))
+            if missing:
+                _report_error(report, 1, missing)
+                return report
+        report["rows"] += 1
+        try:
+            project_id = lookups.project_id(row)
+            category = _choice(CATEGORY_LOOKUP, row.get("category"), "category")
+            budget_id, label = lookups.budget(project_id, _text(row, "scope"), category)
+            expense_type = _choice(EXPENSE_TYPE_LOOKUP, row.get("expense_type"), "expense type")
+            expense = Expense(
+                project_id=project_id,
+                budget_category_id=budget_id,
+                expense_type=expense_type,
+                expense_other=_text(row, "expense_other")[:255] if expense_type == "other" else "",
+                amount=_amount(row.get("amount")),
+                vendor=_text(row, "vendor")[:255],
+                receipt_number=_text(row, "receipt_number")[:100],
+                expense_date=_date(row.get("expense_date")),
+                description=_text(row, "description"),
+                created_by=created_by,
+            )
+        except ValueError as e:
+            _report_error(report, number, str(e))
+            continue
+
+        labels[budget_id] = label
+        pending.append((number, expense))
+        if len(pending) >= chunk_size:
+            _flush_expenses(pending, labels, report, allow_overspend)
+            pending = []
+
+    if pending:
+        _flush_expenses(pending, labels, report, allow_overspend)
+    return report
+
+
+# ----------------------------------------
+# Project costs
+# ----------------------------------------
+def import_costs(fileobj, filename, project=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream ``ProjectCost`` rows (``category``, ``amount``, optional
+    ``project``, ``date_incurred``, ``description``) in chunks, then
+    recompute the expense total of every touched project once.
+    """
+    report = _new_report()
+    lookups = _Lookups(project)
+    touched = set()
+    pending = []
+
+    def flush():
+        ProjectCost.objects.bulk_create(pending)
+        report["created"] += len(pending)
+        pending.clear()
+
+    for number, row in read_rows(fileobj, filename):
+        if report["rows"] == 0:
+            missing = _missing_columns(row, COST_COLUMNS | ({"project"} if project is None else set()))
+            if missing:
+                _report_error(report, 1, missing)
+                return report
+        report["rows"] += 1
+        try:
+            cost = ProjectCost(
+                project_id=lookups.project_id(row),
+                category=_choice(CATEGORY_LOOKUP, row.get("category"), "category"),
+                amount=_amount(row.get("amount")),
+                date_incurred=_date(row.get("date_incurred"), required=False),
+                description=_text(row, "description")[:255] or None,
+            )
+        except ValueError as e:
+            _report_error(report, number, str(e))
+            continue
+
+        touched.add(cost.project_id)
+        pending.append(cost)
+        if len(pending) >= chunk_size:
+            flush()
+
+    if pending:
+        flush()
+    recompute_project_expenses(touched)
+    return report
@@ -0,0 +1,72 @@
+import csv
+from tempfile import SpooledTemporaryFile
+
+from openpyxl import Workbook
+
+from .models import CostCategory, ProjectBudget, ProjectProfile
+
+VARIANCE_HEADER = [
+    "Project ID", "Project", "Status", "Scope", "Category",
+    "Planned", "Allocated", "Spent", "Unallocated", "Variance", "Spent %",
+]
+CATEGORY_LABELS = dict(CostCategory.choices)
+STATUS_LABELS = dict(ProjectProfile.STATUS_CHOICES)
+
+
+def variance_rows(projects=None, chunk_size=2000):
+    """
+    Yield one scope x category row per budget across ``projects`` (default:
+    all), read with a single query over the budgets' stored totals and
+    fetched in chunks so memory does not grow with the portfolio.
+    """
+    budgets = ProjectBudget.objects.all()
+    if projects is not None:
+        budgets = budgets.filter(project__in=projects)
+    rows = budgets.order_by("project__project_name", "project_id", "scope__name", "category").values_list(
+        "project__project_id", "project__project_name", "project__status",
+        "scope__name", "category", "category_other",
+        "planned_amount", "allocated_total", "spent_total",
+    )
+    for code, name, status, scope, category, other, planned, allocated, spent in rows.iterator(chunk_size=chunk_size):
+        label = CATEGORY_LABELS.get(category, category)
+        if category == "OTH" and other:
+            label = f"{label} ({other})"
+        yield [
+            code or "", name, STATUS_LABELS.get(status, status), scope, label,
+            planned, allocated, spent,
+            planned - allocated,
+            planned - spent,
+            round(spent / planned * 100, 2) if planned else None,
+        ]
+
+
+class _Echo:
+    """File-like object whose ``write`` hands back the line for streaming."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, header=VARIANCE_HEADER):
+    writer = csv.writer(_Echo())
+    yield "\ufeff"  # BOM so Excel opens the file as UTF-8
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(["" if value is None else value for value in row])
+
+
+def write_xlsx(rows, header=VARIANCE_HEADER, title="Budget Variance"):
+    """
+    Write rows to an XLSX file with openpyxl's write-only mode (rows go to
+    disk as they are added) and return the file rewound for streaming.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+
+    out = SpooledTemporaryFile(max_size=5 * 1024 * 1024)
+    workbook.save(out)
+    out.seek(0)
+    return out
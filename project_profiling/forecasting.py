@@ -0,0 +1,199 @@
+import hashlib
+from collections import defaultdict
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, DateTimeField, IntegerField, Max, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from .costing import MONEY
+from .models import CostCategory, Expense, ProjectBudget, ProjectCost, ProjectProfile
+
+CACHE_PREFIX = "cost_forecast"
+CACHE_TIMEOUT = 60 * 60 * 24
+BURN_WINDOW_DAYS = 90  # recent days used to fit the burn rate
+
+CATEGORY_LABELS = dict(CostCategory.choices)
+
+
+def _per_project(model, aggregate, output_field):
+    return Subquery(
+        model.objects.filter(project=OuterRef("pk"))
+        .order_by().values("project").annotate(value=aggregate).values("value"),
+        output_field=output_field,
+    )
+
+
+def _project_rows(projects, today):
+    """
+    One query for every project's forecast inputs plus a data version that
+    changes whenever one of its expenses, costs or budget lines is added,
+    removed or edited (``updated_at`` catches edits that keep the sums).
+    """
+    rows = projects.order_by().annotate(
+        expense_count=_per_project(Expense, Count("id"), IntegerField()),
+        expense_last=_per_project(Expense, Max("id"), IntegerField()),
+        expense_sum=_per_project(Expense, Sum("amount"), MONEY),
+        expense_updated=_per_project(Expense, Max("updated_at"), DateTimeField()),
+        cost_count=_per_project(ProjectCost, Count("id"), IntegerField()),
+        cost_last=_per_project(ProjectCost, Max("id"), IntegerField()),
+        cost_sum=_per_project(ProjectCost, Sum("amount"), MONEY),
+        cost_updated=_per_project(ProjectCost, Max("updated_at"), DateTimeField()),
+        planned=_per_project(ProjectBudget, Sum("planned_amount"), MONEY),
+        budget_updated=_per_project(ProjectBudget, Max("updated_at"), DateTimeField()),
+    ).values(
+        "pk", "project_id", "project_name", "progress", "approved_budget", "estimated_cost",
+        "start_date", "target_completion_date", "planned",
+        "expense_count", "expense_last", "expense_sum", "expense_updated",
+        "cost_count", "cost_last", "cost_sum", "cost_updated", "budget_updated",
+    )
+    for row in rows:
+        version = hashlib.md5(repr((sorted(row.items()), today)).encode()).hexdigest()
+        yield row, version
+
+
+def _daily_costs(project_ids):
+    """
+    ``(project, category, day, amount)`` from expenses and project costs,
+    grouped per day in one UNION ALL query.
+    """
+    expenses = (
+        Expense.objects.filter(project_id__in=project_ids).order_by()
+        .values_list("project_id", "budget_category__category", "expense_date")
+        .annotate(total=Sum("amount"))
+    )
+    costs = (
+        ProjectCost.objects.filter(project_id__in=project_ids).order_by()
+        .values_list("project_id", "category", "date_incurred")
+        .annotate(total=Sum("amount"))
+    )
+    return expenses.union(costs, all=True)
+
+
+def _planned_by_category(project_ids):
+    planned = defaultdict(dict)
+    for project_id, category, total in (
+        ProjectBudget.objects.filter(project_id__in=project_ids).order_by()
+        .values_list("project", "category").annotate(total=Sum("planned_amount"))
+    ):
+        planned[project_id][category] = float(total or 0)
+    return planned
+
+
+def burn_rate(cumulative):
+    """Daily spend: slope of a least-squares line through the recent cumulative curve."""
+    window = cumulative[-BURN_WINDOW_DAYS:]
+    if len(window) < 2:
+        return 0.0
+    slope = np.polyfit(np.arange(len(window)), window, 1)[0]
+    return max(float(slope), 0.0)
+
+
+def estimate(actual, rate, bac, progress, remaining_days):
+    """
+    Burn-rate EAC (actual + rate x remaining days) and progress-based EAC
+    (actual / % complete, i.e. BAC / CPI). The progress estimate is used
+    once there is progress to go on, the burn rate before that.
+    """
+    eac_burn = actual + rate * remaining_days
+    eac_progress = actual / (progress / 100) if progress > 0 and actual > 0 else None
+    eac = eac_progress if eac_progress is not None else eac_burn
+    return {
+        "bac": round(bac, 2),
+        "actual": round(actual, 2),
+        "burn_rate": round(rate, 2),
+        "eac_burn_rate": round(eac_burn, 2),
+        "eac_progress": round(eac_progress, 2) if eac_progress is not None else None,
+        "eac": round(eac, 2),
+        "etc": round(max(eac - actual, 0.0), 2),
+        "variance": round(bac - eac, 2),
+        "overrun": bac > 0 and eac > bac,
+        "overrun_amount": round(max(eac - bac, 0.0), 2) if bac > 0 else 0.0,
+    }
+
+
+def _forecast(row, entries, planned, today):
+    """Forecast for one project from its ``(category, ordinal, amount)`` entries."""
+    bac = float(row["approved_budget"] or row["planned"] or row["estimated_cost"] or 0)
+    progress = float(row["progress"] or 0)
+    finish = row["target_completion_date"]
+    remaining_days = max((finish - today).days, 0) if finish else 0
+
+    forecast = {
+        "id": row["pk"],
+        "project_id": row["project_id"],
+        "project_name": row["project_name"],
+        "progress": round(progress, 2),
+        "remaining_days": remaining_days,
+        "categories": [],
+    }
+
+    if entries:
+        days = np.array([day for _, day, _ in entries])
+        amounts = np.array([amount for _, _, amount in entries])
+        first = int(days.min())
+        last = max(int(days.max()), today.toordinal())
+        n_days = last - first + 1
+        cumulative = np.cumsum(np.bincount(days - first, weights=amounts, minlength=n_days))
+    else:
+        cumulative = np.zeros(1)
+
+    forecast.update(estimate(float(cumulative[-1]), burn_rate(cumulative), bac, progress, remaining_days))
+
+    categories = sorted({category for category, _, _ in entries} | set(planned))
+    for category in categories:
+        mask = np.array([c == category for c, _, _ in entries], dtype=bool)
+        if mask.any():
+            cat_cum = np.cumsum(np.bincount(days[mask] - first, weights=amounts[mask], minlength=n_days))
+        else:
+            cat_cum = np.zeros(1)
+        forecast["categories"].append({
+            "category": category,
+            "label": CATEGORY_LABELS.get(category, category),
+            **estimate(float(cat_cum[-1]), burn_rate(cat_cum), planned.get(category, 0.0),
+                       progress, remaining_days),
+        })
+    return forecast
+
+
+def forecast_projects(projects=None):
+    """
+    ``{project pk: forecast}`` for a queryset of projects (default: all).
+    Results are cached per project data version; the stale ones are
+    recomputed together from one cost query and one budget query.
+    """
+    if projects is None:
+        projects = ProjectProfile.objects.all()
+    today = timezone.localdate()
+
+    rows = {row["pk"]: (row, f"{CACHE_PREFIX}:{row['pk']}:{version}")
+            for row, version in _project_rows(projects, today)}
+    cached = cache.get_many([key for _, key in rows.values()])
+    results = {pk: cached[key] for pk, (_, key) in rows.items() if key in cached}
+
+    stale = [pk for pk in rows if pk not in results]
+    if stale:
+        entries = defaultdict(list)
+        for project_id, category, day, total in _daily_costs(stale):
+            if day is not None:
+                entries[project_id].append((category, day.toordinal(), float(total or 0)))
+        planned = _planned_by_category(stale)
+
+        fresh = {
+            pk: _forecast(rows[pk][0], entries.get(pk, []), planned.get(pk, {}), today)
+            for pk in stale
+        }
+        cache.set_many({rows[pk][1]: forecast for pk, forecast in fresh.items()}, CACHE_TIMEOUT)
+        results.update(fresh)
+    return results
+
+
+def portfolio_summary(forecasts):
+    overruns = [f for f in forecasts if f["overrun"]]
+    return {
+        "projects": len(forecasts),
+        "overruns": len(overruns),
+        "bac": round(sum(f["bac"] for f in forecasts), 2),
+        "eac": round(sum(f["eac"] for f in forecasts), 2),
+        "forecast_overrun": round(sum(f["overrun_amount"] for f in overruns), 2),
+    }
@@ -0,0 +1,21 @@
+import random
+
+from authentication.models import UserProfile
+from notifications.utils import notify
+from outbox.bus import subscribe
+
+from .models import ProjectProfile
+
+
+@subscribe("project.approved")
+def notify_project_approved(event):
+    """Let one Operations Manager know an approved project is ready."""
+    project = ProjectProfile.objects.filter(pk=event.aggregate_id).first()
+    oms = list(UserProfile.objects.filter(role="OM"))
+    if project is None or not oms:
+        return
+    notify(
+        f"A new project '{project.project_name}' has been approved.",
+        link=f"/projects/{project.pk}/details/",
+        recipients=[random.choice(oms)],
+    )
@@ -6,6 +6,7 @@ from datetime import timedelta, date
 
 from django.contrib.auth import get_user_model
 from project_profiling.models import ProjectProfile, ProjectBudget, FundAllocation, ProjectCost, CostCategory
+from project_profiling.signals import suspend_expense_updates
 from scheduling.models import ProjectTask
 from authentication.models import UserProfile
 
@@ -33,63 +34,65 @@ class Command(BaseCommand):
 
         categories = [c[0] for c in CostCategory.choices]  # LAB, MAT, EQP, SUB, OTH
 
-        for i in range(1, 11):
-            project_name = f"Dummy Project {i}"
-            start = date.today() - timedelta(days=random.randint(0, 30))
-            end = start + timedelta(days=random.randint(30, 120))
-            status = random.choice(["PL", "OG", "CP", "CN"])
+        # Costs are inserted one by one; recompute project expenses once at the end
+        with suspend_expense_updates():
+            for i in range(1, 11):
+                project_name = f"Dummy Project {i}"
+                start = date.today() - timedelta(days=random.randint(0, 30))
+                end = start + timedelta(days=random.randint(30, 120))
+                status = random.choice(["PL", "OG", "CP", "CN"])
 
-            project = ProjectProfile.objects.create(
-                project_name=project_name,
-                project_manager=dummy_users['PM'],
-                created_by=dummy_users['OM'],
-                assigned_to=dummy_users['EG'],
-                start_date=start,
-                target_completion_date=end,
-                status=status,
-                project_source=random.choice(["GC", "DC"]),
-                project_type=random.choice(["RES", "COM", "IND", "OTH"]),
-                project_category=random.choice(["PUB", "PRI", "REN", "NEW"]),
-                location=f"Dummy Location {i}",
-                estimated_cost=Decimal(random.randint(10000, 100000)),
-                approved_budget=Decimal(random.randint(50000, 150000)),
-            )
-            self.stdout.write(f"Created project: {project_name}")
-
-            # --- Create tasks ---
-            for t in range(random.randint(3, 5)):
-                task_start = start + timedelta(days=random.randint(0, 10))
-                task_end = task_start + timedelta(days=random.randint(5, 20))
-                progress = random.uniform(0, 100)
-
-                ProjectTask.objects.create(
-                    project=project,
-                    task_name=f"Task {t+1} for {project_name}",
-                    start_date=task_start,
-                    end_date=task_end,
-                    progress=round(progress, 2),
-                    weight=random.randint(1, 5),
+                project = ProjectProfile.objects.create(
+                    project_name=project_name,
+                    project_manager=dummy_users['PM'],
+                    created_by=dummy_users['OM'],
                     assigned_to=dummy_users['EG'],
+                    start_date=start,
+                    target_completion_date=end,
+                    status=status,
+                    project_source=random.choice(["GC", "DC"]),
+                    project_type=random.choice(["RES", "COM", "IND", "OTH"]),
+                    project_category=random.choice(["PUB", "PRI", "REN", "NEW"]),
+                    location=f"Dummy Location {i}",
+                    estimated_cost=Decimal(random.randint(10000, 100000)),
+                    approved_budget=Decimal(random.randint(50000, 150000)),
                 )
+                self.stdout.write(f"Created project: {project_name}")
 
-            # --- Create budgets, allocations, and costs ---
-            for cat in categories:
-                planned_amount = Decimal(random.randint(5000, 50000))
-                budget = ProjectBudget.objects.create(
-                    project=project,
-                    category=cat,
-                    planned_amount=planned_amount
-                )
+                # --- Create tasks ---
+                for t in range(random.randint(3, 5)):
+                    task_start = start + timedelta(days=random.randint(0, 10))
+                    task_end = task_start + timedelta(days=random.randint(5, 20))
+                    progress = random.uniform(0, 100)
 
-                FundAllocation.objects.create(
-                    project_budget=budget,
-                    amount=planned_amount * Decimal(random.uniform(0.5, 1.0))
-                )
+                    ProjectTask.objects.create(
+                        project=project,
+                        task_name=f"Task {t+1} for {project_name}",
+                        start_date=task_start,
+                        end_date=task_end,
+                        progress=round(progress, 2),
+                        weight=random.randint(1, 5),
+                        assigned_to=dummy_users['EG'],
+                    )
 
-                ProjectCost.objects.create(
-                    project=project,
-                    category=cat,
-                    amount=planned_amount * Decimal(random.uniform(0.3, 0.9))
-                )
+                # --- Create budgets, allocations, and costs ---
+                for cat in categories:
+                    planned_amount = Decimal(random.randint(5000, 50000))
+                    budget = ProjectBudget.objects.create(
+                        project=project,
+                        category=cat,
+                        planned_amount=planned_amount
+                    )
+
+                    FundAllocation.objects.create(
+                        project_budget=budget,
+                        amount=planned_amount * Decimal(random.uniform(0.5, 1.0))
+                    )
+
+                    ProjectCost.objects.create(
+                        project=project,
+                        category=cat,
+                        amount=planned_amount * Decimal(random.uniform(0.3, 0.9))
+                    )
 
         self.stdout.write(self.style.SUCCESS("\n✅ 10 Dummy Projects Created Successfully!"))
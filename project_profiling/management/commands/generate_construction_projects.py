@@ -16,7 +16,7 @@ from authentication.models import UserProfile
 from project_profiling.models import ProjectType, ProjectProfile, ProjectBudget, FundAllocation, CostCategory
 from scheduling.models import ProjectScope, ProjectTask
 from manage_client.models import Client
-from notifications.models import Notification, NotificationStatus
+from notifications.utils import notify
 
 User = get_user_model()  # This gets your CustomUser model
 fake = Faker(['en_PH'])  # Philippine locale
@@ -514,21 +514,20 @@ class Command(BaseCommand):
         # --- Simulate new project submissions ---
         for project in ProjectProfile.objects.all()[:5]:
             # Notify EGs
-            for eg in egs:
-                notif = Notification.objects.create(
-                    message=(
-                        f"{project.created_by.full_name if hasattr(project, 'created_by') else 'System'} "
-                        f"submitted a new project '{project.project_name}' for approval."
-                    ),
-                    link=reverse("review_staging_project_list"),
-                )
-                NotificationStatus.objects.create(notification=notif, user=eg)
+            notify(
+                (
+                    f"{project.created_by.full_name if hasattr(project, 'created_by') else 'System'} "
+                    f"submitted a new project '{project.project_name}' for approval."
+                ),
+                link=reverse("review_staging_project_list"),
+                recipients=egs,
+            )
 
             # Notify the OM themselves
             if oms.exists():
                 om = random.choice(oms)
-                notif_self = Notification.objects.create(
-                    message=(
+                notify(
+                    (
                         f"You submitted the project '{project.project_name}'. "
                         f"Waiting for approval from Engineers."
                     ),
@@ -538,34 +537,26 @@ class Command(BaseCommand):
                         else "project_list_general_contractor",
                         kwargs={"token": "demo-token", "role": om.role},
                     ),
+                    recipients=[om],
                 )
-                NotificationStatus.objects.create(notification=notif_self, user=om)
 
                 self.stdout.write(f"  ✅ OM notified for {project.project_name}")
 
         # --- Simulate progress report submissions ---
         for task in ProjectTask.objects.all()[:10]:
             # Notify OMs and EGs
-            om_eg_users = UserProfile.objects.filter(role__in=["OM", "EG"])
             notif_message = (
                 f"{task.assigned_to.full_name if hasattr(task, 'assigned_to') else 'System'} "
                 f"submitted a progress report for Project '{task.project.project_name}' "
                 f"(Task: {task.task_name})"
             )
 
-            if om_eg_users.exists():
-                notif = Notification.objects.create(
-                    message=notif_message,
-                    link=reverse("review_updates"),
-                )
-                for user in om_eg_users:
-                    NotificationStatus.objects.create(notification=notif, user=user)
-
+            if notify(notif_message, link=reverse("review_updates"), roles=["OM", "EG"]):
                 # Notify the PM themselves
                 if pms.exists():
                     pm = random.choice(pms)
-                    notif_pm = Notification.objects.create(
-                        message=(
+                    notify(
+                        (
                             f"You submitted a progress report for Project "
                             f"'{task.project.project_name}' (Task: {task.task_name})"
                         ),
@@ -577,8 +568,8 @@ class Command(BaseCommand):
                                 "role": pm.role,
                             },
                         ),
+                        recipients=[pm],
                     )
-                    NotificationStatus.objects.create(notification=notif_pm, user=pm)
 
                     self.stdout.write(
                         f"  📊 PM notified for {task.project.project_name} - {task.task_name}"
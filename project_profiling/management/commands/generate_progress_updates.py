@@ -6,7 +6,7 @@ from django.core.files.base import ContentFile
 
 from scheduling.models import ProjectTask, ProgressUpdate, ProgressFile
 from authentication.models import UserProfile
-from notifications.models import Notification, NotificationStatus
+from notifications.utils import notify_digest
 
 from django.urls import reverse
 
@@ -21,6 +21,7 @@ class Command(BaseCommand):
         pms = UserProfile.objects.filter(role="PM")
         oms = UserProfile.objects.filter(role="OM")
         egs = UserProfile.objects.filter(role="EG")
+        om_eg_count = UserProfile.objects.filter(role__in=["OM", "EG"]).count()
 
         if not pms.exists():
             self.stdout.write(self.style.ERROR("No PM users found! Cannot generate updates."))
@@ -42,27 +43,25 @@ class Command(BaseCommand):
             )
 
             # --- Notify OMs + EGs ---
-            om_eg_users = UserProfile.objects.filter(role__in=["OM", "EG"])
             notif_message = (
                 f"{pm.full_name} submitted a progress report "
                 f"for Project '{task.project.project_name}' (Task: {task.task_name})"
             )
-
-            if om_eg_users.exists():
-                notif = Notification.objects.create(
-                    message=notif_message,
-                    link=reverse("review_updates"),
-                )
-                for user in om_eg_users:
-                    NotificationStatus.objects.create(notification=notif, user=user)
-                    total_notifications += 1
+            if notify_digest(
+                "progress_report", task.project, notif_message,
+                f"{{count}} progress reports submitted for Project '{task.project.project_name}'",
+                link=reverse("review_updates"), roles=["OM", "EG"],
+            ):
+                total_notifications += om_eg_count
 
             # --- Notify the PM themselves ---
-            notif_pm = Notification.objects.create(
-                message=(
+            notify_digest(
+                "progress_report", task.project,
+                (
                     f"You submitted a progress report for Project "
                     f"'{task.project.project_name}' (Task: {task.task_name})"
                 ),
+                f"You submitted {{count}} progress reports for Project '{task.project.project_name}'",
                 link=reverse(
                     "task_list",
                     kwargs={
@@ -71,8 +70,8 @@ class Command(BaseCommand):
                         "role": pm.role,
                     },
                 ),
+                recipients=[pm],
             )
-            NotificationStatus.objects.create(notification=notif_pm, user=pm)
             total_notifications += 1
 
             total_updates += 1
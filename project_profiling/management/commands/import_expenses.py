@@ -0,0 +1,71 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.models import UserProfile
+from project_profiling.expense_import import import_costs, import_expenses
+from project_profiling.models import ProjectProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Import expenses (or project costs) from a CSV or XLSX file in chunks. "
+        "Each chunk commits on its own, so the import is not atomic: if it "
+        "stops part way, the chunks already inserted stay."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to a .csv or .xlsx file.")
+        parser.add_argument("--project", help="Project code (e.g. GC-001) for files without a project column.")
+        parser.add_argument("--user", help="Email of the user recorded as creator of the expenses.")
+        parser.add_argument("--costs", action="store_true",
+                            help="Import ProjectCost rows instead of budget expenses.")
+        parser.add_argument("--strict", action="store_true",
+                            help="Reject expenses that would exceed their category allocation.")
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Rows inserted per batch (default: 500).")
+        parser.add_argument("--report", help="Write per-row errors and warnings to this CSV file.")
+
+    def handle(self, *args, **options):
+        project = None
+        if options["project"]:
+            project = ProjectProfile.objects.filter(project_id__iexact=options["project"]).first()
+            if project is None:
+                raise CommandError(f"Unknown project '{options['project']}'.")
+
+        chunk_size = max(1, options["chunk_size"])
+        try:
+            with open(options["path"], "rb") as fh:
+                if options["costs"]:
+                    report = import_costs(fh, options["path"], project=project, chunk_size=chunk_size)
+                else:
+                    if not options["user"]:
+                        raise CommandError("--user is required when importing expenses.")
+                    created_by = UserProfile.objects.filter(user__email__iexact=options["user"]).first()
+                    if created_by is None:
+                        raise CommandError(f"No user profile for '{options['user']}'.")
+                    report = import_expenses(
+                        fh, options["path"], created_by, project=project,
+                        allow_overspend=not options["strict"], chunk_size=chunk_size,
+                    )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if options["report"]:
+            with open(options["report"], "w", newline="", encoding="utf-8") as out:
+                writer = csv.writer(out)
+                writer.writerow(["row", "level", "message"])
+                for item in report["errors"]:
+                    writer.writerow([item["row"], "error", item["error"]])
+                for item in report["warnings"]:
+                    writer.writerow([item["row"], "warning", item["warning"]])
+        else:
+            for item in report["errors"]:
+                self.stdout.write(self.style.ERROR(f"Row {item['row']}: {item['error']}"))
+            for item in report["warnings"]:
+                self.stdout.write(self.style.WARNING(f"Row {item['row']}: {item['warning']}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} of {report['rows']} row(s); "
+            f"{report['error_count']} error(s), {report['warning_count']} warning(s)."
+        ))
@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from project_profiling.budget_ledger import actual_totals, reconcile_budget
+from project_profiling.models import ProjectBudget
+
+
+class Command(BaseCommand):
+    help = "Check ProjectBudget allocated/spent totals against allocations and expenses and fix drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, help="Only check budgets of this project id.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report drift without booking reconciliation entries.")
+
+    def handle(self, *args, **options):
+        budgets = ProjectBudget.objects.all()
+        if options["project"]:
+            budgets = budgets.filter(project_id=options["project"])
+
+        stored = {
+            pk: (allocated, spent)
+            for pk, allocated, spent in budgets.values_list("id", "allocated_total", "spent_total")
+        }
+        actual = actual_totals(list(stored))
+        zero = (Decimal("0"), Decimal("0"))
+        drifted = [pk for pk, totals in stored.items() if actual.get(pk, zero) != totals]
+
+        for pk in drifted:
+            # Re-checked under the row lock: the first pass read without one
+            allocated, spent = reconcile_budget(pk, dry_run=options["dry_run"])
+            if allocated or spent:
+                self.stdout.write(self.style.WARNING(
+                    f"Budget {pk}: allocated off by ₱{allocated:,.2f}, spent off by ₱{spent:,.2f}"
+                ))
+
+        action = "Found" if options["dry_run"] else "Reconciled"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {len(drifted)} drifted budget(s) out of {len(stored)} checked."
+        ))
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0007_expense_expense_other'),
+        ('scheduling', '0004_workcalendar_holiday'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectprofile',
+            name='calendar',
+            field=models.ForeignKey(blank=True, help_text='Working days and holidays for this project (default calendar if empty)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='projects', to='scheduling.workcalendar'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0008_projectprofile_calendar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_type', models.CharField(choices=[('OP', 'Opening Balance'), ('AL', 'Allocation'), ('AA', 'Allocation Adjusted'), ('AD', 'Allocation Deleted'), ('AR', 'Allocation Restored'), ('EX', 'Expense'), ('EA', 'Expense Adjusted'), ('ED', 'Expense Deleted')], max_length=2)),
+                ('allocated_delta', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('spent_delta', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('allocated_balance', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('spent_balance', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('entry_date', models.DateField(default=django.utils.timezone.localdate)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('allocation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='project_profiling.fundallocation')),
+                ('budget', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='project_profiling.projectbudget')),
+                ('expense', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='project_profiling.expense')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['budget', '-id'], name='ledger_budget_latest_idx'), models.Index(fields=['budget', 'entry_date'], name='ledger_budget_date_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Sum
+
+
+def open_budget_ledgers(apps, schema_editor):
+    """One opening entry per existing budget with its current figures."""
+    ProjectBudget = apps.get_model("project_profiling", "ProjectBudget")
+    FundAllocation = apps.get_model("project_profiling", "FundAllocation")
+    Expense = apps.get_model("project_profiling", "Expense")
+    BudgetLedgerEntry = apps.get_model("project_profiling", "BudgetLedgerEntry")
+
+    allocated = dict(
+        FundAllocation.objects.filter(is_deleted=False)
+        .values("project_budget_id").annotate(total=Sum("amount"))
+        .values_list("project_budget_id", "total")
+    )
+    spent = dict(
+        Expense.objects.values("budget_category_id").annotate(total=Sum("amount"))
+        .values_list("budget_category_id", "total")
+    )
+    BudgetLedgerEntry.objects.bulk_create([
+        BudgetLedgerEntry(
+            budget_id=budget_id,
+            entry_type="OP",
+            allocated_delta=allocated.get(budget_id) or Decimal("0"),
+            spent_delta=spent.get(budget_id) or Decimal("0"),
+            allocated_balance=allocated.get(budget_id) or Decimal("0"),
+            spent_balance=spent.get(budget_id) or Decimal("0"),
+        )
+        for budget_id in ProjectBudget.objects.values_list("id", flat=True)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0009_budgetledgerentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(open_budget_ledgers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:32
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_ledger_balances(apps, schema_editor):
+    """Seed the new columns from each budget's latest ledger entry."""
+    ProjectBudget = apps.get_model("project_profiling", "ProjectBudget")
+    BudgetLedgerEntry = apps.get_model("project_profiling", "BudgetLedgerEntry")
+
+    latest = BudgetLedgerEntry.objects.filter(budget=OuterRef("pk")).order_by("-id")
+    ProjectBudget.objects.filter(ledger_entries__isnull=False).update(
+        allocated_total=Subquery(latest.values("allocated_balance")[:1]),
+        spent_total=Subquery(latest.values("spent_balance")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0010_open_budget_ledgers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectbudget',
+            name='allocated_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='projectbudget',
+            name='spent_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=15),
+        ),
+        migrations.AlterField(
+            model_name='budgetledgerentry',
+            name='entry_type',
+            field=models.CharField(choices=[('OP', 'Opening Balance'), ('AL', 'Allocation'), ('AA', 'Allocation Adjusted'), ('AD', 'Allocation Deleted'), ('AR', 'Allocation Restored'), ('EX', 'Expense'), ('EA', 'Expense Adjusted'), ('ED', 'Expense Deleted'), ('RC', 'Reconciliation')], max_length=2),
+        ),
+        migrations.RunPython(copy_ledger_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0011_projectbudget_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fundallocation',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['project_budget', '-date_allocated'], name='alloc_active_budget_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fundallocation',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['project_budget', '-deleted_at'], name='alloc_deleted_budget_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 05:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0012_fundallocation_active_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='projectcost',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -46,6 +46,7 @@ class Expense(models.Model):
     expense_date = models.DateField()
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
     
     class Meta:
@@ -127,6 +128,14 @@ class ProjectProfile(models.Model):
     start_date = models.DateField(blank=True, null=True)
     target_completion_date = models.DateField(blank=True, null=True)
     actual_completion_date = models.DateField(blank=True, null=True)
+    calendar = models.ForeignKey(
+        "scheduling.WorkCalendar",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="projects",
+        help_text="Working days and holidays for this project (default calendar if empty)",
+    )
 
     # ----------------------------
     # 6. Financials
@@ -283,9 +292,17 @@ class ProjectBudget(models.Model):
     category_other = models.CharField(max_length=255, blank=True, null=True, help_text="Specify if category is Other")
     
     planned_amount = models.DecimalField(max_digits=15, decimal_places=2)
+
+    # Running totals, only ever changed by budget_ledger.record_entry with
+    # F() updates while the row is locked
+    allocated_total = models.DecimalField(max_digits=15, decimal_places=2, default=0, editable=False)
+    spent_total = models.DecimalField(max_digits=15, decimal_places=2, default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    TOTAL_FIELDS = ("allocated_total", "spent_total")
+
     class Meta:
         unique_together = ['scope', 'category']  # Prevent duplicate scope-category combinations
         ordering = ['scope__name', 'category']
@@ -293,10 +310,25 @@ class ProjectBudget(models.Model):
     def __str__(self):
         return f"[BUDGET] {self.scope.name} > {self.get_category_display()} (₱{self.planned_amount:,.2f})"
 
+    def save(self, *args, **kwargs):
+        # A plain save of an instance loaded earlier must not write back
+        # stale totals over a concurrent F() update
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.TOTAL_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def total_allocated(self):
         """Calculate total amount allocated for this budget category"""
-        return self.allocations.aggregate(total=models.Sum('amount'))['total'] or 0
+        return self.allocated_total
+
+    @property
+    def total_spent(self):
+        """Total expenses recorded against this budget category"""
+        return self.spent_total
 
     @property
     def remaining_amount(self):
@@ -315,6 +347,17 @@ class ProjectBudget(models.Model):
         """Check if allocations exceed planned amount"""
         return self.total_allocated > self.planned_amount
 
+    def balance_as_of(self, as_of):
+        """
+        ``(allocated, spent)`` as the ledger stood at the end of ``as_of``:
+        the running balances of the last entry booked on or before it.
+        """
+        latest = (
+            self.ledger_entries.filter(entry_date__lte=as_of).order_by("-id")
+            .values_list("allocated_balance", "spent_balance").first()
+        )
+        return latest or (Decimal("0"), Decimal("0"))
+
 
 
 # 2️⃣ Actual expenditures (linked to tasks if needed)
@@ -331,6 +374,7 @@ class ProjectCost(models.Model):
         null=True
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-date_incurred"]
@@ -338,6 +382,21 @@ class ProjectCost(models.Model):
     def __str__(self):
         return f"[ACTUAL] {self.project.project_name} - {self.get_category_display()} ({self.amount})"
 
+class FundAllocationQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(is_deleted=False)
+
+    def deleted(self):
+        return self.filter(is_deleted=True)
+
+
+class ActiveAllocationManager(models.Manager.from_queryset(FundAllocationQuerySet)):
+    """Default manager: soft-deleted allocations are left out everywhere"""
+
+    def get_queryset(self):
+        return super().get_queryset().active()
+
+
 class FundAllocation(models.Model):
     project_budget = models.ForeignKey(
         "ProjectBudget", 
@@ -350,9 +409,19 @@ class FundAllocation(models.Model):
 
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(blank=True, null=True)
+
+    objects = ActiveAllocationManager()
+    # Includes soft-deleted rows, for the restore UI and the ledger signals
+    all_with_deleted = models.Manager.from_queryset(FundAllocationQuerySet)()
     
     class Meta:
         ordering = ["-date_allocated"]
+        indexes = [
+            models.Index(fields=["project_budget", "-date_allocated"],
+                         condition=models.Q(is_deleted=False), name="alloc_active_budget_idx"),
+            models.Index(fields=["project_budget", "-deleted_at"],
+                         condition=models.Q(is_deleted=True), name="alloc_deleted_budget_idx"),
+        ]
         
     def soft_delete(self):
         self.is_deleted = True
@@ -367,3 +436,48 @@ class FundAllocation(models.Model):
 
     def __str__(self):
         return f"[ALLOC] {self.project_budget.project.project_name} - {self.project_budget.get_category_display()} ({self.amount})"
+
+
+class BudgetLedgerEntry(models.Model):
+    """
+    Append-only history of a budget category's allocations and expenses.
+    Each row stores the change it made and the budget's running totals
+    after it, and is dated the day it was booked, so balances at any date
+    can be read back.
+    """
+    ENTRY_TYPES = [
+        ("OP", "Opening Balance"),
+        ("AL", "Allocation"),
+        ("AA", "Allocation Adjusted"),
+        ("AD", "Allocation Deleted"),
+        ("AR", "Allocation Restored"),
+        ("EX", "Expense"),
+        ("EA", "Expense Adjusted"),
+        ("ED", "Expense Deleted"),
+        ("RC", "Reconciliation"),
+    ]
+
+    budget = models.ForeignKey(ProjectBudget, on_delete=models.CASCADE, related_name="ledger_entries")
+    entry_type = models.CharField(max_length=2, choices=ENTRY_TYPES)
+    allocation = models.ForeignKey(
+        FundAllocation, on_delete=models.SET_NULL, null=True, blank=True, related_name="ledger_entries"
+    )
+    expense = models.ForeignKey(
+        Expense, on_delete=models.SET_NULL, null=True, blank=True, related_name="ledger_entries"
+    )
+    allocated_delta = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    spent_delta = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    allocated_balance = models.DecimalField(max_digits=15, decimal_places=2)
+    spent_balance = models.DecimalField(max_digits=15, decimal_places=2)
+    entry_date = models.DateField(default=timezone.localdate)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["budget", "-id"], name="ledger_budget_latest_idx"),
+            models.Index(fields=["budget", "entry_date"], name="ledger_budget_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"[LEDGER] {self.get_entry_type_display()} #{self.budget_id} (alloc ₱{self.allocated_balance:,.2f})"
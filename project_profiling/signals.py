@@ -1,20 +1,154 @@
 # project_profiling/signals.py
-from django.db.models.signals import post_save, post_delete
+from contextlib import contextmanager
+from decimal import Decimal
+from threading import local
+
+from django.db import transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from .models import ProjectCost, ProjectProfile
+from . import budget_ledger
+from .models import Expense, FundAllocation, ProjectCost, ProjectProfile
+
+_suspended = local()
+
+
+def recompute_project_expenses(project_ids):
+    """Set ``expense`` on each project from one grouped aggregate over its costs."""
+    project_ids = set(project_ids)
+    if not project_ids:
+        return
+    totals = dict(
+        ProjectCost.objects.filter(project_id__in=project_ids)
+        .values("project_id").annotate(total=Sum("amount"))
+        .values_list("project_id", "total")
+    )
+    projects = list(ProjectProfile.objects.filter(pk__in=project_ids).only("pk", "expense"))
+    for project in projects:
+        project.expense = totals.get(project.pk) or Decimal("0")
+    ProjectProfile.objects.bulk_update(projects, ["expense"], batch_size=500)
+
 
 def update_project_expense(project):
     """Recalculate total expenses for a project"""
-    total_expense = sum(cost.amount for cost in project.costs.all())
-    project.expense = total_expense
-    project.save(update_fields=["expense"])
+    recompute_project_expenses([project.pk])
+
+
+@contextmanager
+def suspend_expense_updates():
+    """
+    Turn off the per-cost expense update for bulk imports. Projects whose
+    costs were saved or deleted inside the block are recomputed once, with
+    one aggregate, when it exits. Nested blocks defer to the outermost one.
+    """
+    if getattr(_suspended, "projects", None) is not None:
+        yield _suspended.projects
+        return
+
+    _suspended.projects = touched = set()
+    try:
+        yield touched
+    finally:
+        _suspended.projects = None
+        # Skip when the surrounding transaction is already doomed
+        if not transaction.get_connection().needs_rollback:
+            recompute_project_expenses(touched)
+
+
+def _add_to_expense(project_id, delta):
+    if delta:
+        ProjectProfile.objects.filter(pk=project_id).update(
+            expense=Coalesce(F("expense"), Value(Decimal("0"))) + delta
+        )
+
+
+@receiver(pre_save, sender=ProjectCost)
+def remember_cost_state(sender, instance, **kwargs):
+    instance._expense_previous = (
+        ProjectCost.objects.filter(pk=instance.pk).values_list("project_id", "amount").first()
+        if instance.pk else None
+    )
+
 
 @receiver(post_save, sender=ProjectCost)
 def update_expense_on_save(sender, instance, **kwargs):
-    if instance.project:
-        update_project_expense(instance.project)
+    previous = getattr(instance, "_expense_previous", None)
+    touched = getattr(_suspended, "projects", None)
+    if touched is not None:
+        touched.add(instance.project_id)
+        if previous:
+            touched.add(previous[0])
+        return
+
+    amount = Decimal(str(instance.amount))
+    if previous and previous[0] != instance.project_id:
+        _add_to_expense(previous[0], -previous[1])
+        _add_to_expense(instance.project_id, amount)
+    else:
+        _add_to_expense(instance.project_id, amount - (previous[1] if previous else 0))
+
 
 @receiver(post_delete, sender=ProjectCost)
 def update_expense_on_delete(sender, instance, **kwargs):
-    if instance.project:
-        update_project_expense(instance.project)
+    touched = getattr(_suspended, "projects", None)
+    if touched is not None:
+        touched.add(instance.project_id)
+    else:
+        _add_to_expense(instance.project_id, -Decimal(str(instance.amount)))
+
+
+# ----------------------------------------
+# Budget ledger
+# ----------------------------------------
+def _is_direct_delete(instance, origin):
+    """
+    True when ``instance`` itself (or a queryset of its model) was deleted,
+    not when it goes away because its budget or project was deleted.
+    """
+    origin_model = getattr(origin, "model", type(origin))
+    return origin_model is type(instance)
+
+
+@receiver(pre_save, sender=FundAllocation)
+def remember_allocation_state(sender, instance, **kwargs):
+    instance._ledger_previous = (
+        FundAllocation.all_with_deleted.filter(pk=instance.pk)
+        .values_list("project_budget_id", "amount", "is_deleted")
+        .first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=FundAllocation)
+def ledger_allocation_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        budget_ledger.allocation_changed(instance, getattr(instance, "_ledger_previous", None))
+
+
+@receiver(post_delete, sender=FundAllocation)
+def ledger_allocation_deleted(sender, instance, origin=None, **kwargs):
+    if _is_direct_delete(instance, origin):
+        budget_ledger.allocation_removed(instance)
+
+
+@receiver(pre_save, sender=Expense)
+def remember_expense_state(sender, instance, **kwargs):
+    instance._ledger_previous = (
+        Expense.objects.filter(pk=instance.pk)
+        .values_list("budget_category_id", "amount")
+        .first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Expense)
+def ledger_expense_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        budget_ledger.expense_changed(instance, getattr(instance, "_ledger_previous", None))
+
+
+@receiver(post_delete, sender=Expense)
+def ledger_expense_deleted(sender, instance, origin=None, **kwargs):
+    if _is_direct_delete(instance, origin):
+        budget_ledger.expense_removed(instance)
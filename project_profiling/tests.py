@@ -1,3 +1,443 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from allauth.account.models import EmailAddress
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+
+from authentication.models import CustomUser, UserProfile
+from project_profiling.budget_matrix import budget_matrix
+from project_profiling.cashflow import cash_flow
+from project_profiling.costing import annotate_project_costs, costing_totals, sort_projects
+from project_profiling.expense_import import import_costs, import_expenses
+from project_profiling.exports import stream_csv, variance_rows, write_xlsx
+from project_profiling.forecasting import forecast_projects
+from project_profiling.models import (
+    BudgetLedgerEntry, Expense, FundAllocation, ProjectBudget, ProjectCost, ProjectProfile,
+)
+from project_profiling.signals import suspend_expense_updates
+from scheduling.models import ProjectScope, ProjectTask
+
+
+class ProjectCostingQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email="costing@example.com", password="x")
+        cls.profile = UserProfile.objects.create(user=user, role="OM")
+        cls.projects = []
+        for i, planned in enumerate((Decimal("1000"), Decimal("500"))):
+            project = ProjectProfile.objects.create(
+                project_source="GC", project_name=f"Costing {i}", location="Cebu"
+            )
+            scope = ProjectScope.objects.create(project=project, name="Structural", weight=100)
+            budget = ProjectBudget.objects.create(
+                project=project, scope=scope, category="MAT", planned_amount=planned
+            )
+            FundAllocation.objects.create(project_budget=budget, amount=planned / 2)
+            FundAllocation.objects.create(project_budget=budget, amount=planned, is_deleted=True)
+            Expense.objects.create(
+                project=project, budget_category=budget, expense_type="material",
+                amount=Decimal("100"), expense_date=date(2025, 1, 6), created_by=cls.profile,
+            )
+            cls.projects.append(project)
+
+    def test_annotations_ignore_deleted_allocations(self):
+        row = annotate_project_costs(ProjectProfile.objects.filter(pk=self.projects[0].pk)).get()
+        self.assertEqual(row.total_planned, Decimal("1000"))
+        self.assertEqual(row.total_allocated, Decimal("500"))
+        self.assertEqual(row.total_spent, Decimal("100"))
+        self.assertEqual(row.remaining, Decimal("500"))
+
+    def test_page_and_totals_in_constant_queries(self):
+        projects = annotate_project_costs(ProjectProfile.objects.all())
+        with self.assertNumQueries(2):
+            totals = costing_totals(projects)
+            rows = list(sort_projects(projects, "-planned")[0])
+        self.assertEqual(totals["planned"], Decimal("1500"))
+        self.assertEqual(totals["allocated"], Decimal("750"))
+        self.assertEqual(totals["spent"], Decimal("200"))
+        self.assertEqual([r.pk for r in rows], [p.pk for p in self.projects])
+
+
+class BudgetLedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email="ledger@example.com", password="x")
+        cls.profile = UserProfile.objects.create(user=user, role="OM")
+        cls.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Ledger Test", location="Davao"
+        )
+        scope = ProjectScope.objects.create(project=cls.project, name="Finishing", weight=100)
+        cls.budget = ProjectBudget.objects.create(
+            project=cls.project, scope=scope, category="LAB", planned_amount=Decimal("1000")
+        )
+
+    def fresh_budget(self):
+        return ProjectBudget.objects.get(pk=self.budget.pk)
+
+    def test_allocation_lifecycle_keeps_running_balance(self):
+        a = FundAllocation.objects.create(project_budget=self.budget, amount=Decimal("400"),
+                                          date_allocated=date(2025, 1, 10))
+        FundAllocation.objects.create(project_budget=self.budget, amount=Decimal("300"),
+                                      date_allocated=date(2025, 2, 10))
+        a.soft_delete()
+        self.assertEqual(self.fresh_budget().total_allocated, Decimal("300"))
+        a.restore()
+        budget = self.fresh_budget()
+        self.assertEqual(budget.total_allocated, Decimal("700"))
+        self.assertEqual(budget.remaining_amount, Decimal("300"))
+        self.assertFalse(budget.is_over_budget)
+
+        a.delete()
+        self.assertEqual(self.fresh_budget().total_allocated, Decimal("300"))
+        self.assertEqual(
+            list(self.budget.ledger_entries.values_list("entry_type", flat=True)),
+            ["AL", "AL", "AD", "AR", "AD"],
+        )
+
+    def test_default_manager_hides_soft_deleted(self):
+        kept = FundAllocation.objects.create(project_budget=self.budget, amount=Decimal("250"))
+        trashed = FundAllocation.objects.create(project_budget=self.budget, amount=Decimal("100"))
+        trashed.soft_delete()
+
+        self.assertEqual(list(self.budget.allocations.all()), [kept])
+        self.assertEqual(list(FundAllocation.all_with_deleted.deleted()), [trashed])
+        self.assertEqual(FundAllocation.all_with_deleted.count(), 2)
+
+        trashed.delete()
+        self.assertEqual(self.fresh_budget().total_allocated, Decimal("250"))
+
+    def test_expenses_and_balance_as_of(self):
+        FundAllocation.objects.create(project_budget=self.budget, amount=Decimal("800"),
+                                      date_allocated=date(2025, 1, 10))
+        expense = Expense.objects.create(
+            project=self.project, budget_category=self.budget, expense_type="labor",
+            amount=Decimal("250"), expense_date=date(2025, 3, 1), created_by=self.profile,
+        )
+        expense.amount = Decimal("200")
+        expense.save()
+        self.assertEqual(self.fresh_budget().total_spent, Decimal("200"))
+
+        # Every entry is dated the day it is booked, whatever the business date
+        today = timezone.localdate()
+        self.assertEqual(set(self.budget.ledger_entries.values_list("entry_date", flat=True)), {today})
+        self.assertEqual(self.budget.balance_as_of(today), (Decimal("800"), Decimal("200")))
+        self.assertEqual(self.budget.balance_as_of(today - timedelta(days=1)), (Decimal("0"), Decimal("0")))
+
+    def test_budget_with_only_deleted_allocations_is_kept(self):
+        EmailAddress.objects.create(user=self.profile.user, email=self.profile.user.email, verified=True)
+        self.client.force_login(self.profile.user)
+        FundAllocation.objects.create(project_budget=self.budget, amount=Decimal("300")).soft_delete()
+
+        self.client.post(reverse("delete_budget", args=[self.project.id, self.budget.id]))
+        self.assertTrue(ProjectBudget.objects.filter(pk=self.budget.pk).exists())
+        self.assertEqual(self.budget.ledger_entries.count(), 2)
+
+    def test_totals_are_stored_on_budget(self):
+        FundAllocation.objects.create(project_budget=self.budget, amount=Decimal("1200"))
+        budget = self.fresh_budget()
+        with self.assertNumQueries(0):
+            self.assertTrue(budget.is_over_budget)
+            self.assertEqual(budget.allocation_percentage, Decimal("120"))
+
+    def test_stale_save_keeps_totals(self):
+        stale = self.fresh_budget()
+        FundAllocation.objects.create(project_budget=self.budget, amount=Decimal("300"))
+        stale.planned_amount = Decimal("1500")
+        stale.save()
+        budget = self.fresh_budget()
+        self.assertEqual(budget.planned_amount, Decimal("1500"))
+        self.assertEqual(budget.allocated_total, Decimal("300"))
+
+    def test_reconcile_books_drift(self):
+        FundAllocation.objects.create(project_budget=self.budget, amount=Decimal("300"))
+        ProjectBudget.objects.filter(pk=self.budget.pk).update(allocated_total=Decimal("50"))
+        out = StringIO()
+        call_command("reconcile_budget_totals", stdout=out)
+        self.assertIn("Reconciled 1", out.getvalue())
+        self.assertEqual(self.fresh_budget().allocated_total, Decimal("300"))
+        self.assertEqual(self.budget.ledger_entries.last().entry_type, "RC")
+
+    def test_deleting_budget_skips_ledger_entries(self):
+        FundAllocation.objects.create(project_budget=self.budget, amount=Decimal("100"))
+        self.budget.delete()
+        self.assertFalse(BudgetLedgerEntry.objects.exists())
+
+
+class ProjectExpenseSignalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Expense Signal Test", location="Bohol"
+        )
+
+    def expense(self):
+        return ProjectProfile.objects.values_list("expense", flat=True).get(pk=self.project.pk)
+
+    def test_save_and_delete_adjust_by_delta(self):
+        cost = ProjectCost.objects.create(project=self.project, category="MAT", amount=Decimal("100"))
+        ProjectCost.objects.create(project=self.project, category="LAB", amount=Decimal("50"))
+        self.assertEqual(self.expense(), Decimal("150"))
+        cost.amount = Decimal("80")
+        cost.save()
+        self.assertEqual(self.expense(), Decimal("130"))
+        cost.delete()
+        self.assertEqual(self.expense(), Decimal("50"))
+
+    def test_suspended_block_recomputes_once(self):
+        with suspend_expense_updates():
+            for _ in range(3):
+                ProjectCost.objects.create(project=self.project, category="EQP", amount=Decimal("10"))
+            self.assertIsNone(self.expense())
+        self.assertEqual(self.expense(), Decimal("30"))
+
+
+class ExpenseImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email="import@example.com", password="x")
+        cls.profile = UserProfile.objects.create(user=user, role="EG")
+        cls.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Import Expenses", location="Leyte"
+        )
+        scope = ProjectScope.objects.create(project=cls.project, name="Electrical", weight=100)
+        cls.budget = ProjectBudget.objects.create(
+            project=cls.project, scope=scope, category="MAT", planned_amount=Decimal("1000")
+        )
+        FundAllocation.objects.create(project_budget=cls.budget, amount=Decimal("500"))
+
+    def test_csv_rows_are_imported_in_chunks_with_report(self):
+        data = (
+            "Project,Scope,Category,Expense Type,Amount,Expense Date,Vendor\n"
+            f"{self.project.project_id},Electrical,Materials,material,\"1,200.50\",2025-03-01,Acme\n"
+            f"{self.project.project_id},,MAT,labor,100,03/02/2025,\n"
+            f"{self.project.project_id},,MAT,bribe,100,2025-03-03,\n"
+            "XX-999,,MAT,material,100,2025-03-04,\n"
+        ).encode()
+        report = import_expenses(BytesIO(data), "receipts.csv", self.profile, chunk_size=1)
+
+        self.assertEqual((report["rows"], report["created"], report["error_count"]), (4, 2, 2))
+        self.assertEqual([e["row"] for e in report["errors"]], [4, 5])
+        self.assertEqual(report["warning_count"], 2)
+        budget = ProjectBudget.objects.get(pk=self.budget.pk)
+        self.assertEqual(budget.spent_total, Decimal("1300.50"))
+        self.assertEqual(budget.ledger_entries.filter(entry_type="EX").count(), 2)
+
+    def test_strict_import_rejects_overspend(self):
+        data = b"category,expense_type,amount,expense_date\nMAT,material,600,2025-03-01\nMAT,material,400,2025-03-01\n"
+        report = import_expenses(BytesIO(data), "r.csv", self.profile, project=self.project,
+                                 allow_overspend=False)
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(report["errors"][0]["row"], 2)
+
+    def test_xlsx_costs_recompute_project_expense(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["category", "amount", "date_incurred"])
+        sheet.append(["Labor", 150, date(2025, 3, 1)])
+        sheet.append(["EQP", 50, None])
+        buffer = BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        report = import_costs(buffer, "costs.xlsx", project=self.project)
+        self.assertEqual(report["created"], 2)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.expense, Decimal("200"))
+
+    def test_non_zip_xlsx_is_a_value_error(self):
+        with self.assertRaises(ValueError):
+            import_costs(BytesIO(b"category,amount\n"), "costs.xlsx", project=self.project)
+
+
+class CostForecastTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email="forecast@example.com", password="x")
+        cls.profile = UserProfile.objects.create(user=user, role="OM")
+        today = timezone.localdate()
+        cls.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Forecast Test", location="Pampanga",
+            approved_budget=Decimal("1000"), progress=Decimal("25"),
+            start_date=today - timedelta(days=9), target_completion_date=today + timedelta(days=30),
+        )
+        scope = ProjectScope.objects.create(project=cls.project, name="Masonry", weight=100)
+        budget = ProjectBudget.objects.create(
+            project=cls.project, scope=scope, category="MAT", planned_amount=Decimal("1000")
+        )
+        FundAllocation.objects.create(project_budget=budget, amount=Decimal("1000"))
+        for offset in range(10):
+            Expense.objects.create(
+                project=cls.project, budget_category=budget, expense_type="material",
+                amount=Decimal("20"), expense_date=today - timedelta(days=9 - offset),
+                created_by=cls.profile,
+            )
+        ProjectCost.objects.create(project=cls.project, category="LAB", amount=Decimal("100"),
+                                   date_incurred=today)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_burn_rate_and_progress_estimates(self):
+        forecast = forecast_projects(ProjectProfile.objects.filter(pk=self.project.pk))[self.project.pk]
+        self.assertEqual(forecast["actual"], 300.0)
+        self.assertEqual(forecast["eac_progress"], 1200.0)  # 300 spent at 25% done
+        self.assertTrue(forecast["overrun"])
+        self.assertEqual(forecast["overrun_amount"], 200.0)
+        materials = next(c for c in forecast["categories"] if c["category"] == "MAT")
+        self.assertAlmostEqual(materials["burn_rate"], 20.0, places=6)
+        self.assertEqual(materials["eac_burn_rate"], 800.0)
+
+    def test_cached_until_project_data_changes(self):
+        projects = ProjectProfile.objects.filter(pk=self.project.pk)
+        forecast_projects(projects)
+        with self.assertNumQueries(1):  # only the version lookup
+            forecast_projects(projects)
+        ProjectCost.objects.create(project=self.project, category="LAB", amount=Decimal("60"))
+        self.assertEqual(forecast_projects(projects)[self.project.pk]["actual"], 360.0)
+
+    def test_edit_that_keeps_the_totals_refreshes_the_forecast(self):
+        projects = ProjectProfile.objects.filter(pk=self.project.pk)
+        forecast_projects(projects)
+        cost = ProjectCost.objects.get(project=self.project, category="LAB")
+        cost.category = "MAT"
+        cost.save()
+        categories = {c["category"] for c in forecast_projects(projects)[self.project.pk]["categories"]}
+        self.assertNotIn("LAB", categories)
+
+
+class BudgetVarianceExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        project = ProjectProfile.objects.create(
+            project_source="DC", project_name="Export Test", location="Baguio"
+        )
+        scope = ProjectScope.objects.create(project=project, name="Plumbing", weight=100)
+        budget = ProjectBudget.objects.create(
+            project=project, scope=scope, category="OTH", category_other="Permits",
+            planned_amount=Decimal("400"),
+        )
+        FundAllocation.objects.create(project_budget=budget, amount=Decimal("300"))
+
+    def test_rows_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            rows = list(variance_rows())
+        self.assertEqual(rows[0][3:8], ["Plumbing", "Other (Permits)", Decimal("400"), Decimal("300"), Decimal("0")])
+        self.assertEqual(rows[0][8], Decimal("100"))
+
+    def test_csv_and_xlsx_outputs(self):
+        text = "".join(stream_csv(variance_rows()))
+        self.assertTrue(text.startswith("\ufeffProject ID,Project"))
+        self.assertIn("Export Test", text)
+
+        sheet = load_workbook(write_xlsx(variance_rows())).active
+        self.assertEqual(sheet.max_row, 2)
+        self.assertEqual(sheet.cell(row=2, column=6).value, 400)
+
+
+class BudgetMatrixTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Matrix Test", location="Iloilo"
+        )
+        civil = ProjectScope.objects.create(project=cls.project, name="Civil", weight=60)
+        electrical = ProjectScope.objects.create(project=cls.project, name="Electrical", weight=40)
+        ProjectScope.objects.create(project=cls.project, name="Landscaping", weight=0)
+        cls.civil_mat = ProjectBudget.objects.create(
+            project=cls.project, scope=civil, category="MAT", planned_amount=Decimal("1000")
+        )
+        ProjectBudget.objects.create(
+            project=cls.project, scope=civil, category="LAB", planned_amount=Decimal("400")
+        )
+        ProjectBudget.objects.create(
+            project=cls.project, scope=electrical, category="MAT", planned_amount=Decimal("600")
+        )
+        FundAllocation.objects.create(project_budget=cls.civil_mat, amount=Decimal("700"))
+
+    def test_pivot_and_totals_in_one_query(self):
+        with self.assertNumQueries(1):
+            matrix = budget_matrix(self.project)
+
+        self.assertEqual([c["code"] for c in matrix["categories"]], ["LAB", "MAT"])
+        civil, electrical, landscaping = matrix["rows"]
+        self.assertEqual(civil["cells"][1]["budget_id"], self.civil_mat.pk)
+        self.assertEqual(civil["cells"][1]["allocated"], Decimal("700"))
+        self.assertEqual(civil["totals"]["planned"], Decimal("1400"))
+        self.assertIsNone(electrical["cells"][0])
+        self.assertEqual(landscaping["cells"], [None, None])
+        self.assertEqual(landscaping["totals"]["planned"], Decimal("0"))
+        self.assertEqual([t["planned"] for t in matrix["column_totals"]], [Decimal("400"), Decimal("1600")])
+        self.assertEqual(matrix["totals"]["planned"], Decimal("2000"))
+        self.assertEqual(matrix["totals"]["remaining"], Decimal("1300"))
+
+
+class CashFlowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email="cashflow@example.com", password="x")
+        profile = UserProfile.objects.create(user=user, role="OM")
+        cls.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Cash Flow Test", location="Batangas",
+            start_date=date(2025, 3, 1), target_completion_date=date(2025, 3, 31),
+        )
+        civil = ProjectScope.objects.create(project=cls.project, name="Civil", weight=80)
+        electrical = ProjectScope.objects.create(project=cls.project, name="Electrical", weight=20)
+        ProjectTask.objects.create(
+            project=cls.project, scope=civil, task_name="Excavation",
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 31), weight=50,
+        )
+        ProjectTask.objects.create(
+            project=cls.project, scope=civil, task_name="Foundation",
+            start_date=date(2025, 2, 1), end_date=date(2025, 2, 28), weight=50,
+        )
+        civil_mat = ProjectBudget.objects.create(
+            project=cls.project, scope=civil, category="MAT", planned_amount=Decimal("590")
+        )
+        # No tasks in this scope: spread over the project's dates instead
+        ProjectBudget.objects.create(
+            project=cls.project, scope=electrical, category="EQP", planned_amount=Decimal("100")
+        )
+        FundAllocation.objects.create(project_budget=civil_mat, amount=Decimal("590"))
+        Expense.objects.create(
+            project=cls.project, budget_category=civil_mat, expense_type="material",
+            amount=Decimal("50"), expense_date=date(2025, 2, 14), created_by=profile,
+        )
+
+        undated = ProjectProfile.objects.create(project_source="GC", project_name="Undated", location="Laguna")
+        scope = ProjectScope.objects.create(project=undated, name="General", weight=100)
+        ProjectBudget.objects.create(project=undated, scope=scope, category="LAB", planned_amount=Decimal("75"))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_linear_spread_by_scope_task_dates(self):
+        result = cash_flow(ProjectProfile.objects.all())
+        self.assertEqual(result["months"], ["2025-01", "2025-02", "2025-03"])
+        self.assertEqual(result["planned"], [310.0, 280.0, 100.0])
+        self.assertEqual(result["actual"], [0.0, 50.0, 0.0])
+        self.assertEqual(result["cumulative_planned"][-1], 690.0)
+        self.assertEqual(result["unscheduled"], 75.0)
+        self.assertEqual([p["id"] for p in result["projects"]], [self.project.pk])
+
+    def test_curves_keep_totals_and_shift_timing(self):
+        front = cash_flow(curve="front")
+        s_curve = cash_flow(curve="s_curve")
+        self.assertAlmostEqual(sum(front["planned"]), 690.0, places=2)
+        self.assertAlmostEqual(sum(s_curve["planned"]), 690.0, places=2)
+        self.assertGreater(front["planned"][0], 310.0)
+        self.assertGreater(front["planned"][0], s_curve["planned"][0])
+        with self.assertRaises(ValueError):
+            cash_flow(curve="bell")
 
-# Create your tests here.
+    def test_cached_until_data_changes(self):
+        cash_flow()
+        with self.assertNumQueries(4):
+            cash_flow()
+        Expense.objects.filter(project=self.project).update(amount=Decimal("80"))
+        self.assertEqual(cash_flow()["actual"][1], 80.0)
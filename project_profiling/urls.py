@@ -55,6 +55,7 @@ path('<int:project_id>/scopes/restore/', views.restore_scope, name='restore_scop
 path('<int:project_id>/scopes/<int:scope_id>/edit/', views.edit_scope, name='edit_scope'),
 # Fund Allocation Overview
 path('<int:project_id>/allocate/', views.project_allocate_budget, name='project_allocate_budget'),
+path('<int:project_id>/budget-matrix/', views.budget_matrix_api, name='budget_matrix_api'),
 
 
 # Allocate funds to specific category
@@ -73,12 +74,17 @@ path('<int:project_id>/budgets/<int:budget_id>/allocations/<int:allocation_id>/s
          name='restore_allocation'),
  
  path('<int:project_id>/add-expense/', views.add_expense, name='add_expense'),
+ path('<int:project_id>/expenses/import/', views.import_expenses_upload, name='import_expenses_upload'),
 path('<int:project_id>/categories/<int:category_id>/allocation/', views.get_category_allocation, name='get_category_allocation'),
     # ==============================================
     # DASHBOARD & REPORTING
     # ==============================================
     # Project costing dashboard
     path('<str:token>/costing/<str:role>/', views.project_costing_dashboard, name='project_costing_dashboard'),
+    path('api/cost-forecast/', views.cost_forecast_api, name='cost_forecast_api'),
+    path('costing/export/', views.budget_variance_export, name='budget_variance_export'),
+    path('costing/cash-flow/', views.cash_flow_chart, name='cash_flow_chart'),
+    path('api/cash-flow/', views.cash_flow_api, name='cash_flow_api'),
 
     # ==============================================
     # STAGING & REVIEW
@@ -4,14 +4,14 @@ from django.contrib.auth.decorators import login_required
 from django.core.signing import BadSignature, SignatureExpired
 from authentication.utils.tokens import parse_dashboard_token, make_dashboard_token
 from django.utils import timezone
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from datetime import timedelta
 from django.views.decorators.http import require_http_methods
 from django.db.models import Q
 from django.http import HttpResponseRedirect
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from decimal import Decimal, InvalidOperation
-from django.db import models
+from django.db import transaction
 from django.db.models import Sum, Max
 from datetime import date, datetime
 from django.urls import reverse
@@ -20,10 +20,9 @@ import json
 from django.conf import settings
 from django.core.files import File
 import os
-import random
 from django.views.decorators.http import require_POST
-from notifications.utils import send_notification
-from notifications.models import Notification, NotificationStatus
+from notifications.utils import notify
+from outbox.bus import publish
 from authentication.models import UserProfile
 from authentication.views import verify_user_token
 from django.forms.models import model_to_dict
@@ -35,6 +34,14 @@ from manage_client.models import Client
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from powermason_capstone.utils.calculate_progress import calculate_progress
+from scheduling.utils.work_calendar import calendar_for_project
+from .costing import annotate_project_costs, costing_totals, filter_projects, sort_projects
+from .budget_ledger import lock_totals
+from .budget_matrix import budget_matrix
+from .expense_import import import_costs, import_expenses
+from .forecasting import forecast_projects, portfolio_summary
+from .cashflow import CURVE_CHOICES, cash_flow
+from .exports import stream_csv, variance_rows, write_xlsx
 # ----------------------------------------
 # FUNCTION
 # ----------------------------------------
@@ -149,42 +156,160 @@ def project_costing_dashboard(request, token, role):
     if isinstance(verified_profile, HttpResponse):
         return verified_profile
 
-    projects = ProjectProfile.objects.all()
+    q = request.GET.get('q', '').strip()
+    status = request.GET.get('status', '')
+    source = request.GET.get('source', '')
 
-    projects_with_totals = []
-    grand_total_planned = 0
-    grand_total_allocated = 0
+    # Planned / allocated / spent come from correlated subqueries, so the
+    # page costs a constant number of queries however many projects exist
+    filtered = filter_projects(ProjectProfile.objects.all(), q=q, status=status, source=source)
+    projects = annotate_project_costs(filtered)
+    totals = costing_totals(projects)
+    projects, sort = sort_projects(projects, request.GET.get('sort', ''))
 
-    for project in projects:
-        # Sum of planned amounts
-        total_planned = project.budgets.aggregate(total=Sum('planned_amount'))['total'] or 0
+    paginator = Paginator(projects, 20)
+    page = request.GET.get('page', 1)
+    try:
+        page_obj = paginator.page(page)
+    except PageNotAnInteger:
+        page_obj = paginator.page(1)
+    except EmptyPage:
+        page_obj = paginator.page(paginator.num_pages)
 
-        # Sum of all allocations across categories
-        total_allocated = sum(
-            budget.allocations.aggregate(total=Sum('amount'))['total'] or 0
-            for budget in project.budgets.all()
-        )
+    # EAC/ETC forecasts for the whole filtered portfolio in one batch
+    forecasts = forecast_projects(filtered)
 
-        projects_with_totals.append({
+    projects_with_totals = [
+        {
             "project": project,
-            "total_planned": total_planned,
-            "total_allocated": total_allocated,
-            "remaining": total_planned - total_allocated,
-        })
+            "total_planned": project.total_planned,
+            "total_allocated": project.total_allocated,
+            "total_spent": project.total_spent,
+            "remaining": project.remaining,
+            "forecast": forecasts.get(project.pk),
+        }
+        for project in page_obj
+    ]
 
-        grand_total_planned += total_planned
-        grand_total_allocated += total_allocated
+    # Filters carried over by the sort and pagination links
+    params = request.GET.copy()
+    params.pop('page', None)
+    params.pop('sort', None)
 
     context = {
         "projects_with_totals": projects_with_totals,
-        "grand_total_budget": grand_total_planned,
-        "grand_total_allocated": grand_total_allocated,
+        "page_obj": page_obj,
+        "grand_total_budget": totals["planned"],
+        "grand_total_allocated": totals["allocated"],
+        "grand_total_spent": totals["spent"],
+        "grand_total_remaining": totals["remaining"],
+        "forecast_summary": portfolio_summary(list(forecasts.values())),
+        "q": q,
+        "status": status,
+        "source": source,
+        "sort": sort,
+        "filter_query": params.urlencode(),
+        "status_choices": ProjectProfile.STATUS_CHOICES,
+        "source_choices": ProjectProfile.PROJECT_SOURCES,
         "token": token,
         "role": role,
     }
     return render(request, "project_profiling/project_costing_dashboard.html", context)
 
 
+@login_required
+@verified_email_required
+@role_required('OM', 'EG')
+def budget_variance_export(request):
+    """
+    Scope x category planned/allocated/spent for every project matching
+    the costing dashboard filters, streamed as CSV or (``format=xlsx``) XLSX.
+    """
+    projects = filter_projects(
+        ProjectProfile.objects.all(),
+        q=request.GET.get('q', '').strip(),
+        status=request.GET.get('status', ''),
+        source=request.GET.get('source', ''),
+    )
+    rows = variance_rows(projects)
+    filename = f"budget-variance-{timezone.localdate():%Y%m%d}"
+
+    if request.GET.get('format') == 'xlsx':
+        return FileResponse(
+            write_xlsx(rows), as_attachment=True, filename=f"{filename}.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+    response = StreamingHttpResponse(stream_csv(rows), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+@login_required
+@verified_email_required
+@role_required('OM', 'EG')
+def cost_forecast_api(request):
+    """
+    EAC/ETC cost forecasts. Optional GET filters: ``project`` (id),
+    ``status`` and ``overrun=1`` to list only projects forecast to overrun.
+    """
+    projects = ProjectProfile.objects.filter(archived=False)
+    project_id = request.GET.get('project')
+    if project_id:
+        if not project_id.isdigit():
+            return JsonResponse({'error': 'Invalid project id.'}, status=400)
+        projects = projects.filter(pk=project_id)
+    if request.GET.get('status'):
+        projects = projects.filter(status=request.GET['status'])
+
+    forecasts = sorted(forecast_projects(projects).values(), key=lambda f: f['variance'])
+    if request.GET.get('overrun') == '1':
+        forecasts = [f for f in forecasts if f['overrun']]
+
+    return JsonResponse({
+        'as_of': timezone.localdate().isoformat(),
+        'summary': portfolio_summary(forecasts),
+        'projects': forecasts,
+    })
+
+
+@login_required
+@verified_email_required
+@role_required('OM', 'EG')
+def cash_flow_api(request):
+    """
+    Monthly planned cash requirements vs actual expenses. Optional GET
+    filters: ``curve`` (linear, front, s_curve), ``project`` (id), ``status``.
+    """
+    projects = ProjectProfile.objects.filter(archived=False)
+    project_id = request.GET.get('project')
+    if project_id:
+        if not project_id.isdigit():
+            return JsonResponse({'error': 'Invalid project id.'}, status=400)
+        projects = projects.filter(pk=project_id)
+    if request.GET.get('status'):
+        projects = projects.filter(status=request.GET['status'])
+
+    try:
+        return JsonResponse(cash_flow(projects, curve=request.GET.get('curve') or 'linear'))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+@login_required
+@verified_email_required
+@role_required('OM', 'EG')
+def cash_flow_chart(request):
+    return render(request, "project_profiling/cash_flow.html", {
+        "projects": ProjectProfile.objects.filter(archived=False).only("id", "project_name"),
+        "curve_choices": CURVE_CHOICES,
+        "status_choices": ProjectProfile.STATUS_CHOICES,
+        "selected_project": request.GET.get("project", ""),
+        "selected_curve": request.GET.get("curve", "linear"),
+        "selected_status": request.GET.get("status", ""),
+    })
+
+
 def general_projects_list(request, token, role):
     verified_profile = verify_user_token(request, token, role)
     if not verified_profile:
@@ -329,7 +454,9 @@ def project_view(request, token, role, project_source, pk):
     else:
         project = get_object_or_404(ProjectProfile, pk=pk)
 
-    project.timeline_progress = calculate_progress(project.start_date, project.target_completion_date)
+    project.timeline_progress = calculate_progress(
+        project.start_date, project.target_completion_date, calendar=calendar_for_project(project)
+    )
     request.session['project_return_url'] = request.get_full_path()
     request.session['task_list_return_url'] = request.get_full_path()
     
@@ -424,45 +551,33 @@ def review_staging_project(request, token, project_id, role):
 
         if action == "approve":
             try:
-                # --- Create approved project ---
-                new_profile = ProjectProfile.objects.create(
-                    project_name=project.project_data.get("project_name", "Untitled Project"),
-                    project_type=project.project_data.get("project_type"),
-                    project_category=project.project_data.get("project_category"),
-                    location=project.project_data.get("location"),
-                    client_name=project.project_data.get("client_name"),
-                    budget=project.project_data.get("budget", 0),
-                    start_date=project.project_data.get("start_date"),
-                    end_date=project.project_data.get("end_date"),
-                    status="Not Started",
-                    source=project.project_source,
-                    created_by=project.created_by,
-                )
-                print(f"DEBUG: Created new ProjectProfile ID={new_profile.id}")
-
-                # --- Handle contract file ---
-                contract_path = project.project_data.get("contract_agreement")
-                print(f"DEBUG: contract_path = {contract_path}")
-                if contract_path and default_storage.exists(contract_path):
-                    with default_storage.open(contract_path, "rb") as f:
-                        new_profile.contract_agreement.save(os.path.basename(contract_path), File(f), save=True)
-                    print("DEBUG: Contract agreement file copied")
-
-                # --- Create notifications ---
-                oms = UserProfile.objects.filter(role="OM")
-                print(f"DEBUG: Found {oms.count()} OMs")
-                if oms.exists():
-                    om = random.choice(list(oms))
-                    notif = Notification.objects.create(
-                        user=om,
-                        message=f"A new project '{new_profile.project_name}' has been approved.",
-                        link=f"/projects/{new_profile.pk}/details/",
+                with transaction.atomic():
+                    # --- Create approved project ---
+                    new_profile = ProjectProfile.objects.create(
+                        project_name=project.project_data.get("project_name", "Untitled Project"),
+                        project_type=project.project_data.get("project_type"),
+                        project_category=project.project_data.get("project_category"),
+                        location=project.project_data.get("location"),
+                        client_name=project.project_data.get("client_name"),
+                        budget=project.project_data.get("budget", 0),
+                        start_date=project.project_data.get("start_date"),
+                        end_date=project.project_data.get("end_date"),
+                        status="Not Started",
+                        source=project.project_source,
+                        created_by=project.created_by,
                     )
-                    print(f"DEBUG: Notification created ID={notif.id}")
 
-                # --- Delete staging project ---
-                project.delete()
-                print("DEBUG: Deleted staging project after approval")
+                    # --- Handle contract file ---
+                    contract_path = project.project_data.get("contract_agreement")
+                    if contract_path and default_storage.exists(contract_path):
+                        with default_storage.open(contract_path, "rb") as f:
+                            new_profile.contract_agreement.save(os.path.basename(contract_path), File(f), save=True)
+
+                    # --- Notify an OM (delivered by the outbox dispatcher) ---
+                    publish("project.approved", new_profile)
+
+                    # --- Delete staging project ---
+                    project.delete()
 
                 messages.success(request, f"Project '{new_profile.project_name}' has been approved.")
                 return redirect("review_staging_project_list")
@@ -635,23 +750,21 @@ def project_create(request, token, role, project_type, client_id):
                 )
 
                 # --- Notify EGs ---
-                eg_users = UserProfile.objects.filter(role="EG")
-                for eg_user in eg_users:
-                    notif = Notification.objects.create(
-                        message=f"{verified_profile.full_name} submitted a new project '{cleaned_data.get('project_name', 'Unnamed')}' for approval.",
-                        link=reverse("review_staging_project_list")
-                    )
-                    NotificationStatus.objects.create(notification=notif, user=eg_user)
+                notify(
+                    f"{verified_profile.full_name} submitted a new project '{cleaned_data.get('project_name', 'Unnamed')}' for approval.",
+                    link=reverse("review_staging_project_list"),
+                    roles=["EG"],
+                )
 
                 # --- Notify the OM themselves ---
-                notif_self = Notification.objects.create(
-                    message=f"You submitted the project '{cleaned_data.get('project_name', 'Unnamed')}'. Waiting for approval from Engineers.",
+                notify(
+                    f"You submitted the project '{cleaned_data.get('project_name', 'Unnamed')}'. Waiting for approval from Engineers.",
                     link=reverse(
                         "project_list_direct_client" if project_type == "DC" else "project_list_general_contractor",
                         kwargs={"token": token, "role": role}
-                    )
+                    ),
+                    recipients=[verified_profile],
                 )
-                NotificationStatus.objects.create(notification=notif_self, user=verified_profile)
 
                 messages.success(
                     request,
@@ -847,23 +960,25 @@ def budget_planning(request, project_id):
     # Get all budget categories for this project - INCLUDE category_other field
     budgets = project.budgets.select_related('scope').all().order_by('scope__name', 'category')
     
-    # Get all scopes for this project
-    project_scopes = project.scopes.all()
+    # Scope x category totals in one grouped query
+    matrix = budget_matrix(project)
+    scope_totals = {row['scope_id']: row['totals']['planned'] for row in matrix['rows']}
     
     # Calculate totals
-    total_planned = budgets.aggregate(total=Sum("planned_amount"))["total"] or 0
+    total_planned = matrix['totals']['planned']
     remaining_budget = project.approved_budget - total_planned
     
     # Group budgets by scope for better display
+    budgets_by_scope = {}
+    for budget in budgets:
+        budgets_by_scope.setdefault(budget.scope_id, []).append(budget)
+
     scopes_data = {}
     for scope in project_scopes:
-        scope_budgets = budgets.filter(scope=scope)
-        scope_total = scope_budgets.aggregate(total=Sum("planned_amount"))["total"] or 0
-        
         scopes_data[scope.name] = {
             'scope': scope,
-            'categories': scope_budgets,  # This now includes category_other
-            'total': scope_total
+            'categories': budgets_by_scope.get(scope.id, []),  # This now includes category_other
+            'total': scope_totals.get(scope.id, 0)
         }
 
     if request.method == "POST":
@@ -899,6 +1014,7 @@ def budget_planning(request, project_id):
         "scopes": scopes_data,
         "project_scopes": project_scopes,
         "form": form,
+        "matrix": matrix,
         "total_planned": total_planned,
         "remaining_budget": remaining_budget,
         "budget_utilization": (total_planned / project.approved_budget * 100) if project.approved_budget > 0 else 0,
@@ -975,10 +1091,14 @@ def delete_budget(request, project_id, budget_id):
     budget = get_object_or_404(ProjectBudget, id=budget_id, project=project)
 
     if request.method == "POST":
-        # Check if there are any allocations
-        allocation_count = budget.allocations.count()
-        if allocation_count > 0:
-            messages.warning(request, f"Cannot delete budget with {allocation_count} existing allocations. Remove allocations first.")
+        # Any allocation, even soft-deleted, or ledger movement is history
+        # that deleting the budget would cascade away
+        has_history = (
+            FundAllocation.all_with_deleted.filter(project_budget=budget).exists()
+            or budget.ledger_entries.exclude(allocated_delta=0, spent_delta=0).exists()
+        )
+        if has_history:
+            messages.warning(request, "Cannot delete a budget that has allocations or expenses, including deleted ones.")
             return redirect("budget_planning", project_id=project.id)
         
         scope_category = f"{budget.scope.name} - {budget.get_category_display()}"
@@ -1029,15 +1149,15 @@ def allocate_fund_to_category(request, project_id, budget_id):
             except InvalidOperation:
                 messages.error(request, "Invalid amount entered. Please enter a valid number.")
 
-    # Get active allocations (not soft deleted)
-    all_allocations = budget.allocations.filter(is_deleted=False).order_by('-date_allocated')
+    # Get active allocations (the default manager leaves out soft-deleted ones)
+    all_allocations = budget.allocations.order_by('-date_allocated')
     
     # Get soft-deleted allocations for restore functionality
-    deleted_allocations = budget.allocations.filter(is_deleted=True).order_by('-deleted_at')
+    deleted_allocations = FundAllocation.all_with_deleted.filter(project_budget=budget).deleted().order_by('-deleted_at')
     
-    # Sum of all non-deleted allocations for this category
-    total_allocated = all_allocations.aggregate(total=models.Sum("amount"))["total"] or 0
-    remaining = budget.planned_amount - total_allocated
+    # Running balance from the budget ledger (active allocations only)
+    total_allocated = budget.total_allocated
+    remaining = budget.remaining_amount
     remaining_abs = abs(remaining)
 
     # Calculate allocation percentage for progress bar
@@ -1077,8 +1197,7 @@ def soft_delete_allocation(request, project_id, budget_id, allocation_id):
     allocation = get_object_or_404(
         FundAllocation, 
         id=allocation_id, 
-        project_budget=budget,
-        is_deleted=False
+        project_budget=budget
     )
     
     allocation.soft_delete()
@@ -1094,7 +1213,7 @@ def hard_delete_allocation(request, project_id, budget_id, allocation_id):
     project = get_object_or_404(ProjectProfile, id=project_id)
     budget = get_object_or_404(ProjectBudget, id=budget_id, project=project)
     allocation = get_object_or_404(
-        FundAllocation, 
+        FundAllocation.all_with_deleted, 
         id=allocation_id, 
         project_budget=budget
     )
@@ -1112,10 +1231,9 @@ def restore_allocation(request, project_id, budget_id, allocation_id):
     project = get_object_or_404(ProjectProfile, id=project_id)
     budget = get_object_or_404(ProjectBudget, id=budget_id, project=project)
     allocation = get_object_or_404(
-        FundAllocation, 
+        FundAllocation.all_with_deleted.deleted(),  # Only restore soft-deleted items
         id=allocation_id, 
-        project_budget=budget,
-        is_deleted=True  # Only restore soft-deleted items
+        project_budget=budget
     )
     
     allocation.restore()
@@ -1134,26 +1252,38 @@ def project_allocate_budget(request, project_id):
     Overview of all budget categories for allocation
     """
     project = get_object_or_404(ProjectProfile, id=project_id)
-    budgets = project.budgets.all().order_by('scope__name', 'category')
+    matrix = budget_matrix(project)
     
-    # Calculate allocation summary for each budget
-    budget_summary = []
-    for budget in budgets:
-        total_allocated = budget.allocations.aggregate(total=models.Sum("amount"))["total"] or 0
-        remaining = budget.planned_amount - total_allocated
-        allocation_percent = (total_allocated / budget.planned_amount * 100) if budget.planned_amount > 0 else 0
-        
-        budget_summary.append({
-            'budget': budget,
-            'total_allocated': total_allocated,
-            'remaining': remaining,
-            'allocation_percent': allocation_percent,
-            'status': 'over' if remaining < 0 else 'complete' if remaining == 0 else 'partial'
-        })
+    # Allocation status for each cell
+    for row in matrix['rows']:
+        for cell in row['cells']:
+            if cell:
+                remaining = cell['remaining']
+                cell['allocation_percent'] = (cell['allocated'] / cell['planned'] * 100) if cell['planned'] > 0 else 0
+                cell['status'] = 'over' if remaining < 0 else 'complete' if remaining == 0 else 'partial'
     
     return render(request, "budgets/allocate_funds_overview.html", {
         "project": project,
-        "budget_summary": budget_summary,
+        "matrix": matrix,
+    })
+
+
+@login_required
+@verified_email_required
+@role_required("EG", "OM")
+def budget_matrix_api(request, project_id):
+    """
+    Scope x category budget matrix as JSON, so the planning page can
+    refresh its figures after an edit without reloading
+    """
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    matrix = budget_matrix(project)
+    approved = project.approved_budget or 0
+    return JsonResponse({
+        'project_id': project.id,
+        'approved_budget': approved,
+        'remaining_budget': approved - matrix['totals']['planned'],
+        'matrix': matrix,
     })
     
 @require_http_methods(["POST"])
@@ -1275,43 +1405,38 @@ def add_expense(request, project_id):
         try:
             project = get_object_or_404(ProjectProfile, id=project_id)
             category = get_object_or_404(ProjectBudget, id=request.POST['category_id'])
-            
-            # Check if there's any allocation for this category - use Decimal
-            total_allocated = category.allocations.filter(
-                is_deleted=False
-            ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0')
-            
-            if total_allocated == 0:
-                return JsonResponse({
-                    'error': 'No allocation found for this category. Please allocate funds first.'
-                })
-            
-            # Calculate current spent amount - use Decimal
-            total_spent = category.expenses.aggregate(
-                total=models.Sum('amount')
-            )['total'] or Decimal('0')
-            
             expense_amount = Decimal(str(request.POST['amount']))  # Convert to Decimal
-            new_total_spent = total_spent + expense_amount
             
-            # Warning if over-allocation (but still allow)
-            warning = ""
-            if new_total_spent > total_allocated:
-                overage = new_total_spent - total_allocated
-                warning = f" (Over-allocated by ₱{overage:,.2f})"
-            
-            expense = Expense.objects.create(
-                project=project,
-                budget_category=category,
-                expense_type=request.POST['expense_type'],
-                expense_other=request.POST.get('expense_other', ''),
-                amount=expense_amount,
-                vendor=request.POST.get('vendor', ''),
-                receipt_number=request.POST.get('receipt_number', ''),
-                expense_date=request.POST['expense_date'],
-                description=request.POST.get('description', ''),
-                created_by=request.user.userprofile  # Fixed this line
-            )
+            # Check and insert under the budget row lock so concurrent posts
+            # compare against each other's spending
+            with transaction.atomic():
+                total_allocated, total_spent = lock_totals(category.id)
+                
+                if total_allocated == 0:
+                    return JsonResponse({
+                        'error': 'No allocation found for this category. Please allocate funds first.'
+                    })
+                
+                new_total_spent = total_spent + expense_amount
+                
+                # Warning if over-allocation (but still allow)
+                warning = ""
+                if new_total_spent > total_allocated:
+                    overage = new_total_spent - total_allocated
+                    warning = f" (Over-allocated by ₱{overage:,.2f})"
+                
+                expense = Expense.objects.create(
+                    project=project,
+                    budget_category=category,
+                    expense_type=request.POST['expense_type'],
+                    expense_other=request.POST.get('expense_other', ''),
+                    amount=expense_amount,
+                    vendor=request.POST.get('vendor', ''),
+                    receipt_number=request.POST.get('receipt_number', ''),
+                    expense_date=request.POST['expense_date'],
+                    description=request.POST.get('description', ''),
+                    created_by=request.user.userprofile  # Fixed this line
+                )
             
             return JsonResponse({
                 'success': True,
@@ -1323,6 +1448,33 @@ def add_expense(request, project_id):
     
     return JsonResponse({'error': 'Invalid request method'})
 
+@login_required
+@verified_email_required
+@role_required("EG", "OM")
+@require_POST
+def import_expenses_upload(request, project_id):
+    """
+    Bulk import expenses (or, with ``target=costs``, project costs) for a
+    project from an uploaded CSV/XLSX file; returns the per-row report.
+    """
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    upload = request.FILES.get('file')
+    if not upload:
+        return JsonResponse({'error': 'Please choose a CSV or XLSX file.'}, status=400)
+
+    try:
+        if request.POST.get('target') == 'costs':
+            report = import_costs(upload.file, upload.name, project=project)
+        else:
+            report = import_expenses(
+                upload.file, upload.name, request.user.userprofile, project=project,
+                allow_overspend=request.POST.get('strict') != '1',
+            )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({'success': report['error_count'] == 0, **report})
+
 def get_category_allocation(request, project_id, category_id):
     print(f"DEBUG: Starting with project_id={project_id}, category_id={category_id}")
     
@@ -1356,36 +1508,16 @@ def get_category_allocation(request, project_id, category_id):
                 'remaining_amount': 0
             })
         
-        # Step 4: Get allocations and expenses with proper Decimal handling
-        allocations = category.allocations.filter(is_deleted=False)
-        print(f"DEBUG: Found {allocations.count()} allocations")
-        
-        # Use Decimal(0) instead of 0 for proper type consistency
-        total_allocated = allocations.aggregate(
-            total=models.Sum('amount')
-        )['total'] or Decimal('0')
-        
-        print(f"DEBUG: Total allocated: {total_allocated} (type: {type(total_allocated)})")
-        
-        expenses = category.expenses.all()
-        print(f"DEBUG: Found {expenses.count()} expenses")
-        
-        total_spent = expenses.aggregate(
-            total=models.Sum('amount')
-        )['total'] or Decimal('0')
-        
-        print(f"DEBUG: Total spent: {total_spent} (type: {type(total_spent)})")
-        
-        # Calculate remaining (both are now Decimal types)
+        # Step 4: Allocated and spent balances from the budget ledger
+        total_allocated = category.total_allocated
+        total_spent = category.total_spent
         remaining_amount = total_allocated - total_spent
-        print(f"DEBUG: Remaining: {remaining_amount} (type: {type(remaining_amount)})")
         
         return JsonResponse({
             'allocated_amount': float(total_allocated),
             'spent_amount': float(total_spent),
             'remaining_amount': float(remaining_amount),
             'category_name': category.get_category_display(),
-            'debug': f"Allocations: {allocations.count()}, Expenses: {expenses.count()}"
         })
         
     except Exception as e:
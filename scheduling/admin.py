@@ -40,4 +40,27 @@ class ProjectScopeAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Optionally, you can exclude deleted items by default"""
         qs = super().get_queryset(request)
-        return qs  # For default: show all, or use qs.filter(is_deleted=False) to hide deleted
\ No newline at end of file
+        return qs  # For default: show all, or use qs.filter(is_deleted=False) to hide deleted
+
+from .models import ScheduleImportJob
+
+@admin.register(ScheduleImportJob)
+class ScheduleImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'project', 'status', 'pages_parsed', 'pages_total', 'rows_accepted', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('project__project_name', 'file')
+    readonly_fields = ('result', 'error', 'started_at', 'finished_at')
+
+
+from .models import WorkCalendar, Holiday
+
+class HolidayInline(admin.TabularInline):
+    model = Holiday
+    extra = 0
+
+
+@admin.register(WorkCalendar)
+class WorkCalendarAdmin(admin.ModelAdmin):
+    list_display = ('name', 'workweek', 'hours_per_day', 'is_default', 'updated_at')
+    list_filter = ('is_default',)
+    inlines = [HolidayInline]
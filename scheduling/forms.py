@@ -2,6 +2,8 @@ from django import forms
 from .models import ProjectTask, ProgressUpdate, ProgressFile, ProjectScope
 from authentication.models import UserProfile  # adjust if your user model is elsewhere
 from datetime import timedelta
+from .utils.weight_ledger import scope_weight_ledger
+from .utils.work_calendar import calendar_for_project
 
 class ProjectTaskForm(forms.ModelForm):
     class Meta:
@@ -77,8 +79,8 @@ class ProjectTaskForm(forms.ModelForm):
         
         # Add help text
         self.fields["weight"].help_text = "Percentage contribution of this task to its scope (0-100%)"
-        self.fields["duration_days"].help_text = "Automatically calculated from start and end dates"
-        self.fields["manhours"].help_text = "Automatically calculated (Duration × 8 hours/day)"
+        self.fields["duration_days"].help_text = "Working days between start and end dates (excludes rest days and holidays)"
+        self.fields["manhours"].help_text = "Automatically calculated (Working days × hours/day)"
 
     def clean(self):
         cleaned_data = super().clean()
@@ -92,32 +94,35 @@ class ProjectTaskForm(forms.ModelForm):
             if end < start:
                 self.add_error("end_date", "End date cannot be earlier than start date.")
             else:
-                # Auto-calculate days (inclusive)
-                duration = (end - start).days + 1
-                cleaned_data["duration_days"] = duration
-                # Auto-calculate manhours (8 hours per day)
-                cleaned_data["manhours"] = duration * 8
+                # Auto-calculate working days (inclusive) and manhours from the project calendar
+                calendar = calendar_for_project(self.project)
+                cleaned_data["duration_days"] = calendar.working_days(start, end)
+                cleaned_data["manhours"] = calendar.manhours(start, end)
 
         # Validate weight within scope
         if weight is not None and scope:
             if weight <= 0:
                 self.add_error("weight", "Weight must be greater than 0.")
-        elif weight > 100:
-            self.add_error("weight", "Weight cannot exceed 100%.")
-        else:
-            # Check if total weight for scope would exceed 100%
-            existing_tasks = ProjectTask.objects.filter(scope=scope).exclude(
-                id=self.instance.id if self.instance else None
-            )
-            current_total = sum(task.weight for task in existing_tasks)
-
-            if current_total + weight > 100:
-                remaining = 100 - current_total
-                self.add_error(
-                    "weight",
-                    f"This scope already has {current_total}%. "
-                    f"Only {remaining}% remaining, but you entered {weight}%."
+            elif weight > 100:
+                self.add_error("weight", "Weight cannot exceed 100%.")
+            else:
+                # Check if total weight for scope would exceed 100%. The scope row
+                # stays locked until the caller's transaction commits the task.
+                ledger = scope_weight_ledger(
+                    scope.project,
+                    exclude_task=self.instance.pk,
+                    scopes=[scope],
+                    lock=True,
                 )
+                current_total = ledger[scope.id]["allocated"]
+
+                if current_total + weight > 100:
+                    remaining = 100 - current_total
+                    self.add_error(
+                        "weight",
+                        f"This scope already has {current_total}%. "
+                        f"Only {remaining}% remaining, but you entered {weight}%."
+                    )
 
         return cleaned_data
 
@@ -0,0 +1,44 @@
+from django.urls import reverse
+
+from notifications.utils import notify_digest
+from outbox.bus import subscribe
+
+from .models import ProgressUpdate
+
+
+def _update(event):
+    return ProgressUpdate.objects.select_related("task__project", "reported_by").filter(pk=event.aggregate_id).first()
+
+
+@subscribe("progress.submitted")
+def notify_progress_submitted(event):
+    """Tell OMs/EGs about a new progress report and leave the PM a record of it."""
+    update = _update(event)
+    if update is None:
+        return
+    task, project, reporter = update.task, update.task.project, update.reported_by
+
+    notify_digest(
+        "progress_report", project,
+        f"{reporter.full_name if reporter else 'Someone'} submitted a progress report "
+        f"for Project '{project.project_name}' (Task: {task.task_name})",
+        f"{{count}} progress reports submitted for Project '{project.project_name}'",
+        link=reverse("review_updates"), roles=["OM", "EG"],
+    )
+    if reporter is None:
+        return
+    notify_digest(
+        "progress_report", project,
+        f"You submitted a progress report for Project '{project.project_name}' (Task: {task.task_name})",
+        f"You submitted {{count}} progress reports for Project '{project.project_name}'",
+        link=reverse("task_list_default", args=[project.id]),
+        recipients=[reporter],
+    )
+
+
+@subscribe("progress.approved")
+def roll_up_project_progress(event):
+    """Recompute the project's progress and status from its tasks."""
+    update = _update(event)
+    if update is not None:
+        update.task.project.update_progress_from_tasks()
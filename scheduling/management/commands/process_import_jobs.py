@@ -0,0 +1,44 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from scheduling.utils.import_jobs import process_next_job, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued PDF schedule imports (database-backed, no broker needed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2,
+                            help="Number of jobs parsed in parallel (default: 2).")
+        parser.add_argument("--sleep", type=float, default=2.0,
+                            help="Seconds to wait when the queue is empty (default: 2).")
+        parser.add_argument("--once", action="store_true",
+                            help="Drain the queue once and exit instead of polling forever.")
+        parser.add_argument("--stale-minutes", type=int, default=30,
+                            help="Requeue jobs left running longer than this (default: 30).")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        requeued, failed = requeue_stale_jobs(options["stale_minutes"])
+        if requeued or failed:
+            self.stdout.write(self.style.WARNING(
+                f"Requeued {requeued} stale import(s), failed {failed}."
+            ))
+
+        self.stdout.write(f"Import worker started with concurrency={concurrency}")
+        processed = 0
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while True:
+                results = list(pool.map(lambda _: process_next_job(), range(concurrency)))
+                processed += sum(results)
+
+                if any(results):
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Done! Processed {processed} import job(s)."))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+        ('project_profiling', '0007_expense_expense_other'),
+        ('scheduling', '0002_projectscope_is_deleted'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='schedule_imports/')),
+                ('status', models.CharField(choices=[('QU', 'Queued'), ('RN', 'Running'), ('DN', 'Done'), ('FL', 'Failed')], default='QU', max_length=2)),
+                ('pages_total', models.PositiveIntegerField(default=0)),
+                ('pages_parsed', models.PositiveIntegerField(default=0)),
+                ('rows_accepted', models.PositiveIntegerField(default=0)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_imports', to='project_profiling.projectprofile')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='authentication.userprofile')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='scheduling__status_1ba371_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-19 02:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0003_scheduleimportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('workweek', models.CharField(default='1111110', max_length=7)),
+                ('hours_per_day', models.DecimalField(decimal_places=2, default=8, max_digits=4)),
+                ('is_default', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('name', models.CharField(max_length=150)),
+                ('recurring', models.BooleanField(default=False)),
+                ('calendar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holidays', to='scheduling.workcalendar')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('calendar', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.db import migrations
+
+# Fixed-date regular holidays and special non-working days (Philippines).
+# Movable ones (Holy Week, National Heroes Day, Eid) are added per year.
+RECURRING_HOLIDAYS = [
+    (1, 1, "New Year's Day"),
+    (4, 9, "Araw ng Kagitingan"),
+    (5, 1, "Labor Day"),
+    (6, 12, "Independence Day"),
+    (8, 21, "Ninoy Aquino Day"),
+    (11, 1, "All Saints' Day"),
+    (11, 30, "Bonifacio Day"),
+    (12, 8, "Feast of the Immaculate Conception"),
+    (12, 25, "Christmas Day"),
+    (12, 30, "Rizal Day"),
+    (12, 31, "Last Day of the Year"),
+]
+
+
+def create_default_calendar(apps, schema_editor):
+    WorkCalendar = apps.get_model("scheduling", "WorkCalendar")
+    Holiday = apps.get_model("scheduling", "Holiday")
+
+    if WorkCalendar.objects.filter(is_default=True).exists():
+        return
+
+    calendar = WorkCalendar.objects.create(
+        name="Philippines (Mon-Sat)",
+        workweek="1111110",
+        hours_per_day=8,
+        is_default=True,
+    )
+    Holiday.objects.bulk_create([
+        Holiday(calendar=calendar, date=date(2000, month, day), name=name, recurring=True)
+        for month, day, name in RECURRING_HOLIDAYS
+    ])
+
+
+def remove_default_calendar(apps, schema_editor):
+    WorkCalendar = apps.get_model("scheduling", "WorkCalendar")
+    WorkCalendar.objects.filter(name="Philippines (Mon-Sat)").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0004_workcalendar_holiday'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_default_calendar, remove_default_calendar),
+    ]
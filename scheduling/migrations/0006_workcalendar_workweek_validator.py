@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 03:26
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0005_default_work_calendar'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workcalendar',
+            name='workweek',
+            field=models.CharField(default='1111110', max_length=7, validators=[django.core.validators.RegexValidator('^[01]{7}$', 'Enter seven 0/1 flags, Monday first.')]),
+        ),
+    ]
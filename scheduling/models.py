@@ -1,7 +1,69 @@
 from django.db import models
+from django.core.exceptions import ValidationError
+from django.core.validators import RegexValidator
 from authentication.models import UserProfile      
 from decimal import Decimal
 
+class WorkCalendar(models.Model):
+    """
+    Working week and holidays used to turn task dates into working days.
+    Projects without a calendar use the one marked ``is_default``.
+    """
+    WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+    name = models.CharField(max_length=100, unique=True)
+    # One flag per weekday, Monday first: "1111110" = Monday to Saturday
+    workweek = models.CharField(
+        max_length=7,
+        default="1111110",
+        validators=[RegexValidator(r"^[01]{7}$", "Enter seven 0/1 flags, Monday first.")],
+    )
+    hours_per_day = models.DecimalField(max_digits=4, decimal_places=2, default=8)
+    is_default = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        days = [d for d, flag in zip(self.WEEKDAYS, self.workweek) if flag == "1"]
+        return f"{self.name} ({', '.join(days)})"
+
+    def clean(self):
+        if "1" not in self.workweek:
+            raise ValidationError({"workweek": "At least one day of the week must be a working day."})
+
+    def save(self, *args, **kwargs):
+        if self.is_default:
+            WorkCalendar.objects.exclude(pk=self.pk).filter(is_default=True).update(is_default=False)
+        super().save(*args, **kwargs)
+
+
+class Holiday(models.Model):
+    calendar = models.ForeignKey(WorkCalendar, on_delete=models.CASCADE, related_name="holidays")
+    date = models.DateField()
+    name = models.CharField(max_length=150)
+    # Recurring holidays fall on the same month/day every year (e.g. Dec 25)
+    recurring = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["date"]
+        unique_together = ["calendar", "date"]
+
+    def __str__(self):
+        return f"{self.name} ({self.date:%b %d}{'' if self.recurring else f', {self.date.year}'})"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.calendar.save(update_fields=["updated_at"])  # invalidates cached day index
+
+    def delete(self, *args, **kwargs):
+        calendar = self.calendar
+        result = super().delete(*args, **kwargs)
+        calendar.save(update_fields=["updated_at"])
+        return result
+
+
 class ProjectScope(models.Model):
     project = models.ForeignKey(
         "project_profiling.ProjectProfile", 
@@ -73,14 +135,27 @@ class ProjectTask(models.Model):
     def __str__(self):
         return f"{self.task_name} ({self.project.project_name})"
 
-    def save(self, *args, **kwargs):
-        # Auto-calculate duration_days if start and end dates exist
-        if self.start_date and self.end_date:
-            self.duration_days = (self.end_date - self.start_date).days + 1  # inclusive
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_dates = (instance.__dict__.get("start_date"), instance.__dict__.get("end_date"))
+        return instance
+
+    def save(self, *args, calendar=None, **kwargs):
+        # Auto-calculate duration_days (working days, inclusive) and manhours
+        # (1 worker, calendar hours/day) from the project's work calendar.
+        # Only when the dates changed, so status/archive saves skip the
+        # calendar lookup; callers saving many tasks can pass ``calendar``.
+        dates = (self.start_date, self.end_date)
+        if self.start_date and self.end_date and (
+            calendar is not None or dates != getattr(self, "_saved_dates", None)
+        ):
+            if calendar is None:
+                from scheduling.utils.work_calendar import calendar_for_project
 
-        # Auto-calculate manhours (1 worker, 8 hours/day)
-        if self.duration_days:
-            self.manhours = self.duration_days * 8
+                calendar = calendar_for_project(self.project)
+            self.duration_days = calendar.working_days(self.start_date, self.end_date)
+            self.manhours = calendar.manhours(self.start_date, self.end_date)
 
         # Auto-mark task status based on progress
         if self.progress >= 100:
@@ -94,6 +169,7 @@ class ProjectTask(models.Model):
             self.status = "PL"
 
         super().save(*args, **kwargs)
+        self._saved_dates = dates
 
     @staticmethod
     def calculate_project_progress(project):
@@ -212,3 +288,66 @@ class TaskCost(models.Model):
 
     def __str__(self):
         return f"{self.task} - {self.allocated_amount}/{self.cost.amount}"
+
+
+class ScheduleImportJob(models.Model):
+    """
+    A PDF schedule upload waiting to be parsed by the import worker
+    (``manage.py process_import_jobs``) instead of inside the request.
+    """
+    STATUS_CHOICES = [
+        ("QU", "Queued"),
+        ("RN", "Running"),
+        ("DN", "Done"),
+        ("FL", "Failed"),
+    ]
+
+    project = models.ForeignKey(
+        "project_profiling.ProjectProfile",
+        on_delete=models.CASCADE,
+        related_name="schedule_imports"
+    )
+    uploaded_by = models.ForeignKey(UserProfile, on_delete=models.SET_NULL, null=True, blank=True)
+    file = models.FileField(upload_to="schedule_imports/")
+    status = models.CharField(max_length=2, choices=STATUS_CHOICES, default="QU")
+
+    pages_total = models.PositiveIntegerField(default=0)
+    pages_parsed = models.PositiveIntegerField(default=0)
+    rows_accepted = models.PositiveIntegerField(default=0)
+    result = models.JSONField(default=dict, blank=True)  # parsed headers + task rows
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"Import #{self.pk} ({self.get_status_display()}) - {self.file.name}"
+
+    @property
+    def is_finished(self):
+        return self.status in ("DN", "FL")
+
+    @property
+    def percent(self):
+        if not self.pages_total:
+            return 100 if self.status == "DN" else 0
+        return round(self.pages_parsed / self.pages_total * 100)
+
+    def as_status_dict(self):
+        return {
+            "id": self.pk,
+            "status": self.status,
+            "status_display": self.get_status_display(),
+            "pages_total": self.pages_total,
+            "pages_parsed": self.pages_parsed,
+            "rows_accepted": self.rows_accepted,
+            "percent": self.percent,
+            "error": self.error,
+            "finished": self.is_finished,
+        }
@@ -1,3 +1,352 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from allauth.account.models import EmailAddress
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from authentication.models import CustomUser, UserProfile
+from authentication.utils.tokens import make_dashboard_token
+from notifications.models import Notification
+from outbox.bus import dispatch, publish
+from project_profiling.models import ProjectProfile
+from scheduling.models import ProgressUpdate, ProjectScope, ProjectTask, ScheduleImportJob, WorkCalendar
+from scheduling.utils.bulk_edit import bulk_edit_tasks
+from scheduling.utils.import_jobs import claim_next_job, process_next_job
+from scheduling.utils.resource_loading import manpower_loading
+from scheduling.utils.weight_ledger import project_scope_weight, scope_weight_ledger
+from scheduling.utils.work_calendar import BusinessDayIndex, calendars_by_id
+from powermason_capstone.utils.calculate_progress import calculate_progress
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ScheduleImportJobTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Import Test", location="Manila"
+        )
+
+    def make_job(self):
+        return ScheduleImportJob.objects.create(
+            project=self.project, file=ContentFile(b"%PDF-1.4", name="schedule.pdf")
+        )
+
+    def test_claim_marks_job_running_once(self):
+        job = self.make_job()
+        claimed = claim_next_job()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, "RN")
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(claim_next_job())
+
+    def test_process_records_progress_and_rows(self):
+        job = self.make_job()
+
+        tasks = [
+            {"task_name": "Excavation", "start_date": "2025-01-01", "end_date": "2025-01-05"},
+            {"task_name": "Broken row", "start_date": None, "end_date": "2025-01-05"},
+        ]
+        progress = []
+
+        def fake_extract(fh, on_page=None):
+            on_page(1, 2, tasks)
+            progress.append(ScheduleImportJob.objects.get(pk=job.pk).rows_accepted)
+            return {"proj_id": "GC-001", "project": "Import Test", "location": None, "scope": None,
+                    "tasks": tasks}
+
+        with mock.patch("scheduling.utils.import_jobs.extract_project_info", fake_extract):
+            self.assertTrue(process_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "DN")
+        self.assertEqual(job.pages_parsed, 1)
+        self.assertEqual(progress, [1])  # same filtered count as the final value
+        self.assertEqual(job.rows_accepted, 1)
+        self.assertEqual(job.result["tasks"][0]["task_name"], "Excavation")
+        self.assertFalse(process_next_job())
+
+    def test_status_requires_a_matching_token(self):
+        user = CustomUser.objects.create_user(email="import-eg@example.com", password="x")
+        EmailAddress.objects.create(user=user, email=user.email, verified=True, primary=True)
+        profile = UserProfile.objects.create(user=user, role="EG")
+        job = self.make_job()
+        self.client.force_login(user)
+
+        url = reverse("schedule_import_status", args=[self.project.id, make_dashboard_token(profile), "EG", job.id])
+        self.assertEqual(self.client.get(url).json()["status"], job.status)
+        url = reverse("schedule_import_status", args=[self.project.id, "forged", "EG", job.id])
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_parse_error_fails_job(self):
+        job = self.make_job()
+        with mock.patch("scheduling.utils.import_jobs.extract_project_info", side_effect=ValueError("bad pdf")):
+            process_next_job()
+        job.refresh_from_db()
+        self.assertEqual(job.status, "FL")
+        self.assertIn("bad pdf", job.error)
+
+
+class ScopeWeightLedgerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Ledger Test", location="Manila"
+        )
+        cls.structural = ProjectScope.objects.create(project=cls.project, name="Structural", weight=60)
+        cls.finishing = ProjectScope.objects.create(project=cls.project, name="Finishing", weight=40)
+        cls.task = ProjectTask.objects.create(
+            project=cls.project, scope=cls.structural, task_name="Footings",
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 10), weight=30,
+        )
+        ProjectTask.objects.create(
+            project=cls.project, scope=cls.structural, task_name="Columns",
+            start_date=date(2025, 1, 11), end_date=date(2025, 1, 20), weight=45,
+        )
+
+    def test_allocated_and_remaining_per_scope(self):
+        ledger = scope_weight_ledger(self.project)
+        self.assertEqual(ledger[self.structural.id]["allocated"], 75)
+        self.assertEqual(ledger[self.structural.id]["remaining"], 25)
+        self.assertEqual(ledger[self.finishing.id]["allocated"], 0)
+        self.assertEqual(ledger[self.finishing.id]["remaining"], 100)
+
+    def test_exclude_task_being_edited(self):
+        ledger = scope_weight_ledger(self.project, exclude_task=self.task)
+        self.assertEqual(ledger[self.structural.id]["allocated"], 45)
+
+    def test_project_scope_weight(self):
+        self.assertEqual(project_scope_weight(self.project), 100)
+        self.assertEqual(project_scope_weight(self.project, exclude_scope=self.finishing), 60)
+
+
+class ManpowerLoadingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = ProjectProfile.objects.create(
+            project_source="DC", project_name="Loading Test", location="Cebu"
+        )
+        cls.scope = ProjectScope.objects.create(project=cls.project, name="Civil", weight=100)
+        ProjectTask.objects.create(
+            project=cls.project, scope=cls.scope, task_name="Formworks",
+            start_date=date(2025, 3, 3), end_date=date(2025, 3, 5), weight=50,
+        )
+        ProjectTask.objects.create(
+            project=cls.project, scope=cls.scope, task_name="Rebar",
+            start_date=date(2025, 3, 4), end_date=date(2025, 3, 4), weight=50,
+        )
+
+    def test_daily_demand_overlaps(self):
+        loading = manpower_loading()
+        self.assertEqual(loading["dates"], ["2025-03-03", "2025-03-04", "2025-03-05"])
+        self.assertEqual(loading["total"], [8.0, 16.0, 8.0])
+        self.assertEqual(loading["by_project"][0]["peak"], 16.0)
+        self.assertEqual(loading["by_assignee"][0]["label"], "Unassigned")
+
+    def test_window_clips_tasks(self):
+        loading = manpower_loading(start=date(2025, 3, 5), end=date(2025, 3, 6))
+        self.assertEqual(loading["total"], [8.0, 0.0])
+
+    def test_api_rejects_impossible_dates(self):
+        user = CustomUser.objects.create_user(email="loading-om@example.com", password="x")
+        EmailAddress.objects.create(user=user, email=user.email, verified=True, primary=True)
+        UserProfile.objects.create(user=user, role="OM")
+        self.client.force_login(user)
+
+        response = self.client.get(reverse("manpower_loading_api"), {"start": "2025-13-40"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+
+
+class WorkCalendarTests(TestCase):
+    def test_working_days_skip_sundays_and_holidays(self):
+        index = BusinessDayIndex(recurring=[(12, 25)])
+        # Mon 22 Dec 2025 to Sun 28 Dec 2025: Sunday and Christmas are off
+        self.assertEqual(index.working_days(date(2025, 12, 22), date(2025, 12, 28)), 5)
+        self.assertFalse(index.is_working_day(date(2025, 12, 25)))
+        self.assertEqual(index.manhours(date(2025, 12, 22), date(2025, 12, 28)), 40)
+
+    def test_finish_date(self):
+        index = BusinessDayIndex()
+        # Sat 6 Dec 2025 + 2 working days -> Mon 8 Dec (Sunday skipped)
+        self.assertEqual(index.finish_date(date(2025, 12, 6), 2), date(2025, 12, 8))
+        self.assertEqual(index.finish_date(date(2025, 12, 1), 1), date(2025, 12, 1))
+
+    def test_range_extends_on_demand(self):
+        index = BusinessDayIndex(first_year=2025, last_year=2025)
+        self.assertEqual(index.working_days(date(2030, 1, 7), date(2030, 1, 12)), 6)
+
+    def test_workweek_validation(self):
+        for workweek in ("11111", "1111112", "0000000"):
+            with self.subTest(workweek=workweek), self.assertRaises(ValidationError):
+                WorkCalendar(name="Bad", workweek=workweek).full_clean()
+        WorkCalendar(name="Good", workweek="1111100").full_clean()
+
+    def test_invalid_stored_workweek_falls_back(self):
+        with self.assertLogs("scheduling.utils.work_calendar", "WARNING"):
+            index = BusinessDayIndex(workweek="11111")
+        self.assertEqual(index.workweek, "1111110")
+        self.assertEqual(index.working_days(date(2025, 12, 1), date(2025, 12, 7)), 6)
+
+    def test_finish_date_gives_up_without_working_days(self):
+        index = BusinessDayIndex(first_year=2025, last_year=2025, recurring=[
+            (month, day) for month in range(1, 13) for day in range(1, 32)
+        ])
+        with mock.patch("scheduling.utils.work_calendar.MAX_FINISH_YEARS", 20), self.assertRaises(ValueError):
+            index.finish_date(date(2025, 1, 1), 1)
+
+    def test_widening_swaps_in_a_new_span(self):
+        index = BusinessDayIndex(first_year=2025, last_year=2025)
+        span = index._span
+        index.finish_date(date(2025, 12, 1), 400)
+        self.assertIsNot(index._span, span)
+        self.assertEqual((span.first_year, span.last_year), (2025, 2025))
+        self.assertEqual(len(span.working), 365)
+
+    def test_task_save_uses_default_calendar(self):
+        project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Calendar Test", location="Davao"
+        )
+        scope = ProjectScope.objects.create(project=project, name="Site Works", weight=100)
+        task = ProjectTask.objects.create(
+            project=project, scope=scope, task_name="Clearing",
+            start_date=date(2025, 12, 22), end_date=date(2025, 12, 28), weight=10,
+        )
+        # Seeded Philippine calendar: Mon-Sat, Christmas off
+        self.assertEqual(task.duration_days, 5)
+        self.assertEqual(task.manhours, 40)
+
+        # Saves that leave the dates alone skip the calendar lookup
+        task = ProjectTask.objects.get(pk=task.pk)
+        task.is_archived = True
+        with self.assertNumQueries(1):
+            task.save()
+
+    def test_calendars_by_id_resolves_in_one_query(self):
+        calendars_by_id([None])  # warm the default index
+        with self.assertNumQueries(1):
+            calendars = calendars_by_id([None, 999])
+        self.assertIs(calendars[None], calendars[999])
+
+    def test_calculate_progress_with_calendar(self):
+        index = BusinessDayIndex()
+        # Mon 1 Dec to Mon 15 Dec 2025: 12 working days, 6 elapsed by Mon 8 Dec
+        progress = calculate_progress(date(2025, 12, 1), date(2025, 12, 15), today=date(2025, 12, 8), calendar=index)
+        self.assertEqual(progress, 50.0)
+
+
+class BulkTaskEditTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Bulk Edit Test", location="Iloilo"
+        )
+        cls.scope = ProjectScope.objects.create(project=cls.project, name="Roofing", weight=100)
+        cls.a = ProjectTask.objects.create(
+            project=cls.project, scope=cls.scope, task_name="Trusses",
+            start_date=date(2025, 2, 3), end_date=date(2025, 2, 8), weight=40, progress=50,
+        )
+        cls.b = ProjectTask.objects.create(
+            project=cls.project, scope=cls.scope, task_name="Sheeting",
+            start_date=date(2025, 2, 10), end_date=date(2025, 2, 15), weight=40,
+        )
+
+    def test_applies_changes_and_rolls_up_once(self):
+        tasks, errors = bulk_edit_tasks([
+            {"id": self.a.id, "weight": 60, "end_date": "2025-02-04"},
+            {"id": self.b.id, "weight": 40},
+        ])
+        self.assertEqual(errors, [])
+        self.a.refresh_from_db()
+        self.assertEqual(self.a.weight, 60)
+        self.assertEqual(self.a.duration_days, 2)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.progress, 30)
+
+    def test_scope_total_checked_across_changes(self):
+        tasks, errors = bulk_edit_tasks([
+            {"id": self.a.id, "weight": 70},
+            {"id": self.b.id, "weight": 40},
+        ])
+        self.assertTrue(errors)
+        self.a.refresh_from_db()
+        self.assertEqual(self.a.weight, 40)
+
+    def test_date_order_validated(self):
+        tasks, errors = bulk_edit_tasks([{"id": self.b.id, "end_date": "2025-01-01"}])
+        self.assertEqual(errors[0]["field"], "end_date")
+
+    def test_bad_value_types_are_row_errors(self):
+        tasks, errors = bulk_edit_tasks([
+            {"id": self.a.id, "scope": [self.scope.id], "assigned_to": {"id": 1}},
+            {"id": self.b.id, "start_date": "2025-13-40", "weight": "NaN"},
+        ])
+        self.assertEqual(
+            sorted((e["id"], e["field"]) for e in errors),
+            sorted([(self.a.id, "scope"), (self.a.id, "assigned_to"),
+                    (self.b.id, "start_date"), (self.b.id, "weight")]),
+        )
+
+    def test_tasks_of_other_projects_are_not_found(self):
+        other = ProjectProfile.objects.create(project_source="GC", project_name="Other", location="Cebu")
+        tasks, errors = bulk_edit_tasks([{"id": self.a.id, "weight": 10}], project=other)
+        self.assertEqual(errors, [{"id": self.a.id, "field": None, "error": "Task not found."}])
+
+    def test_api_requires_a_matching_token(self):
+        user = CustomUser.objects.create_user(email="bulk-eg@example.com", password="x")
+        EmailAddress.objects.create(user=user, email=user.email, verified=True, primary=True)
+        profile = UserProfile.objects.create(user=user, role="EG")
+        self.client.force_login(user)
+        body = '{"changes": [{"id": %d, "weight": 30}]}' % self.b.id
+
+        url = reverse("task_bulk_edit_api", args=[self.project.id, "forged", "EG"])
+        self.assertEqual(self.client.post(url, body, content_type="application/json").status_code, 403)
+        url = reverse("task_bulk_edit_api", args=[self.project.id, make_dashboard_token(profile), "EG"])
+        self.assertEqual(self.client.post(url, body, content_type="application/json").status_code, 200)
+
+
+class ProgressEventHandlerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Outbox Test", location="Cebu"
+        )
+        scope = ProjectScope.objects.create(project=cls.project, name="Framing", weight=100)
+        cls.task = ProjectTask.objects.create(
+            project=cls.project, scope=scope, task_name="Walls",
+            start_date=date(2025, 3, 3), end_date=date(2025, 3, 8), weight=100,
+        )
+        cls.pm = UserProfile.objects.create(
+            user=CustomUser.objects.create_user(email="outbox-pm@example.com", password="x"), role="PM")
+        UserProfile.objects.create(
+            user=CustomUser.objects.create_user(email="outbox-om@example.com", password="x"), role="OM")
+
+    def test_submitted_then_approved(self):
+        update = ProgressUpdate.objects.create(task=self.task, reported_by=self.pm, progress_percent=100)
+        publish("progress.submitted", update)
+        self.assertFalse(Notification.objects.exists())
+
+        self.task.progress = 100
+        self.task.save()
+        publish("progress.approved", update)
+        self.assertEqual(dispatch(), (2, 0))
+
+        self.assertEqual(set(Notification.objects.values_list("role", flat=True)), {"OM", None} | (
+            {"EG"} if UserProfile.objects.filter(role="EG").exists() else set()))
+        # The reporter's link signs a fresh token when followed; none is stored
+        self.assertEqual(Notification.objects.get(role=None).link,
+                         reverse("task_list_default", args=[self.project.id]))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.progress, 100)
@@ -5,14 +5,18 @@ urlpatterns = [
     # ---------------------------
     # Scheduling / Tasks
     # ---------------------------
+    path('<int:project_id>/tasks/', views.task_list_default, name='task_list_default'),
     path('<int:project_id>/<str:token>/<str:role>/tasks/', views.task_list, name='task_list'),
     path("<int:project_id>/<str:token>/<str:role>/tasks/add/", views.task_create, name="task_create"),
+    path("<int:project_id>/<str:token>/<str:role>/tasks/import/", views.schedule_import_upload, name="schedule_import_upload"),
+    path("<int:project_id>/<str:token>/<str:role>/tasks/import/<int:job_id>/status/", views.schedule_import_status, name="schedule_import_status"),
     # path("<int:project_id>/<str:token>/<str:role>/tasks/save-imported/", views.save_imported_tasks, name="save_imported_tasks"),
     path("<int:project_id>/<str:token>/<str:role>/tasks/<int:task_id>/update/",views.task_update, name="task_update"),
     path("<int:project_id>/<str:token>/<str:role>/tasks/<int:task_id>/delete/",views.task_archive, name="task_archive"),
     path("<int:project_id>/<str:token>/<str:role>/tasks/bulk-delete/",views.task_bulk_archive, name="task_bulk_archive"),
     path("<int:project_id>/<str:token>/<str:role>/<int:task_id>/unarchive/", views.task_unarchive, name="task_unarchive"),
     path("<int:project_id>/<str:token>/<str:role>/tasks/unarchive-selected/", views.task_bulk_unarchive, name="task_bulk_unarchive"),
+    path("<int:project_id>/<str:token>/<str:role>/tasks/bulk-edit/", views.task_bulk_edit_api, name="task_bulk_edit_api"),
     path("<str:token>/task/<int:task_id>/submit-progress/<str:role>/", views.submit_progress_update, name="submit_progress"),
 path('<int:project_id>/create-scope/', views.create_scope_ajax, name='create_scope_ajax'),
     # ---------------------------
@@ -24,5 +28,11 @@ path('<int:project_id>/create-scope/', views.create_scope_ajax, name='create_sco
     path("progress/history/", views.progress_history, name="progress_history"),
 
     path("api/pending-count/", views.get_pending_count, name="get_pending_count"),
+
+    # ---------------------------
+    # Resource Loading
+    # ---------------------------
+    path("resources/manpower/", views.manpower_loading_chart, name="manpower_loading_chart"),
+    path("api/manpower-loading/", views.manpower_loading_api, name="manpower_loading_api"),
     
 ]
@@ -0,0 +1,162 @@
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from authentication.models import UserProfile
+from scheduling.models import ProjectScope, ProjectTask
+from .work_calendar import calendars_by_id
+
+EDITABLE_FIELDS = {"task_name", "assigned_to", "start_date", "end_date", "weight", "scope"}
+MAX_CHANGES = 500
+
+
+def _error(task_id, field, message):
+    return {"id": task_id, "field": field, "error": message}
+
+
+def _clean_change(task, change, scopes, managers):
+    """Merge one partial change into ``task`` in memory, returning errors."""
+    errors = []
+    unknown = set(change) - EDITABLE_FIELDS - {"id"}
+    if unknown:
+        errors.append(_error(task.id, None, f"Unknown field(s): {', '.join(sorted(unknown))}"))
+
+    if "task_name" in change:
+        name = (change["task_name"] or "").strip()
+        if not name:
+            errors.append(_error(task.id, "task_name", "Task name is required."))
+        task.task_name = name[:255]
+
+    for field in ("start_date", "end_date"):
+        if field in change:
+            try:
+                value = parse_date(change[field]) if isinstance(change[field], str) else None
+            except ValueError:  # well formed but impossible, e.g. 2025-13-40
+                value = None
+            if value is None:
+                errors.append(_error(task.id, field, "Enter a valid date (YYYY-MM-DD)."))
+            else:
+                setattr(task, field, value)
+
+    if "weight" in change:
+        try:
+            weight = Decimal(str(change["weight"]))
+        except (InvalidOperation, TypeError):
+            errors.append(_error(task.id, "weight", "Invalid weight value."))
+        else:
+            if not weight.is_finite() or weight <= 0 or weight > 100:
+                errors.append(_error(task.id, "weight", "Weight must be between 0 and 100."))
+            else:
+                task.weight = weight
+
+    if "scope" in change:
+        scope = scopes.get(change["scope"]) if isinstance(change["scope"], int) else None
+        if scope is None or scope.project_id != task.project_id:
+            errors.append(_error(task.id, "scope", "Scope does not belong to this task's project."))
+        else:
+            task.scope = scope
+
+    if "assigned_to" in change:
+        if change["assigned_to"] in (None, ""):
+            task.assigned_to = None
+        elif isinstance(change["assigned_to"], int) and change["assigned_to"] in managers:
+            task.assigned_to = managers[change["assigned_to"]]
+        else:
+            errors.append(_error(task.id, "assigned_to", "Tasks can only be assigned to Project Managers."))
+
+    if task.start_date and task.end_date and task.end_date < task.start_date:
+        errors.append(_error(task.id, "end_date", "End date cannot be earlier than start date."))
+
+    return errors
+
+
+def bulk_edit_tasks(changes, project=None):
+    """
+    Validate and apply partial edits to many tasks at once.
+
+    ``changes`` is a list of dicts, each with a task ``id`` plus any of
+    ``EDITABLE_FIELDS``. With ``project``, tasks of other projects are
+    reported as not found. Everything is validated together (including the
+    resulting task-weight total of every touched scope) before anything is
+    written; then the tasks are saved with one ``bulk_update`` and each
+    affected project's progress is recomputed once.
+
+    Returns ``(updated_tasks, errors)``; nothing is saved if ``errors``.
+    """
+    if not isinstance(changes, list) or not changes:
+        return [], [_error(None, None, "Provide a non-empty list of changes.")]
+    if len(changes) > MAX_CHANGES:
+        return [], [_error(None, None, f"At most {MAX_CHANGES} tasks can be edited at once.")]
+    if any(not isinstance(c, dict) or not isinstance(c.get("id"), int) for c in changes):
+        return [], [_error(None, "id", "Every change needs an integer task id.")]
+
+    ids = [c["id"] for c in changes]
+    if len(set(ids)) != len(ids):
+        return [], [_error(None, "id", "Each task may appear only once.")]
+
+    with transaction.atomic():
+        queryset = ProjectTask.objects.select_for_update().select_related("project").filter(id__in=ids)
+        if project is not None:
+            queryset = queryset.filter(project=project)
+        tasks = {t.id: t for t in queryset}
+        missing = [i for i in ids if i not in tasks]
+        if missing:
+            return [], [_error(i, None, "Task not found.") for i in missing]
+
+        project_ids = {t.project_id for t in tasks.values()}
+        scope_ids = {c["scope"] for c in changes if isinstance(c.get("scope"), int)}
+        scope_ids |= {t.scope_id for t in tasks.values()}
+        # Lock every scope whose total can change so concurrent edits serialise
+        scopes = {
+            s.id: s for s in ProjectScope.objects.select_for_update()
+            .filter(id__in=scope_ids, project_id__in=project_ids)
+        }
+        manager_ids = {c["assigned_to"] for c in changes if isinstance(c.get("assigned_to"), int)}
+        managers = {p.id: p for p in UserProfile.objects.filter(id__in=manager_ids, role="PM")}
+
+        errors = []
+        for change in changes:
+            errors += _clean_change(tasks[change["id"]], change, scopes, managers)
+
+        # Resulting weight per scope: untouched tasks (one grouped query) + edited ones
+        totals = defaultdict(Decimal)
+        for row in (ProjectTask.objects.filter(scope_id__in=scopes).exclude(id__in=ids)
+                    .values("scope_id").annotate(total=Sum("weight"))):
+            totals[row["scope_id"]] = row["total"] or Decimal("0")
+        for task in tasks.values():
+            totals[task.scope_id] += task.weight or 0
+        for scope_id, total in totals.items():
+            if total > 100:
+                errors.append(_error(
+                    None, "weight",
+                    f"Task weights in scope '{scopes[scope_id].name}' would total {total}% (max 100%)."
+                ))
+
+        if errors:
+            transaction.set_rollback(True)
+            return [], errors
+
+        # Same derived fields ProjectTask.save() would set
+        calendars = calendars_by_id(task.project.calendar_id for task in tasks.values())
+        now = timezone.now()
+        for task in tasks.values():
+            calendar = calendars[task.project.calendar_id]
+            task.duration_days = calendar.working_days(task.start_date, task.end_date)
+            task.manhours = calendar.manhours(task.start_date, task.end_date)
+            task.updated_at = now  # bulk_update skips auto_now
+
+        ProjectTask.objects.bulk_update(
+            tasks.values(),
+            ["task_name", "assigned_to", "start_date", "end_date", "weight", "scope",
+             "duration_days", "manhours", "updated_at"],
+        )
+
+        # One progress/status rollup per affected project
+        for project in {t.project_id: t.project for t in tasks.values()}.values():
+            project.update_progress_from_tasks()
+
+    return list(tasks.values()), []
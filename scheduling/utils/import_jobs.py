@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from scheduling.models import ScheduleImportJob
+from .pdf_reader import extract_project_info
+
+MAX_ATTEMPTS = 3
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest queued job to Running and return it.
+
+    The claim is a conditional UPDATE, so several workers (threads or
+    processes) can poll the same table without picking up the same job.
+    """
+    while True:
+        job_id = (
+            ScheduleImportJob.objects.filter(status="QU")
+            .order_by("created_at")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+
+        claimed = ScheduleImportJob.objects.filter(id=job_id, status="QU").update(
+            status="RN",
+            started_at=timezone.now(),
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return ScheduleImportJob.objects.get(id=job_id)
+        # Another worker won the race, try the next one
+
+
+def requeue_stale_jobs(timeout_minutes=30):
+    """Put jobs left Running by a crashed worker back on the queue."""
+    cutoff = timezone.now() - timedelta(minutes=timeout_minutes)
+    stale = ScheduleImportJob.objects.filter(status="RN", started_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status="FL",
+        error="Worker stopped responding while parsing this file.",
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(status="QU", started_at=None)
+    return requeued, failed
+
+
+def accepted_tasks(tasks):
+    """Only rows with both dates can become tasks."""
+    return [t for t in tasks if t["start_date"] and t["end_date"]]
+
+
+def run_import_job(job):
+    """Parse the job's PDF, recording page/row progress as it goes."""
+    def on_page(pages_parsed, pages_total, tasks):
+        ScheduleImportJob.objects.filter(pk=job.pk).update(
+            pages_parsed=pages_parsed,
+            pages_total=pages_total,
+            rows_accepted=len(accepted_tasks(tasks)),
+        )
+
+    try:
+        with job.file.open("rb") as fh:
+            project_info = extract_project_info(fh, on_page=on_page)
+    except Exception as e:
+        ScheduleImportJob.objects.filter(pk=job.pk).update(
+            status="FL",
+            error=str(e)[:1000],
+            finished_at=timezone.now(),
+        )
+        return False
+
+    project_info["tasks"] = accepted_tasks(project_info["tasks"])
+    ScheduleImportJob.objects.filter(pk=job.pk).update(
+        status="DN",
+        result=project_info,
+        rows_accepted=len(project_info["tasks"]),
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def process_next_job():
+    """Claim and run one job. Returns False when the queue is empty."""
+    close_old_connections()
+    job = claim_next_job()
+    if job is None:
+        return False
+    try:
+        run_import_job(job)
+    finally:
+        close_old_connections()
+    return True
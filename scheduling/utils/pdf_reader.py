@@ -11,7 +11,14 @@ def parse_date(date_str):
     return None
 
 
-def extract_project_info(pdf_path):
+def extract_project_info(pdf_path, on_page=None):
+    """
+    Parse a schedule PDF into project headers and task rows.
+
+    ``on_page`` is called after every page as ``on_page(pages_parsed,
+    pages_total, tasks)``, with the task rows parsed so far, so background
+    imports can report progress.
+    """
     project_info = {
         "proj_id": None,
         "project": None,
@@ -21,7 +28,8 @@ def extract_project_info(pdf_path):
     }
 
     with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
+        pages_total = len(pdf.pages)
+        for page_number, page in enumerate(pdf.pages, start=1):
             words = page.extract_words()
 
             # Group words by vertical position
@@ -88,7 +96,7 @@ def extract_project_info(pdf_path):
         "scope": project_info.get("scope")  # default from header if available
     })
 
-
-
+            if on_page:
+                on_page(page_number, pages_total, project_info["tasks"])
 
     return project_info
@@ -0,0 +1,136 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from scheduling.models import ProjectTask
+from .work_calendar import calendars_by_id
+
+HOURS_PER_DAY = 8
+
+
+def active_tasks(project_id=None, assignee_id=None):
+    """Tasks that still generate workload: not archived, not completed."""
+    tasks = ProjectTask.objects.filter(is_archived=False, is_completed=False)
+    if project_id:
+        tasks = tasks.filter(project_id=project_id)
+    if assignee_id:
+        tasks = tasks.filter(assigned_to_id=assignee_id)
+    return tasks
+
+
+def _empty():
+    return {"dates": [], "total": [], "by_project": [], "by_scope": [], "by_assignee": []}
+
+
+def _assignee_label(first, last, email):
+    name = f"{first or ''} {last or ''}".strip()
+    return name or email or "Unassigned"
+
+
+def _group_series(keys, labels, starts, ends, rates, n_days, calendars, masks):
+    """
+    Daily demand per group via a difference array: +rate on the first day
+    of each task, -rate the day after it ends, then one cumulative sum.
+    Tasks are split by work calendar so rest days and holidays of each
+    calendar can be zeroed with its working-day mask.
+    """
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    diff = np.zeros((len(masks), len(uniq), n_days + 1))
+    np.add.at(diff, (calendars, inverse, starts), rates)
+    np.add.at(diff, (calendars, inverse, ends + 1), -rates)
+    loading = (np.cumsum(diff, axis=2)[:, :, :n_days] * masks[:, None, :]).sum(axis=0)
+
+    series = []
+    for row, key in enumerate(uniq):
+        hours = np.round(loading[row], 2)
+        series.append({
+            "id": None if key == 0 else int(key),
+            "label": labels[int(key)],
+            "hours": hours.tolist(),
+            "total": round(float(hours.sum()), 2),
+            "peak": round(float(hours.max()), 2),
+        })
+    series.sort(key=lambda s: s["total"], reverse=True)
+    return series
+
+
+def manpower_loading(tasks=None, start=None, end=None):
+    """
+    Daily manhour demand per assignee, scope and project for ``tasks``
+    (default: every active task), computed in one pass over the task rows.
+
+    Each task's ``manhours`` is spread evenly over the working days of its
+    start-end span, using the project's work calendar.
+    ``start``/``end`` clip the window; by default it covers all tasks.
+    """
+    if tasks is None:
+        tasks = active_tasks()
+
+    rows = list(tasks.values_list(
+        "start_date", "end_date", "manhours", "duration_days",
+        "project_id", "project__project_name", "project__calendar_id",
+        "scope_id", "scope__name",
+        "assigned_to_id", "assigned_to__user__first_name",
+        "assigned_to__user__last_name", "assigned_to__user__email",
+    ))
+    rows = [r for r in rows if r[0] and r[1] and r[1] >= r[0]]
+    if not rows:
+        return _empty()
+
+    task_starts = np.array([r[0].toordinal() for r in rows])
+    task_ends = np.array([r[1].toordinal() for r in rows])
+
+    window_start = start.toordinal() if start else int(task_starts.min())
+    window_end = end.toordinal() if end else int(task_ends.max())
+    n_days = window_end - window_start + 1
+    if n_days <= 0:
+        return _empty()
+
+    # Tasks outside the window contribute nothing
+    visible = (task_ends >= window_start) & (task_starts <= window_end)
+    rows = [r for r, keep in zip(rows, visible) if keep]
+    if not rows:
+        return _empty()
+    task_starts, task_ends = task_starts[visible], task_ends[visible]
+
+    calendar_ids, calendars = np.unique(
+        np.array([r[6] or 0 for r in rows]), return_inverse=True
+    )
+    by_id = calendars_by_id(int(cal_id) for cal_id in calendar_ids)
+    indexes = [by_id[int(cal_id) or None] for cal_id in calendar_ids]
+    first_day = date.fromordinal(window_start)
+    last_day = date.fromordinal(window_end)
+    masks = np.array([index.mask(first_day, last_day) for index in indexes], dtype=float)
+
+    working_days = np.array([
+        indexes[cal].working_days(r[0], r[1]) for r, cal in zip(rows, calendars)
+    ])
+    manhours = np.array([
+        float(r[2]) if r[2] is not None else float(r[3] or 0) * HOURS_PER_DAY
+        for r in rows
+    ])
+    rates = np.divide(manhours, working_days, out=np.zeros(len(rows)), where=working_days > 0)
+
+    starts = np.clip(task_starts - window_start, 0, None)
+    ends = np.clip(task_ends - window_start, None, n_days - 1)
+
+    project_labels = {r[4]: r[5] for r in rows}
+    scope_labels = {r[7]: f"{r[8]} ({r[5]})" for r in rows}
+    assignee_labels = {r[9] or 0: _assignee_label(r[10], r[11], r[12]) for r in rows}
+
+    def series(keys, labels):
+        return _group_series(np.array(keys), labels, starts, ends, rates, n_days, calendars, masks)
+
+    by_project = series([r[4] for r in rows], project_labels)
+    by_scope = series([r[7] for r in rows], scope_labels)
+    by_assignee = series([r[9] or 0 for r in rows], assignee_labels)
+
+    total = np.round(np.sum([s["hours"] for s in by_project], axis=0), 2)
+
+    return {
+        "dates": [(first_day + timedelta(days=i)).isoformat() for i in range(n_days)],
+        "total": total.tolist(),
+        "by_project": by_project,
+        "by_scope": by_scope,
+        "by_assignee": by_assignee,
+    }
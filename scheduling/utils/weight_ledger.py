@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from scheduling.models import ProjectScope
+
+ZERO = Value(Decimal("0"), output_field=DecimalField(max_digits=7, decimal_places=2))
+HUNDRED = Decimal("100")
+
+
+def _lock(queryset):
+    """
+    Row-lock ``queryset`` when running inside a transaction so concurrent
+    writers validating against the same rows queue up behind us.
+    """
+    if transaction.get_connection().in_atomic_block:
+        list(queryset.select_for_update().values_list("id", flat=True))
+
+
+def scope_weight_ledger(project, exclude_task=None, scopes=None, lock=False):
+    """
+    Allocated and remaining task weight for every scope of ``project``,
+    computed with one grouped aggregate instead of a loop per scope.
+
+    Returns ``{scope_id: {"weight", "allocated", "remaining"}}``. Pass
+    ``exclude_task`` when editing a task so its current weight is not
+    counted, and ``lock=True`` (inside ``transaction.atomic``) to hold the
+    scope rows until the caller's task insert/update commits.
+    """
+    qs = ProjectScope.objects.filter(project=project)
+    if scopes is not None:
+        qs = qs.filter(id__in=[getattr(s, "id", s) for s in scopes])
+    if lock:
+        _lock(qs)
+
+    task_filter = Q()
+    if exclude_task is not None:
+        # Written as two positive lookups: a negated lookup across the
+        # reverse FK would turn into a NOT IN subquery
+        task_id = getattr(exclude_task, "id", exclude_task)
+        task_filter = Q(tasks__id__lt=task_id) | Q(tasks__id__gt=task_id)
+
+    rows = qs.annotate(
+        allocated=Coalesce(Sum("tasks__weight", filter=task_filter), ZERO)
+    ).values_list("id", "weight", "allocated")
+
+    return {
+        scope_id: {
+            "weight": weight,
+            "allocated": allocated,
+            "remaining": max(Decimal("0"), HUNDRED - allocated),
+        }
+        for scope_id, weight, allocated in rows
+    }
+
+
+def scope_remaining_map(project, exclude_task=None, scopes=None):
+    """``{scope_id: remaining}`` for the task form's client-side checks."""
+    return {
+        scope_id: entry["remaining"]
+        for scope_id, entry in scope_weight_ledger(project, exclude_task, scopes).items()
+    }
+
+
+def project_scope_weight(project, exclude_scope=None, lock=False):
+    """
+    Total weight already assigned to the project's scopes. With ``lock``,
+    the project row is locked so two scopes can't both claim the last
+    percentage points.
+    """
+    from project_profiling.models import ProjectProfile
+
+    if lock:
+        _lock(ProjectProfile.objects.filter(pk=project.pk))
+
+    qs = ProjectScope.objects.filter(project=project)
+    if exclude_scope is not None:
+        qs = qs.exclude(id=getattr(exclude_scope, "id", exclude_scope))
+    return qs.aggregate(total=Coalesce(Sum("weight"), ZERO))["total"]
@@ -0,0 +1,214 @@
+import logging
+import re
+from datetime import date
+from decimal import Decimal
+from threading import Lock
+from typing import NamedTuple
+
+import numpy as np
+from django.db.models import Q
+
+from scheduling.models import WorkCalendar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKWEEK = "1111110"  # Monday to Saturday
+DEFAULT_HOURS_PER_DAY = Decimal("8")
+YEARS_AROUND_TODAY = 10
+MAX_FINISH_YEARS = 100  # finish_date gives up this far past the start
+
+
+class _Span(NamedTuple):
+    """Working-day arrays for the years ``first_year``..``last_year``."""
+    first_year: int
+    last_year: int
+    base: int
+    working: np.ndarray
+    cum: np.ndarray
+
+    def covers(self, *dates):
+        return all(self.first_year <= d.year <= self.last_year for d in dates)
+
+    def pos(self, d):
+        return d.toordinal() - self.base
+
+
+class BusinessDayIndex:
+    """
+    Precomputed working-day lookup for one calendar.
+
+    ``cum[i]`` is the number of working days before day ``i`` of the
+    covered range, so counting the working days between two dates, or
+    finding the date that is N working days after another, is an O(1)
+    array lookup (or one ``searchsorted``) instead of a day-by-day loop.
+
+    Indexes are shared between threads through the module cache, so the
+    arrays are never changed in place: a date outside the covered range
+    builds a wider ``_Span`` under ``_cache_lock`` and swaps it in, and
+    each lookup reads the span once.
+    """
+
+    def __init__(self, workweek=DEFAULT_WORKWEEK, holidays=(), recurring=(),
+                 hours_per_day=DEFAULT_HOURS_PER_DAY, first_year=None, last_year=None):
+        today = date.today()
+        if not re.fullmatch(r"[01]{7}", workweek or "") or "1" not in workweek:
+            # Rows saved before WorkCalendar validated its workweek
+            logger.warning("Invalid workweek %r, using %s", workweek, DEFAULT_WORKWEEK)
+            workweek = DEFAULT_WORKWEEK
+        self.workweek = workweek
+        self.holidays = tuple(holidays)
+        self.recurring = tuple(recurring)  # (month, day) pairs
+        self.hours_per_day = Decimal(hours_per_day)
+        self._span = self._build(
+            first_year or today.year - YEARS_AROUND_TODAY,
+            last_year or today.year + YEARS_AROUND_TODAY,
+        )
+
+    @property
+    def first_year(self):
+        return self._span.first_year
+
+    @property
+    def last_year(self):
+        return self._span.last_year
+
+    def _build(self, first_year, last_year):
+        base = date(first_year, 1, 1).toordinal()
+        n_days = date(last_year, 12, 31).toordinal() - base + 1
+
+        ordinals = base + np.arange(n_days)
+        weekdays = (ordinals - 1) % 7  # date.fromordinal(1) is a Monday
+        week_mask = np.array([flag == "1" for flag in self.workweek])
+        working = week_mask[weekdays]
+
+        off_days = [d.toordinal() for d in self.holidays]
+        for year in range(first_year, last_year + 1):
+            for month, day in self.recurring:
+                try:
+                    off_days.append(date(year, month, day).toordinal())
+                except ValueError:  # Feb 29 on a non-leap year
+                    continue
+        off = np.array(off_days, dtype=np.int64) - base
+        working[off[(off >= 0) & (off < n_days)]] = False
+
+        cum = np.concatenate(([0], np.cumsum(working)))
+        return _Span(first_year, last_year, base, working, cum)
+
+    def _widen(self, first_year, last_year):
+        with _cache_lock:
+            span = self._span
+            if span.first_year > first_year or span.last_year < last_year:
+                span = self._build(min(span.first_year, first_year), max(span.last_year, last_year))
+                self._span = span
+            return span
+
+    def _ensure(self, *dates):
+        """A span covering ``dates``."""
+        span = self._span
+        if span.covers(*dates):
+            return span
+        years = [d.year for d in dates]
+        return self._widen(min(years), max(years))
+
+    def is_working_day(self, d):
+        span = self._ensure(d)
+        return bool(span.working[span.pos(d)])
+
+    def working_days(self, start, end):
+        """Working days from ``start`` to ``end``, both inclusive."""
+        if end < start:
+            return 0
+        span = self._ensure(start, end)
+        return int(span.cum[span.pos(end) + 1] - span.cum[span.pos(start)])
+
+    def working_days_between(self, start, end):
+        """Working days in the half-open range ``[start, end)``."""
+        if end <= start:
+            return 0
+        span = self._ensure(start, end)
+        return int(span.cum[span.pos(end)] - span.cum[span.pos(start)])
+
+    def manhours(self, start, end):
+        return self.working_days(start, end) * self.hours_per_day
+
+    def finish_date(self, start, duration):
+        """
+        Date on which a task of ``duration`` working days that starts on
+        ``start`` finishes (the start counts if it is a working day).
+        """
+        duration = int(duration)
+        if duration <= 0:
+            return start
+        span = self._ensure(start)
+        while span.cum[span.pos(start)] + duration > span.cum[-1]:
+            if span.last_year - start.year >= MAX_FINISH_YEARS:
+                raise ValueError(f"No finish date within {MAX_FINISH_YEARS} years of {start}.")
+            span = self._widen(span.first_year, span.last_year + YEARS_AROUND_TODAY)
+        target = span.cum[span.pos(start)] + duration
+        # First position whose running count reaches the target
+        idx = int(np.searchsorted(span.cum, target, side="left")) - 1
+        return date.fromordinal(span.base + idx)
+
+    def mask(self, start, end):
+        """Boolean working-day array for ``start``..``end`` inclusive."""
+        span = self._ensure(start, end)
+        return span.working[span.pos(start):span.pos(end) + 1]
+
+
+_cache = {}
+_cache_lock = Lock()
+
+
+def _index_for(calendar):
+    if calendar is None:
+        key, version = None, None
+    else:
+        key, version = calendar.pk, calendar.updated_at
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+    if calendar is None:
+        index = BusinessDayIndex()
+    else:
+        holidays = list(calendar.holidays.values_list("date", "recurring"))
+        index = BusinessDayIndex(
+            workweek=calendar.workweek,
+            holidays=[d for d, recurring in holidays if not recurring],
+            recurring=[(d.month, d.day) for d, recurring in holidays if recurring],
+            hours_per_day=calendar.hours_per_day,
+        )
+
+    with _cache_lock:
+        _cache[key] = (version, index)
+    return index
+
+
+def default_calendar():
+    """Index for the calendar marked default (Mon-Sat, no holidays if none is)."""
+    return _index_for(WorkCalendar.objects.filter(is_default=True).first())
+
+
+def get_calendar(calendar_id=None):
+    """Index for ``calendar_id``, falling back to the default calendar."""
+    calendar = WorkCalendar.objects.filter(pk=calendar_id).first() if calendar_id else None
+    return _index_for(calendar) if calendar else default_calendar()
+
+
+def calendar_for_project(project):
+    return get_calendar(getattr(project, "calendar_id", None))
+
+
+def calendars_by_id(calendar_ids):
+    """
+    Indexes for several calendar ids in one query, for loops over projects
+    or tasks. Keyed by id; ``None`` and unknown ids map to the default.
+    """
+    ids = {calendar_id for calendar_id in calendar_ids if calendar_id}
+    rows = {c.pk: c for c in WorkCalendar.objects.filter(Q(pk__in=ids) | Q(is_default=True))}
+    default = _index_for(next((c for c in rows.values() if c.is_default), None))
+    indexes = {calendar_id: _index_for(rows[calendar_id]) if calendar_id in rows else default for calendar_id in ids}
+    indexes[None] = default
+    return indexes
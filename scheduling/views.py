@@ -14,10 +14,10 @@ from django.views.decorators.http import require_http_methods
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.dateparse import parse_date
+from django.db import transaction
 from django.db.models import Q
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from notifications.models import Notification, NotificationStatus
 from authentication.utils.tokens import parse_dashboard_token, make_dashboard_token
 
 # Authentication utils & decorators
@@ -26,13 +26,16 @@ from authentication.models import UserProfile
 from authentication.utils.tokens import parse_dashboard_token, SignatureExpired, BadSignature
 from authentication.utils.decorators import verified_email_required, role_required
 from authentication.templatetags.role_tags import has_role
-from notifications.utils import send_notification
+from outbox.bus import publish
 
 # Local app imports
-from .models import ProjectTask, ProgressFile, ProgressUpdate, ProjectScope
+from .models import ProjectTask, ProgressFile, ProgressUpdate, ProjectScope, ScheduleImportJob
 
 from .forms import ProjectTaskForm, ProgressUpdateForm
 from .utils.pdf_reader import extract_project_info
+from .utils.weight_ledger import scope_remaining_map, project_scope_weight
+from .utils.resource_loading import manpower_loading, active_tasks
+from .utils.bulk_edit import bulk_edit_tasks
 from project_profiling.models import ProjectProfile
 from project_profiling.utils import recalc_project_progress
 @login_required
@@ -85,41 +88,18 @@ def submit_progress_update(request, token, task_id, role):
         files = request.FILES.getlist("attachments")
 
         if form.is_valid():
-            # Save progress update
-            update = form.save(commit=False)
-            update.task = task
-            update.reported_by = verified_profile
-            update.save()
-
-            # Save attachments
-            for f in files:
-                ProgressFile.objects.create(update=update, file=f)
-
-            # Notify OMs and EGs
-            om_eg_users = UserProfile.objects.filter(role__in=["OM", "EG"])
-            notif_message = (
-                f"{verified_profile.full_name} submitted a progress report "
-                f"for Project '{task.project.project_name}' (Task: {task.task_name})"
-            )
+            # Save progress update; notifications go out through the outbox
+            with transaction.atomic():
+                update = form.save(commit=False)
+                update.task = task
+                update.reported_by = verified_profile
+                update.save()
 
-            if om_eg_users.exists():
-                notif = Notification.objects.create(
-                    message=notif_message,
-                    link=reverse("review_updates")
-                )
-                for user in om_eg_users:
-                    NotificationStatus.objects.create(notification=notif, user=user)
-
-            # Notify the PM themselves
-            notif_pm = Notification.objects.create(
-                message=f"You submitted a progress report for Project '{task.project.project_name}' (Task: {task.task_name})",
-                link=reverse("task_list", kwargs={
-                    "project_id": task.project.id,
-                    "token": token,
-                    "role": role
-                })
-            )
-            NotificationStatus.objects.create(notification=notif_pm, user=verified_profile)
+                # Save attachments
+                for f in files:
+                    ProgressFile.objects.create(update=update, file=f)
+
+                publish("progress.submitted", update)
 
             # Success message for PM
             messages.success(
@@ -175,29 +155,31 @@ def review_updates(request):
 def approve_update(request, update_id):
     update = get_object_or_404(ProgressUpdate, id=update_id)
 
-    update.status = "A"
-    update.reviewed_by = request.user.userprofile
-    update.reviewed_at = timezone.now()
-    update.save(update_fields=["status", "reviewed_by", "reviewed_at"])
-
-    task = update.task
-    approved_updates = task.updates.filter(status="A")
-    total_progress = sum(u.progress_percent for u in approved_updates)
-    task.progress = min(total_progress, 100)
-
-    if task.progress >= 100:
-        task.is_completed = True
-        task.status = "CP"
-    elif task.progress > 0:
-        task.is_completed = False
-        task.status = "OG"
-    else:
-        task.is_completed = False
-        task.status = "PL"
+    with transaction.atomic():
+        update.status = "A"
+        update.reviewed_by = request.user.userprofile
+        update.reviewed_at = timezone.now()
+        update.save(update_fields=["status", "reviewed_by", "reviewed_at"])
+
+        task = update.task
+        approved_updates = task.updates.filter(status="A")
+        total_progress = sum(u.progress_percent for u in approved_updates)
+        task.progress = min(total_progress, 100)
+
+        if task.progress >= 100:
+            task.is_completed = True
+            task.status = "CP"
+        elif task.progress > 0:
+            task.is_completed = False
+            task.status = "OG"
+        else:
+            task.is_completed = False
+            task.status = "PL"
 
-    task.save(update_fields=["progress", "is_completed", "status"])
+        task.save(update_fields=["progress", "is_completed", "status"])
 
-    task.project.update_progress_from_tasks()
+        # The project rollup runs in the outbox dispatcher
+        publish("progress.approved", update)
 
     messages.success(request, f"Progress update for '{task.task_name}' approved successfully.")
     return redirect("review_updates")
@@ -216,6 +198,18 @@ def reject_update(request, update_id):
     return redirect("review_updates")
 
 
+@login_required
+def task_list_default(request, project_id):
+    """
+    Token-free link to a project's task list, for links stored outside a
+    session (e.g. notifications): signs a fresh token for the current user.
+    """
+    profile = getattr(request.user, "userprofile", None)
+    if not profile:
+        return redirect("unauthorized")
+    return redirect("task_list", project_id, make_dashboard_token(profile), profile.role)
+
+
 @login_required
 @verified_email_required
 @role_required("PM", "OM", "EG")
@@ -276,20 +270,21 @@ def create_scope_ajax(request, project_id):
         if weight <= 0 or weight > 100:
             return JsonResponse({'error': 'Weight must be between 0 and 100'}, status=400)
         
-        # Check if total weight would exceed 100%
-        existing_total = sum(float(scope.weight) for scope in project.scopes.all())
-        if existing_total + weight > 100:
-            remaining = 100 - existing_total
-            return JsonResponse({
-                'error': f'Total weight would exceed 100%. Maximum available: {remaining:.2f}%'
-            }, status=400)
-        
-        # Create the scope
-        scope = ProjectScope.objects.create(
-            project=project,
-            name=name,
-            weight=weight
-        )
+        with transaction.atomic():
+            # Check if total weight would exceed 100% (project row locked until insert)
+            existing_total = float(project_scope_weight(project, lock=True))
+            if existing_total + weight > 100:
+                remaining = 100 - existing_total
+                return JsonResponse({
+                    'error': f'Total weight would exceed 100%. Maximum available: {remaining:.2f}%'
+                }, status=400)
+
+            # Create the scope
+            scope = ProjectScope.objects.create(
+                project=project,
+                name=name,
+                weight=weight
+            )
         
         return JsonResponse({
             'id': scope.id,
@@ -320,25 +315,23 @@ def task_create(request, project_id, token, role):
         budget_categories__isnull=False  # Only scopes with budget entries
     ).distinct().order_by('name')
     
-    # Calculate remaining weights for budget planning scopes only
-    scope_remaining = {}
-    for scope in budget_scopes:
-        total_weight = sum(t.weight for t in scope.tasks.all())
-        scope_remaining[scope.id] = max(0, scope.weight - total_weight)
-
     form = ProjectTaskForm(project=project)  # Pass project to form
 
     if request.method == "POST":
         form = ProjectTaskForm(request.POST, project=project)
-        if form.is_valid():
-            task = form.save(commit=False)
-            task.project = project
-            task.save()
-            form.save_m2m()
-            messages.success(request, f"Task '{task.task_name}' was successfully created.")
-            return redirect("task_list", project.id, token, role)
-        else:
-            messages.error(request, "Failed to create task. Please check the form and try again.")
+        # Validate and save under the scope lock taken in form.clean()
+        with transaction.atomic():
+            if form.is_valid():
+                task = form.save(commit=False)
+                task.project = project
+                task.save()
+                form.save_m2m()
+                messages.success(request, f"Task '{task.task_name}' was successfully created.")
+                return redirect("task_list", project.id, token, role)
+        messages.error(request, "Failed to create task. Please check the form and try again.")
+
+    # Remaining weights for budget planning scopes only
+    scope_remaining = scope_remaining_map(project, scopes=budget_scopes)
 
     return render(request, "scheduling/task_form.html", {
         "form": form,
@@ -349,6 +342,53 @@ def task_create(request, project_id, token, role):
         "scope_remaining_json": json.dumps(scope_remaining, cls=DjangoJSONEncoder),
     })
 
+@login_required
+@verified_email_required
+@role_required("EG", "OM")
+@require_http_methods(["POST"])
+def schedule_import_upload(request, project_id, token, role):
+    """
+    Queue a PDF schedule for the background import worker and return the
+    job id. Parsing happens in `manage.py process_import_jobs`.
+    """
+    verified_profile = verify_user_token(request, token, role)
+    if not verified_profile:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
+
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    pdf = request.FILES.get("schedule_pdf")
+
+    if not pdf:
+        return JsonResponse({"error": "Please choose a PDF file to import."}, status=400)
+    if not pdf.name.lower().endswith(".pdf"):
+        return JsonResponse({"error": "Only PDF files can be imported."}, status=400)
+
+    job = ScheduleImportJob.objects.create(
+        project=project,
+        uploaded_by=verified_profile,
+        file=pdf,
+    )
+    return JsonResponse({
+        **job.as_status_dict(),
+        "status_url": reverse("schedule_import_status", args=[project.id, token, role, job.id]),
+    }, status=202)
+
+
+@login_required
+@verified_email_required
+@role_required("EG", "OM")
+def schedule_import_status(request, project_id, token, role, job_id):
+    """Polling endpoint: current progress, plus parsed rows once done."""
+    verified_profile = verify_user_token(request, token, role)
+    if not verified_profile:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
+
+    job = get_object_or_404(ScheduleImportJob, id=job_id, project_id=project_id)
+    data = job.as_status_dict()
+    if job.status == "DN":
+        data["result"] = job.result
+    return JsonResponse(data)
+
 # @login_required
 # @verified_email_required
 # @role_required("EG", "OM")
@@ -436,34 +476,31 @@ def task_update(request, project_id, token, role, task_id):
         budget_categories__isnull=False  # Only scopes with budget entries
     ).distinct().order_by('name')
     
-    # Calculate remaining weights for budget planning scopes only
-    scope_remaining = {}
-    for scope in budget_scopes:
-        # Exclude current task's weight when calculating remaining
-        total_weight = sum(t.weight for t in scope.tasks.exclude(id=task.id))
-        scope_remaining[scope.id] = max(0, scope.weight - total_weight)
-
     if request.method == "POST":
         form = ProjectTaskForm(request.POST, instance=task, project=project)
         assigned_to_id = request.POST.get("assigned_to")
 
-        if form.is_valid():
-            try:
-                task = form.save(commit=False)
-                if assigned_to_id:
-                    assigned_user = UserProfile.objects.filter(id=assigned_to_id).first()
-                    task.assigned_to = assigned_user
-                task.save()
-                form.save_m2m()
-                messages.success(request, f"Task '{task.task_name}' updated successfully!")
-                return redirect("task_list", project.id, token, role)
-            except Exception as e:
-                messages.error(request, f"Error updating task: {str(e)}")
-        else:
+        try:
+            # Validate and save under the scope lock taken in form.clean()
+            with transaction.atomic():
+                if form.is_valid():
+                    task = form.save(commit=False)
+                    if assigned_to_id:
+                        assigned_user = UserProfile.objects.filter(id=assigned_to_id).first()
+                        task.assigned_to = assigned_user
+                    task.save()
+                    form.save_m2m()
+                    messages.success(request, f"Task '{task.task_name}' updated successfully!")
+                    return redirect("task_list", project.id, token, role)
             messages.error(request, "Invalid form data. Please correct the errors below.")
+        except Exception as e:
+            messages.error(request, f"Error updating task: {str(e)}")
     else:
         form = ProjectTaskForm(instance=task, project=project)
 
+    # Remaining weights for budget planning scopes only, excluding this task
+    scope_remaining = scope_remaining_map(project, exclude_task=task, scopes=budget_scopes)
+
     context = {
         "form": form,
         "project": project,
@@ -477,6 +514,47 @@ def task_update(request, project_id, token, role, task_id):
     return render(request, "scheduling/task_edit.html", context)
 
 
+@login_required
+@verified_email_required
+@role_required("EG", "OM")
+@require_http_methods(["POST"])
+def task_bulk_edit_api(request, project_id, token, role):
+    """
+    Apply partial edits to many of a project's tasks in one request.
+
+    Body: {"changes": [{"id": 12, "weight": 20, "end_date": "2025-06-30"}, ...]}
+    Editable fields: task_name, assigned_to, start_date, end_date, weight, scope.
+    All changes are validated together; if any fails, nothing is saved.
+    """
+    verified_profile = verify_user_token(request, token, role)
+    if not verified_profile:
+        return JsonResponse({"error": "Unauthorized"}, status=403)
+
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON data'}, status=400)
+
+    tasks, errors = bulk_edit_tasks(data.get("changes") if isinstance(data, dict) else None, project=project)
+    if errors:
+        return JsonResponse({'success': False, 'errors': errors}, status=400)
+
+    return JsonResponse({
+        'success': True,
+        'updated': len(tasks),
+        'tasks': [
+            {
+                'id': t.id,
+                'duration_days': t.duration_days,
+                'manhours': t.manhours,
+                'project_progress': t.project.progress,
+            }
+            for t in tasks
+        ],
+    }, encoder=DjangoJSONEncoder)
+
+
 @login_required
 @verified_email_required
 @role_required("EG", "OM")
@@ -551,3 +629,40 @@ def task_unarchive(request, project_id, token, role, task_id):
 
     messages.success(request, f"Task '{task.name}' has been unarchived.")
     return redirect("task_list", project_id=project.id, token=token, role=role)
+
+
+@login_required
+@verified_email_required
+@role_required("EG", "OM")
+def manpower_loading_api(request):
+    """
+    Daily manhour demand across the portfolio, grouped by project, scope and
+    assignee. Optional filters: ?start=&end=&project=&assignee=
+    """
+    try:
+        start = parse_date(request.GET.get("start") or "")
+        end = parse_date(request.GET.get("end") or "")
+    except ValueError:  # well formed but impossible, e.g. 2025-13-40
+        return JsonResponse({"error": "Invalid start or end date."}, status=400)
+    project_id = request.GET.get("project")
+    assignee_id = request.GET.get("assignee")
+
+    tasks = active_tasks(
+        project_id=project_id if project_id and project_id.isdigit() else None,
+        assignee_id=assignee_id if assignee_id and assignee_id.isdigit() else None,
+    )
+    return JsonResponse(manpower_loading(tasks, start=start, end=end))
+
+
+@login_required
+@verified_email_required
+@role_required("EG", "OM")
+def manpower_loading_chart(request):
+    return render(request, "scheduling/manpower_loading.html", {
+        "projects": ProjectProfile.objects.filter(archived=False).only("id", "project_name"),
+        "project_managers": UserProfile.objects.filter(role="PM").select_related("user"),
+        "selected_project": request.GET.get("project", ""),
+        "selected_assignee": request.GET.get("assignee", ""),
+        "start": request.GET.get("start", ""),
+        "end": request.GET.get("end", ""),
+    })
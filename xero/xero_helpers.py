@@ -8,9 +8,13 @@ def get_xero_connections(request):
     """Get all available Xero connections/organizations"""
     if not request.user.is_authenticated:
         return {'error': 'User not authenticated'}
-    
+    return xero_connections(request.user)
+
+
+def xero_connections(user):
+    """``get_xero_connections`` for a user, for code running outside a request"""
     try:
-        xero_conn = XeroConnection.objects.get(user=request.user.userprofile)
+        xero_conn = XeroConnection.objects.get(user=user.userprofile)
         if not xero_conn.is_valid():
             return {'error': 'Xero connection expired. Please reconnect.'}
         
@@ -39,9 +43,16 @@ def make_xero_api_call(request, endpoint, method='GET', data=None, tenant_id=Non
     """
     if not request.user.is_authenticated:
         return {'error': 'User not authenticated'}
-    
+    return xero_api_call(request.user, endpoint, method=method, data=data, tenant_id=tenant_id)
+
+
+def xero_api_call(user, endpoint, method='GET', data=None, tenant_id=None, idempotency_key=None):
+    """
+    ``make_xero_api_call`` for a user, for code running outside a request.
+    ``idempotency_key`` makes Xero apply a retried POST only once.
+    """
     try:
-        xero_conn = XeroConnection.objects.get(user=request.user.userprofile)
+        xero_conn = XeroConnection.objects.get(user=user.userprofile)
         if not xero_conn.is_valid():
             return {'error': 'Xero connection expired. Please reconnect.'}
         
@@ -55,7 +66,7 @@ def make_xero_api_call(request, endpoint, method='GET', data=None, tenant_id=Non
     
     if not tenant_id:
         # Get the first available connection and store it
-        connections_result = get_xero_connections(request)
+        connections_result = xero_connections(user)
         if connections_result.get('success') and connections_result['connections']:
             tenant_id = connections_result['connections'][0]['tenantId']
             xero_conn.tenant_id = tenant_id
@@ -72,6 +83,8 @@ def make_xero_api_call(request, endpoint, method='GET', data=None, tenant_id=Non
     
     if method.upper() == 'POST':
         headers['Content-Type'] = 'application/json'
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
     
     try:
         url = f"https://api.xero.com/api.xro/2.0/{endpoint}"
@@ -1,5 +1,5 @@
 # manage_client/xero_sync.py (create this new file)
-from .xero_helpers import make_xero_api_call
+from .xero_helpers import make_xero_api_call, xero_api_call
 from django.contrib import messages
 import logging
 from django.utils import timezone
@@ -20,8 +20,11 @@ def sync_client_to_xero(request, client):
     """
     if not has_xero_connection(request.user):
         return {'success': False, 'error': 'Not connected to Xero'}
-    
-    # Prepare contact data for Xero - use correct field names
+    return push_client_contact(request.user, client)
+
+
+def client_contact_data(client):
+    """Xero ``Contacts`` payload for a client - use correct field names"""
     contact_data = {
         "Contacts": [{
             "Name": client.company_name,
@@ -52,37 +55,41 @@ def sync_client_to_xero(request, client):
     if not client.phone:
         contact_data["Contacts"][0].pop("Phones", None)
     
-    print("DEBUG: Xero contact data being sent:")
-    print(contact_data)
-    
-    # Make API call to create contact
-    result = make_xero_api_call(request, 'Contacts', method='POST', data=contact_data)
-    
-    print("DEBUG: Xero API result:")
-    print(result)
-    
-    if result.get('success'):
-        xero_contact = result['data']['Contacts'][0]
-        
-        # Store Xero contact ID in your client model
-        client.xero_contact_id = xero_contact['ContactID']
-        client.xero_last_sync = timezone.now()
-        client.save()
-        
-        print(f"SUCCESS: Client {client.id} synced to Xero with ID: {xero_contact['ContactID']}")
-        return {
-            'success': True,
-            'xero_contact_id': xero_contact['ContactID'],
-            'message': 'Client synced to Xero successfully'
-        }
-    else:
-        print(f"FAILED: Client {client.id} sync failed: {result.get('error')}")
+    return contact_data
+
+
+def push_client_contact(user, client, idempotency_key=None):
+    """
+    Create or update ``client``'s Xero contact with ``user``'s connection.
+    A client that already has a ``xero_contact_id`` updates that contact,
+    and ``idempotency_key`` lets Xero ignore a repeated create, so a retry
+    never adds a duplicate. The returned contact id is stored on the client.
+    """
+    contact_data = client_contact_data(client)
+    if client.xero_contact_id:
+        contact_data["Contacts"][0]["ContactID"] = client.xero_contact_id
+
+    result = xero_api_call(user, 'Contacts', method='POST', data=contact_data,
+                           idempotency_key=idempotency_key)
+    if not result.get('success'):
+        logger.warning("Client %s sync failed: %s", client.pk, result.get('error'))
         return {
             'success': False,
             'error': result.get('error'),
             'message': 'Failed to sync client to Xero'
         }
 
+    client.xero_contact_id = result['data']['Contacts'][0]['ContactID']
+    client.xero_last_sync = timezone.now()
+    Client.objects.filter(pk=client.pk).update(
+        xero_contact_id=client.xero_contact_id, xero_last_sync=client.xero_last_sync
+    )
+    return {
+        'success': True,
+        'xero_contact_id': client.xero_contact_id,
+        'message': 'Client synced to Xero successfully'
+    }
+
 def create_xero_invoice(request, project):
     """
     Create an invoice in Xero for a project